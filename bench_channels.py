@@ -0,0 +1,407 @@
+# SPDX-License: LGPL-3.0-or-later
+# (c) 2025 Frank David Martínez Muñoz. <mnesarco at gmail.com>
+
+"""
+Headless benchmarks of the channels transport and discovery.
+
+Runs local services with stand-in handlers, no FreeCAD or Blender needed.
+The startup scenario imports the workbench gui init in a fresh interpreter
+(``python -X importtime``) with stand-in FreeCAD and PySide modules::
+
+    python bench_channels.py --output bench.json
+    python bench_channels.py --quick --compare bench.json
+
+Results are json, one entry per scenario with a stable key, so two runs
+can be compared to spot regressions in the transport hot path.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import threading
+import time
+from array import array
+from pathlib import Path
+from queue import Queue
+from typing import Any
+
+from freecad.channels.api import (
+    DiscoveryListener,
+    RetryPolicy,
+    Service,
+    ServiceClient,
+    ServiceRegistry,
+    ServiceRequest,
+    find_channel_service,
+)
+
+# Transport name: (service options, client options)
+TRANSPORTS = {
+    "http": ({"keep_alive": False}, {"keep_alive": False, "transport": "http"}),
+    "keep-alive": ({"keep_alive": True}, {"keep_alive": True, "transport": "http"}),
+    "frame": ({"keep_alive": True, "frames": True}, {"keep_alive": True, "transport": "frame"}),
+}
+
+# Payload sizes in bytes, sent as arrays of doubles
+PAYLOAD_SIZES = (0, 1024, 64 * 1024, 1024 * 1024)
+QUEUE_SIZES = (0, 16)
+CONCURRENCY = (1, 4, 16)
+
+# Upper bound of bytes sent per scenario, large payloads send fewer requests
+SCENARIO_BYTES = 64 * 1024 * 1024
+
+# Patient retries, the benchmark measures throughput under backpressure
+BENCH_RETRY = RetryPolicy(attempts=1000, initial_delay=0.001, max_delay=0.05)
+
+
+# Modules deferred until first use, they must not load during gui init
+DEFERRED_MODULES = (
+    "freecad.channels.api",
+    "freecad.channels.blender",
+    "freecad.channels.export",
+    "freecad.channels.preferences",
+    "freecad.channels.vendor.fcapi.preferences",
+)
+
+# Imports the gui init with permissive stand-ins for FreeCAD, FreeCADGui and
+# PySide, then prints the channels modules it loaded
+STARTUP_SCRIPT = """
+import json, sys, tempfile, types
+
+class StubType(type):
+    def __getattr__(cls, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return Stub
+
+class Stub(metaclass=StubType):
+    def __init__(self, *args, **kwargs):
+        pass
+    def __call__(self, *args, **kwargs):
+        return Stub()
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return Stub()
+
+class StubModule(types.ModuleType):
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return Stub
+
+stubs = ("FreeCAD", "FreeCADGui", "PySide", "PySide.QtCore", "PySide.QtGui", "PySide.QtWidgets")
+for name in stubs:
+    sys.modules[name] = StubModule(name)
+    sys.modules[name].__path__ = []
+home = tempfile.mkdtemp()
+for name in ("getResourceDir", "getUserAppDataDir", "getUserMacroDir", "getUserCachePath"):
+    setattr(sys.modules["FreeCAD"], name, lambda *args: home)
+
+import freecad.channels.init_gui
+
+print(json.dumps(sorted(name for name in sys.modules if name.startswith("freecad."))))
+"""
+
+
+def percentile(samples: list[float], q: float) -> float:
+    """Nearest rank percentile of samples."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(q * len(ordered)) - 1))
+    return ordered[index]
+
+
+class StandIn:
+    """
+    Stand-in for a controller: drains the service in its own thread.
+    """
+
+    def __init__(self, service: Service) -> None:
+        """
+        Start draining a service.
+
+        :param service: The service to drain.
+        """
+        self.service = service
+        self.handled = 0
+        self.e2e: list[float] = []
+        self._wakeup = threading.Event()
+        self._done = False
+        service.add_enqueue_listener(self._wakeup.set)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def handler(self, request: ServiceRequest) -> None:
+        self.e2e.append(time.perf_counter() - request.data["t"])
+        self.handled += 1
+
+    def _run(self) -> None:
+        while not self._done:
+            self._wakeup.wait(0.05)
+            self._wakeup.clear()
+            for request in self.service:
+                self.service.dispatch(request, self.handler)
+
+    def wait_for(self, count: int, timeout: float = 60) -> None:
+        deadline = time.monotonic() + timeout
+        while self.handled < count and time.monotonic() < deadline:
+            time.sleep(0.001)
+
+    def stop(self) -> None:
+        self._done = True
+        self._thread.join()
+
+
+# One argument per scenario dimension, as listed by scenario_key
+def bench_transport(  # noqa: PLR0913, PLR0917
+    registry: ServiceRegistry,
+    transport: str,
+    payload_size: int,
+    queue_size: int,
+    concurrency: int,
+    max_requests: int,
+) -> dict[str, Any]:
+    service_options, client_options = TRANSPORTS[transport]
+    service = registry.create_service("Bench", Queue(maxsize=queue_size), **service_options)
+    stand_in = StandIn(service)
+    while not service.port:
+        time.sleep(0.001)
+
+    values = array("d", bytes(payload_size))
+    per_client = max(1, min(max_requests, SCENARIO_BYTES // max(payload_size, 1)) // concurrency)
+    clients = [
+        ServiceClient(service.address(), retry=BENCH_RETRY, **client_options)
+        for _ in range(concurrency)
+    ]
+    acks: list[list[float]] = [[] for _ in clients]
+    errors = []
+
+    def run(index: int) -> None:
+        client = clients[index]
+        try:
+            for _ in range(per_client):
+                start = time.perf_counter()
+                client.send(ServiceRequest("Bench", data={"t": start, "values": values}))
+                acks[index].append(time.perf_counter() - start)
+        except Exception as ex:  # noqa: BLE001
+            errors.append(repr(ex))
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    total = sum(len(samples) for samples in acks)
+    stand_in.wait_for(total)
+    elapsed = time.perf_counter() - start
+
+    stand_in.stop()
+    for client in clients:
+        client.close()
+    service.shutdown()
+
+    ack = [sample for samples in acks for sample in samples]
+    return {
+        "benchmark": "transport",
+        "transport": transport,
+        "payload": payload_size,
+        "queue_size": queue_size,
+        "concurrency": concurrency,
+        "requests": total,
+        "handled": stand_in.handled,
+        "errors": errors[:3],
+        "retries": sum(client.metrics.retries for client in clients),
+        "seconds": elapsed,
+        "throughput": stand_in.handled / elapsed if elapsed else 0.0,
+        "ack_p50_ms": percentile(ack, 0.5) * 1000,
+        "ack_p99_ms": percentile(ack, 0.99) * 1000,
+        "e2e_p50_ms": percentile(stand_in.e2e, 0.5) * 1000,
+        "e2e_p99_ms": percentile(stand_in.e2e, 0.99) * 1000,
+    }
+
+
+def bench_discovery(registry: ServiceRegistry, repeat: int) -> list[dict[str, Any]]:
+    service = registry.create_service("BenchDiscovery", Queue())
+    while not service.port:
+        time.sleep(0.001)
+
+    find = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        found = find_channel_service(filter=["BenchDiscovery"], maxcount=1, timeout=5)
+        if found:
+            find.append(time.perf_counter() - start)
+
+    listen = []
+    for _ in range(repeat):
+        listener = DiscoveryListener()
+        start = time.perf_counter()
+        if listener.wait_for("BenchDiscovery", 5):
+            listen.append(time.perf_counter() - start)
+        listener.stop()
+
+    service.shutdown()
+    return [
+        {
+            "benchmark": "discovery",
+            "method": method,
+            "samples": len(samples),
+            "failures": repeat - len(samples),
+            "p50_ms": percentile(samples, 0.5) * 1000,
+            "p99_ms": percentile(samples, 0.99) * 1000,
+        }
+        for method, samples in (("find_channel_service", find), ("DiscoveryListener", listen))
+    ]
+
+
+def startup_time(stderr: str, module: str) -> float:
+    """Cumulative import time of module in seconds, from python -X importtime output."""
+    for line in stderr.splitlines():
+        fields = line.removeprefix("import time:").split("|")
+        if len(fields) == 3 and fields[2].strip() == module:  # noqa: PLR2004
+            return int(fields[1]) / 1e6
+    msg = f"{module} not found in the import times"
+    raise RuntimeError(msg)
+
+
+def bench_startup(repeat: int) -> dict[str, Any]:
+    samples = []
+    loaded: set[str] = set()
+    for _ in range(repeat):
+        run = subprocess.run(  # noqa: S603
+            [sys.executable, "-X", "importtime", "-c", STARTUP_SCRIPT],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parent,
+        )
+        samples.append(startup_time(run.stderr, "freecad.channels.init_gui"))
+        loaded.update(json.loads(run.stdout))
+    return {
+        "benchmark": "startup",
+        "module": "freecad.channels.init_gui",
+        "samples": len(samples),
+        "deferred_loaded": sorted(name for name in DEFERRED_MODULES if name in loaded),
+        "p50_ms": percentile(samples, 0.5) * 1000,
+        "p99_ms": percentile(samples, 0.99) * 1000,
+    }
+
+
+def scenario_key(result: dict[str, Any]) -> str:
+    """Stable key of a result, used to compare runs."""
+    if result["benchmark"] == "discovery":
+        return f"discovery/{result['method']}"
+    if result["benchmark"] == "startup":
+        return f"startup/{result['module']}"
+    return (
+        f"transport/{result['transport']}/payload={result['payload']}"
+        f"/queue={result['queue_size']}/clients={result['concurrency']}"
+    )
+
+
+def compare(results: list[dict[str, Any]], baseline_file: Path) -> None:
+    baseline = {scenario_key(r): r for r in json.loads(baseline_file.read_text())["results"]}
+    print(f"{'scenario':<62} {'metric':<12} {'baseline':>10} {'current':>10} {'change':>8}")
+    for result in results:
+        key = scenario_key(result)
+        old = baseline.get(key)
+        if old is None:
+            continue
+        metrics = ("p50_ms", "p99_ms") if result["benchmark"] != "transport" else (
+            "throughput",
+            "ack_p99_ms",
+            "e2e_p99_ms",
+        )
+        for metric in metrics:
+            before, after = old[metric], result[metric]
+            change = (after - before) / before * 100 if before else 0.0
+            print(f"{key:<62} {metric:<12} {before:>10.2f} {after:>10.2f} {change:>7.1f}%")
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],  # noqa: S607
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--output", type=Path, help="Write json results to this file")
+    parser.add_argument("--compare", type=Path, help="Baseline json results to compare with")
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per scenario")
+    parser.add_argument("--quick", action="store_true", help="Small subset of scenarios")
+    parser.add_argument(
+        "--transport",
+        action="append",
+        choices=sorted(TRANSPORTS),
+        help="Transports to run, all by default",
+    )
+    args = parser.parse_args()
+
+    transports = args.transport or list(TRANSPORTS)
+    payloads, queues, concurrency = PAYLOAD_SIZES, QUEUE_SIZES, CONCURRENCY
+    requests, repeat = args.requests, 20
+    if args.quick:
+        payloads, queues, concurrency = (0, 64 * 1024), (16,), (1, 4)
+        requests, repeat = min(requests, 300), 5
+
+    registry = ServiceRegistry()
+    results = []
+    for transport in transports:
+        for payload in payloads:
+            for queue_size in queues:
+                for clients in concurrency:
+                    result = bench_transport(
+                        registry,
+                        transport,
+                        payload,
+                        queue_size,
+                        clients,
+                        requests,
+                    )
+                    print(
+                        f"{scenario_key(result):<62} {result['throughput']:>9.0f} req/s"
+                        f"  ack p99 {result['ack_p99_ms']:>7.2f} ms"
+                        f"  e2e p99 {result['e2e_p99_ms']:>7.2f} ms",
+                        file=sys.stderr,
+                    )
+                    results.append(result)
+    results.extend(bench_discovery(registry, repeat))
+    registry.shutdown()
+    results.append(bench_startup(repeat))
+
+    report = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "quick": args.quick,
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text)
+    else:
+        print(text)
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
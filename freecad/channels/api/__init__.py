@@ -7,16 +7,37 @@
 FreeCAD Channels: API.
 """
 
+from ._aio import AsyncServiceClient, discover_services
+from ._balancer import BalancingClient
+from ._codecs import CodecError
+from ._discovery import SERVICE_ADDED, SERVICE_REMOVED, DiscoveryListener
+from ._metrics import ClientMetrics, ServiceMetrics
 from ._qt import channel_handler
 from ._service import (
     Channel,
+    ConnectionPool,
+    DiscoveryGroup,
+    RetryPolicy,
     Service,
     ServiceAddress,
+    ServiceBusyError,
     ServiceClient,
+    ServiceEndpoint,
+    ServiceLoad,
     ServiceRegistry,
     ServiceRequest,
     ServiceRequestHandler,
     find_channel_service,
     logger,
+    primary_address,
+    shared_endpoint,
 )
-from ._types import ServiceController
+from ._queues import (
+    PRIORITY_HIGH,
+    PRIORITY_LOW,
+    PRIORITY_NORMAL,
+    CoalescingQueue,
+    LaneQueue,
+)
+from ._rpc import RemoteError
+from ._types import DrainStats, ServiceController
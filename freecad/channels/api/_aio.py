@@ -0,0 +1,589 @@
+# SPDX-License: LGPL-3.0-or-later
+# (c) 2025 Frank David Martínez Muñoz. <mnesarco at gmail.com>
+
+"""
+FreeCAD Channels: asyncio client and discovery.
+
+Native asyncio counterparts of ServiceClient and find_channel_service,
+built on asyncio streams and datagram endpoints. A single event loop
+can drive hundreds of concurrent channel operations without a thread
+per peer.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import socket
+import time
+from abc import ABC, abstractmethod
+from contextlib import suppress
+from dataclasses import replace
+from typing import TYPE_CHECKING, Any
+
+from ._frames import (
+    FRAME_BATCH,
+    FRAME_CANCEL,
+    FRAME_PREFIX,
+    FRAME_REPLIES,
+    FRAME_REQUEST,
+    decode_frame,
+    encode_frame,
+    parse_prefix,
+)
+from ._metrics import ClientMetrics
+from ._rpc import REPLY_MAX_WAIT, REPLY_POLL_INTERVAL, REPLY_POLL_WAIT, RemoteError, new_reply_id
+from ._service import (
+    DEFAULT_RETRY,
+    DISCOVERY_PROBE_INTERVAL,
+    DISCOVERY_SERVICE_ADDR,
+    RetryPolicy,
+    ServiceAddress,
+    ServiceBusyError,
+    ServiceLoad,
+    decode_body,
+    encode_body,
+    logger,
+    negotiate_codecs,
+    open_probe_socket,
+    parse_announcements,
+    route_request,
+    send_probe,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
+    from typing_extensions import Self
+
+    from ._service import DiscoveryGroup, ServiceRequest
+
+
+class AsyncServiceClient:
+    """
+    asyncio client of a service, see ServiceClient.
+
+    Requests go over a single persistent connection, reopened when the
+    peer closes it. Concurrent operations on the same client wait for
+    their turn on the connection; use one client per peer to fan out.
+    Calls are collected by a poller task on a second connection that
+    runs only while calls are in flight.
+    """
+
+    def __init__(
+        self,
+        address: ServiceAddress,
+        *,
+        transport: str = "auto",
+        retry: RetryPolicy | None = DEFAULT_RETRY,
+        compression: str | None = "auto",
+    ) -> None:
+        """
+        Initialize the client.
+
+        :param address: The address of the service.
+        :param transport: "http", "frame" or "auto", see ServiceClient.
+        :param retry: Retry policy for requests rejected because the service
+            queue is full, None to fail immediately with ServiceBusyError.
+        :param compression: Encoding of large messages, see ServiceClient.
+        """
+        if transport not in ("auto", "http", "frame"):
+            msg = f"Invalid transport: {transport}"
+            raise ValueError(msg)
+        if transport == "frame" and not address.frame_port:
+            msg = f"Service {address.display} does not support frame transport"
+            raise ValueError(msg)
+
+        self.address = address
+        self.retry = retry
+        self.compression, self.content_type = negotiate_codecs(address, compression)
+        self._frames = transport != "http" and bool(address.frame_port)
+        self._connection = self._connect()
+        self._calls: _PendingCalls | None = None
+        # Peer queue state learned from responses
+        self.capacity = 0
+        self.pending = 0
+        self.latency = 0.0
+        self._not_before = 0.0
+        self.metrics = ClientMetrics()
+
+    @property
+    def transport(self) -> str:
+        return "frame" if self._frames else "http"
+
+    @property
+    def not_before(self) -> float:
+        """Monotonic time before which the peer asked not to receive requests."""
+        return self._not_before
+
+    def load(self) -> ServiceLoad:
+        """Load of the peer as seen in its last response."""
+        return ServiceLoad(self.pending, self.capacity, self.latency)
+
+    async def send(self, request: ServiceRequest, timeout: float | None = None) -> None:
+        await self._submit("/", FRAME_REQUEST, request.payload(), timeout)
+
+    async def send_many(
+        self,
+        requests: list[ServiceRequest],
+        timeout: float | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Send many requests in a single message, see ServiceClient.send_many.
+
+        :param requests: The requests to send.
+        :param timeout: Timeout in seconds.
+        :return: One status dict per request, in the same order.
+        """
+        payload = {"requests": [request.payload() for request in requests]}
+        response = await self._submit("/batch", FRAME_BATCH, payload, timeout)
+        return response.get("items", [])
+
+    async def call(self, request: ServiceRequest, timeout: float | None = None) -> Any:
+        """
+        Send a request and wait for the result of its handler.
+
+        :param request: The request to send, reply_to is assigned if missing.
+        :param timeout: Seconds to wait for the reply, None waits forever.
+            Cancelling the task or timing out cancels the call in the service.
+        :return: The handler result.
+        :raises RemoteError: If the handler failed.
+        :raises TimeoutError: If there is no reply in time.
+        """
+        if request.reply_to is None:
+            request = replace(request, reply_to=new_reply_id())
+        if self._calls is None:
+            self._calls = _PendingCalls(self)
+        future = self._calls.add(request.reply_to)
+        try:
+            await self._submit("/", FRAME_REQUEST, request.payload(), timeout)
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError as ex:
+            msg = f"No reply for call {request.reply_to}"
+            raise TimeoutError(msg) from ex
+        finally:
+            future.cancel()
+
+    async def close(self) -> None:
+        if self._calls is not None:
+            await self._calls.close()
+            self._calls = None
+        await self._connection.close()
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *args: object) -> None:
+        await self.close()
+
+    def _connect(self) -> _Connection:
+        if self._frames:
+            return _FrameConnection(self.address, self.compression)
+        return _HttpConnection(self.address, self.compression, self.content_type)
+
+    async def _submit(
+        self,
+        path: str,
+        kind: int,
+        payload: dict[str, Any],
+        timeout: float | None,
+    ) -> dict[str, Any]:
+        # Same flow control as ServiceClient._submit
+        attempt = 0
+        while True:
+            delay = self._not_before - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            response = await self._request(path, kind, payload, timeout)
+            self.capacity = response.get("capacity", self.capacity)
+            self.pending = response.get("pending", self.pending)
+            self.latency = float(response.get("latency", self.latency))
+            retry_after = float(response.get("retry_after", 0))
+            self._not_before = time.monotonic() + retry_after
+
+            if response.get("status") != "rejected":
+                return response
+
+            retry = self.retry is not None and attempt < self.retry.attempts
+            self.metrics.record_rejected(retry=retry)
+            if not retry:
+                msg = f"Service {self.address.display} is busy: {response.get('message')}"
+                raise ServiceBusyError(msg, retry_after)
+
+            backoff = self.retry.delay(attempt)
+            if backoff > retry_after:
+                self._not_before = time.monotonic() + backoff
+            attempt += 1
+
+    async def _request(
+        self,
+        path: str,
+        kind: int,
+        payload: dict[str, Any],
+        timeout: float | None,
+        connection: _Connection | None = None,
+    ) -> dict[str, Any]:
+        path, payload = route_request(self.address, path, payload)
+        connection = connection or self._connection
+        start = time.perf_counter()
+        try:
+            exchange = connection.exchange(path, kind, payload)
+            response, sent, received = await asyncio.wait_for(exchange, timeout)
+        except asyncio.TimeoutError as ex:
+            self.metrics.record_error()
+            msg = f"Request to {self.address.display} timed out"
+            raise TimeoutError(msg) from ex
+        except Exception:
+            self.metrics.record_error()
+            raise
+        self.metrics.record_roundtrip(time.perf_counter() - start, sent, received)
+        if response.get("status") == "error":
+            msg = f"Failed to send service request to {self.address.display}"
+            raise RuntimeError(msg)
+        return response
+
+
+class _Connection(ABC):
+    """
+    Persistent stream connection, reopened once if the peer closed it.
+    """
+
+    def __init__(self, address: ServiceAddress, port: int) -> None:
+        self.address = address
+        self.port = port
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._lock = asyncio.Lock()
+
+    async def exchange(
+        self,
+        path: str,
+        kind: int,
+        payload: dict[str, Any],
+    ) -> tuple[dict[str, Any], int, int]:
+        """
+        Send a request and wait for its response.
+
+        :return: Tuple (response payload, bytes sent, bytes received).
+        """
+        async with self._lock:
+            reused = self._writer is not None
+            try:
+                return await self._roundtrip(path, kind, payload)
+            except BaseException as ex:
+                # The stream state is unknown after any failure
+                await self._close()
+                stale = isinstance(ex, (ConnectionError, asyncio.IncompleteReadError))
+                if not reused or not stale:
+                    raise
+            # Stale connection closed by the peer, retry on a fresh one.
+            try:
+                return await self._roundtrip(path, kind, payload)
+            except BaseException:
+                await self._close()
+                raise
+
+    async def _open(self) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(
+                self.address.host,
+                self.port,
+            )
+            sock = self._writer.get_extra_info("socket")
+            if sock is not None:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return self._reader, self._writer
+
+    @abstractmethod
+    async def _roundtrip(
+        self,
+        path: str,
+        kind: int,
+        payload: dict[str, Any],
+    ) -> tuple[dict[str, Any], int, int]:
+        """Send a request on the open stream and read its response."""
+
+    async def _close(self) -> None:
+        writer, self._reader, self._writer = self._writer, None, None
+        if writer is not None:
+            writer.close()
+            with suppress(Exception):
+                await writer.wait_closed()
+
+    async def close(self) -> None:
+        async with self._lock:
+            await self._close()
+
+
+class _FrameConnection(_Connection):
+    def __init__(self, address: ServiceAddress, encoding: str | None) -> None:
+        super().__init__(address, address.frame_port)
+        self.encoding = encoding
+        self.accept = (encoding,) if encoding else ()
+
+    async def _roundtrip(
+        self,
+        path: str,  # noqa: ARG002
+        kind: int,
+        payload: dict[str, Any],
+    ) -> tuple[dict[str, Any], int, int]:
+        frame = encode_frame(kind, payload, encoding=self.encoding, accept=self.accept)
+        reader, writer = await self._open()
+        writer.write(frame)
+        await writer.drain()
+        prefix = await reader.readexactly(FRAME_PREFIX.size)
+        _, header_len, body_len = parse_prefix(prefix)
+        header = await reader.readexactly(header_len)
+        body = await reader.readexactly(body_len)
+        response = decode_frame(header, body)
+        return response, len(frame), FRAME_PREFIX.size + header_len + body_len
+
+
+class _HttpConnection(_Connection):
+    def __init__(
+        self,
+        address: ServiceAddress,
+        encoding: str | None,
+        content_type: str,
+    ) -> None:
+        super().__init__(address, address.port)
+        self.encoding = encoding
+        self.content_type = content_type
+
+    async def _roundtrip(
+        self,
+        path: str,
+        kind: int,
+        payload: dict[str, Any],
+    ) -> tuple[dict[str, Any], int, int]:
+        body, encoding = encode_body(payload, self.content_type, self.encoding, kind)
+        headers = [
+            f"POST {path} HTTP/1.1",
+            f"Host: {self.address.host}:{self.port}",
+            f"Content-Type: {self.content_type}",
+            f"Accept: {self.content_type}",
+            f"Content-Length: {len(body)}",
+        ]
+        if encoding is not None:
+            headers.append(f"Content-Encoding: {encoding}")
+        if self.encoding is not None:
+            headers.append(f"Accept-Encoding: {self.encoding}")
+        reader, writer = await self._open()
+        writer.write("\r\n".join(headers).encode("latin-1") + b"\r\n\r\n" + body)
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            # Closed by the peer, as readexactly reports it for frames
+            partial = b""
+            raise asyncio.IncompleteReadError(partial, None)
+        version, status, *_ = status_line.decode("latin-1").split()
+        reply_headers = {}
+        while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            reply_headers[name.strip().lower()] = value.strip()
+        length = reply_headers.get("content-length")
+        reply = await reader.readexactly(int(length)) if length else await reader.read()
+        if version != "HTTP/1.1" or reply_headers.get("connection", "").lower() == "close":
+            await self._close()
+
+        if status not in ("200", "503"):
+            msg = f"Failed to send service request to {self.address.display}: {status}"
+            raise RuntimeError(msg)
+        response = decode_body(
+            reply,
+            reply_headers.get("content-type", self.content_type),
+            reply_headers.get("content-encoding"),
+        )
+        return response, len(body), len(status_line) + len(reply)
+
+
+class _PendingCalls:
+    """
+    Futures waiting for replies, resolved by a poller task.
+
+    The poller long polls on its own connection so that it does not
+    hold back the sends of the client.
+    """
+
+    def __init__(self, client: AsyncServiceClient) -> None:
+        self._client = client
+        self._connection = client._connect()  # noqa: SLF001
+        self._calls: dict[int, asyncio.Future] = {}
+        self._cancelled: list[int] = []
+        self._task: asyncio.Task | None = None
+
+    def add(self, reply_id: int) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(lambda f: self._on_done(reply_id, f))
+        self._calls[reply_id] = future
+        self._start()
+        return future
+
+    def _start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def _on_done(self, reply_id: int, future: asyncio.Future) -> None:
+        if self._calls.pop(reply_id, None) is not None and future.cancelled():
+            self._cancelled.append(reply_id)
+            self._start()
+
+    async def _request(self, path: str, kind: int, payload: dict[str, Any], timeout: float) -> Any:
+        return await self._client._request(path, kind, payload, timeout, self._connection)  # noqa: SLF001
+
+    async def _run(self) -> None:
+        while self._calls or self._cancelled:
+            if self._cancelled:
+                cancelled, self._cancelled = self._cancelled, []
+                try:
+                    await self._request("/cancel", FRAME_CANCEL, {"ids": cancelled}, 5)
+                except Exception:  # noqa: BLE001
+                    logger.warning("Failed to notify %d cancelled calls", len(cancelled))
+
+            ids = list(self._calls)
+            if not ids:
+                continue
+
+            start = time.monotonic()
+            payload = {"ids": ids, "wait": REPLY_POLL_WAIT}
+            try:
+                response = await self._request(
+                    "/replies",
+                    FRAME_REPLIES,
+                    payload,
+                    REPLY_POLL_WAIT + REPLY_MAX_WAIT,
+                )
+            except Exception as ex:  # noqa: BLE001
+                for reply_id in ids:
+                    self._fail(reply_id, ex)
+                continue
+
+            replies = response.get("replies", [])
+            for reply in replies:
+                self._resolve(reply)
+
+            if not replies and time.monotonic() - start < REPLY_POLL_INTERVAL:
+                # Service does not hold long polls
+                await asyncio.sleep(REPLY_POLL_INTERVAL)
+        self._task = None
+
+    def _fail(self, reply_id: int, ex: BaseException) -> None:
+        future = self._calls.pop(reply_id, None)
+        if future is not None and not future.done():
+            future.set_exception(ex)
+
+    def _resolve(self, reply: dict[str, Any]) -> None:
+        future = self._calls.pop(reply.get("id"), None)
+        if future is None or future.done():
+            return
+        status = reply.get("status")
+        if status == "ok":
+            future.set_result(reply.get("result"))
+        elif status == "cancelled":
+            future.cancel()
+        else:
+            future.set_exception(RemoteError(reply.get("message", "remote call failed")))
+
+    async def close(self) -> None:
+        for future in list(self._calls.values()):
+            future.cancel()
+        self._cancelled.clear()
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+        await self._connection.close()
+
+
+class _DiscoveryProtocol(asyncio.DatagramProtocol):
+    def __init__(self, found: asyncio.Queue[ServiceAddress], names: list[str] | None) -> None:
+        self.found = found
+        self.names = names
+
+    def datagram_received(self, data: bytes, addr: tuple[str, int]) -> None:  # noqa: ARG002
+        for address in parse_announcements(data):
+            if self.names is None or address.name in self.names:
+                self.found.put_nowait(address)
+
+    def error_received(self, exc: Exception) -> None:
+        # Probes are an optimization, periodic announcements still work
+        logger.debug("Discovery datagram error: %s", exc)
+
+
+async def discover_services(
+    filter: list[str] | None = None,  # noqa: A002
+    *,
+    timeout: float = 5,
+    maxcount: int = 0,
+    multicast: DiscoveryGroup | None = None,
+) -> AsyncIterator[ServiceAddress]:
+    """
+    Discover services, yielding each one as soon as it is found.
+
+    asyncio variant of find_channel_service::
+
+        async for address in discover_services(["Blender"], timeout=2):
+            ...
+
+    :param filter: list of service names to filter by, defaults to None
+    :param timeout: maximum time to wait for responses, defaults to 5 seconds
+    :param maxcount: stop after this number of services, defaults to 0 (unlimited)
+    :param multicast: Also discover services announced to this group, defaults to None
+    :return: Async iterator of ServiceAddress instances, each one yielded once.
+    """
+    loop = asyncio.get_running_loop()
+    found: asyncio.Queue[ServiceAddress] = asyncio.Queue()
+    sockets = _discovery_sockets(multicast)
+    transports: list[asyncio.DatagramTransport] = []
+    try:
+        for each in sockets:
+            transport, _ = await loop.create_datagram_endpoint(
+                lambda: _DiscoveryProtocol(found, filter),
+                sock=each,
+            )
+            transports.append(transport)
+        probe = transports[1]
+
+        seen: set[ServiceAddress] = set()
+        deadline = time.monotonic() + timeout
+        next_probe = 0.0
+        while (remaining := deadline - time.monotonic()) > 0:
+            if time.monotonic() >= next_probe:
+                send_probe(probe, filter, multicast)
+                next_probe = time.monotonic() + DISCOVERY_PROBE_INTERVAL
+            wait = min(remaining, max(next_probe - time.monotonic(), 0))
+            try:
+                address = await asyncio.wait_for(found.get(), wait)
+            except asyncio.TimeoutError:
+                continue
+            if address in seen:
+                continue
+            seen.add(address)
+            yield address
+            if maxcount > 0 and len(seen) >= maxcount:
+                break
+    finally:
+        for transport in transports:
+            transport.close()
+        for each in sockets[len(transports) :]:
+            each.close()
+
+
+def _discovery_sockets(multicast: DiscoveryGroup | None) -> list[socket.socket]:
+    # Announcement, probe and multicast sockets, none is left open on failure
+    sockets = []
+    try:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        sockets.append(sock)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind(DISCOVERY_SERVICE_ADDR)
+        # Probe replies are unicast to the probe socket
+        sockets.append(open_probe_socket(multicast))
+        if multicast is not None:
+            sockets.append(multicast.open_socket())
+    except BaseException:
+        for each in sockets:
+            each.close()
+        raise
+    return sockets
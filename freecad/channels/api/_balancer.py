@@ -0,0 +1,320 @@
+# SPDX-License: LGPL-3.0-or-later
+# (c) 2025 Frank David Martínez Muñoz. <mnesarco at gmail.com>
+
+"""
+FreeCAD Channels: Client side load balancing.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from http.client import HTTPException
+from typing import TYPE_CHECKING, Any
+
+from ._frames import FrameError
+from ._queues import lane_capacity
+from ._service import (
+    DEFAULT_RETRY,
+    RetryPolicy,
+    ServiceAddress,
+    ServiceBusyError,
+    ServiceClient,
+    ServiceLoad,
+    logger,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from concurrent.futures import Future
+
+    from ._discovery import DiscoveryListener
+    from ._service import ServiceRequest
+
+# Seconds an unreachable peer is skipped
+PEER_FAILURE_BACKOFF = 5.0
+
+# Coalescing keys remembered to send them to the same peer
+MAX_KEY_AFFINITY = 256
+
+# Seconds a chunk of send_batches waits for room once the retry policy gave up
+BATCH_MAX_WAIT = 60.0
+
+# Errors that mean the request did not reach the peer. A timeout is not one of
+# them, the peer may have received the request and failing over would deliver
+# it twice.
+_DELIVERY_ERRORS = (OSError, EOFError, HTTPException, FrameError)
+
+
+@dataclass(slots=True)
+class _Peer:
+    client: ServiceClient
+    load: ServiceLoad
+    announced: ServiceLoad | None = None
+    inflight: int = 0
+    failed_until: float = 0.0
+
+    def expected_wait(self) -> float:
+        return self.load.expected_wait(self.inflight)
+
+
+class BalancingClient:
+    """
+    Client that spreads requests over all healthy peers of a service.
+
+    Peers are the services with the same name tracked by a DiscoveryListener.
+    Each request goes to the peer with the lowest expected wait, estimated
+    from the load in its announcements and refreshed from every response.
+    Full peers are skipped while others have room, unreachable peers are
+    skipped for PEER_FAILURE_BACKOFF seconds. Only when all peers are busy
+    the request waits according to the retry policy.
+
+    Requests with a coalescing key stick to the peer that got the previous
+    request with that key while it is not busy, so they can still replace
+    each other in its queue.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        name: str,
+        discovery: DiscoveryListener,
+        *,
+        keep_alive: bool = True,
+        transport: str = "auto",
+        retry: RetryPolicy | None = DEFAULT_RETRY,
+        wait: float = 5.0,
+    ) -> None:
+        """
+        Initialize the client.
+
+        :param name: Name of the service.
+        :param discovery: Listener tracking the peers, it is started if needed.
+        :param keep_alive: Reuse persistent connections to the peers.
+        :param transport: Transport of the peer clients, see ServiceClient.
+        :param retry: Retry policy used when all peers are busy, None to fail
+            immediately with ServiceBusyError.
+        :param wait: Seconds to wait for a first peer to be discovered.
+        """
+        self.name = name
+        self.discovery = discovery
+        self.keep_alive = keep_alive
+        self.transport = transport
+        self.retry = retry
+        self.wait = wait
+        self._peers: dict[ServiceAddress, _Peer] = {}
+        self._affinity: OrderedDict[str, ServiceAddress] = OrderedDict()
+        self._lock = threading.Lock()
+        discovery.start()
+
+    def peers(self) -> list[ServiceAddress]:
+        """Currently known peers."""
+        self._refresh()
+        with self._lock:
+            return list(self._peers)
+
+    def send(self, request: ServiceRequest, timeout: float | None = None) -> ServiceAddress:
+        """
+        Send a request to the least loaded peer.
+
+        :param request: The request to send.
+        :param timeout: Timeout in seconds.
+        :return: Address of the peer that accepted the request.
+        """
+        return self._dispatch(lambda client: client.send(request, timeout), request.key)[0]
+
+    def send_many(
+        self,
+        requests: list[ServiceRequest],
+        timeout: float | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Send a batch to the least loaded peer, see ServiceClient.send_many.
+
+        The batch is not split, it is enqueued atomically in a single peer.
+        """
+        return self._dispatch(lambda client: client.send_many(requests, timeout))[1]
+
+    def send_batches(
+        self,
+        requests: list[ServiceRequest],
+        timeout: float | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Send any number of requests as batches that fit in the peers queues.
+
+        The requests are split in chunks no larger than the lower lanes of
+        the peer queue (its capacity minus the reserve of the high lane),
+        a larger batch would be rejected even by an idle peer. Each chunk
+        is enqueued atomically, a busy peer is waited for up to
+        BATCH_MAX_WAIT seconds. Chunks already sent are not rolled back
+        if a later one fails.
+
+        :param requests: The requests to send.
+        :param timeout: Timeout in seconds to deliver each chunk.
+        :return: One status dict per request, in the same order.
+        """
+        send = lambda chunk: self.send_many(chunk, timeout)  # noqa: E731
+        return self._chunked(requests, send)
+
+    def call(self, request: ServiceRequest, timeout: float | None = None) -> Future:
+        """
+        Call the least loaded peer, see ServiceClient.call.
+
+        The request is moved to another peer if it can not be delivered,
+        failures after delivery are reported by the future.
+        """
+        send = lambda client: client.start_call(request, timeout)  # noqa: E731
+        return self._dispatch(send, request.key)[1]
+
+    def call_many(
+        self,
+        requests: list[ServiceRequest],
+        timeout: float | None = None,
+        reply_timeout: float | None = None,
+    ) -> list[Future]:
+        """
+        Call many requests in batches, see send_batches and ServiceClient.start_calls.
+
+        :param requests: The requests to send.
+        :param timeout: Timeout in seconds to deliver each chunk.
+        :param reply_timeout: Seconds to wait for each reply, None waits forever.
+        :return: One future per request, in the same order. Calls replaced
+            by a newer request with the same key are cancelled.
+        """
+
+        def send(chunk: list[ServiceRequest]) -> list[Future]:
+            calls = lambda client: client.start_calls(chunk, timeout, reply_timeout)  # noqa: E731
+            return self._dispatch(calls)[1]
+
+        return self._chunked(requests, send)
+
+    def close(self) -> None:
+        with self._lock:
+            peers, self._peers = list(self._peers.values()), {}
+        for peer in peers:
+            peer.client.close()
+
+    def _dispatch(
+        self,
+        send: Callable[[ServiceClient], Any],
+        key: str | None = None,
+    ) -> tuple[ServiceAddress, Any]:
+        attempt = 0
+        while True:
+            self._refresh()
+            retry_after = None
+            for peer in self._candidates(key):
+                with self._lock:
+                    peer.inflight += 1
+                try:
+                    result = send(peer.client)
+                except ServiceBusyError as ex:
+                    hint = ex.retry_after
+                    retry_after = hint if retry_after is None else min(retry_after, hint)
+                    continue
+                except TimeoutError:
+                    raise
+                except _DELIVERY_ERRORS as ex:
+                    logger.warning("Peer %s unreachable: %s", peer.client.address.display, ex)
+                    peer.failed_until = time.monotonic() + PEER_FAILURE_BACKOFF
+                    continue
+                finally:
+                    with self._lock:
+                        peer.inflight -= 1
+                        peer.load = peer.client.load()
+                if key is not None:
+                    self._remember(key, peer.client.address)
+                return peer.client.address, result
+
+            if retry_after is None:
+                msg = f"No reachable {self.name} service found"
+                raise RuntimeError(msg)
+            if self.retry is None or attempt >= self.retry.attempts:
+                msg = f"All {self.name} services are busy"
+                raise ServiceBusyError(msg, retry_after)
+            time.sleep(max(self.retry.delay(attempt), retry_after))
+            attempt += 1
+
+    def _chunked(
+        self,
+        requests: list[ServiceRequest],
+        send: Callable[[list[ServiceRequest]], list[Any]],
+    ) -> list[Any]:
+        results = []
+        start = 0
+        deadline = time.monotonic() + BATCH_MAX_WAIT
+        while start < len(requests):
+            # Sized again after a rejection, it may have taught the capacity
+            chunk = requests[start : start + (self._batch_size() or len(requests))]
+            try:
+                results.extend(send(chunk))
+            except ServiceBusyError as ex:
+                # The previous chunk is still being handled
+                if self.retry is None or time.monotonic() + ex.retry_after > deadline:
+                    raise
+                time.sleep(ex.retry_after)
+                continue
+            start += len(chunk)
+            deadline = time.monotonic() + BATCH_MAX_WAIT
+        return results
+
+    def _batch_size(self) -> int:
+        # Room for bulk requests in an empty queue of the best peer, 0 is unbounded
+        self._refresh()
+        candidates = self._candidates()
+        capacity = candidates[0].load.capacity if candidates else 0
+        return lane_capacity(capacity)
+
+    def _candidates(self, key: str | None = None) -> list[_Peer]:
+        now = time.monotonic()
+        with self._lock:
+            healthy = [p for p in self._peers.values() if p.failed_until <= now]
+            sticky = self._affinity.get(key) if key is not None else None
+
+        def rank(peer: _Peer) -> tuple[bool, bool, float]:
+            # Peers that asked to wait or are full go last
+            busy = peer.client.not_before > now or peer.load.is_full()
+            return busy, peer.client.address != sticky, peer.expected_wait()
+
+        return sorted(healthy, key=rank)
+
+    def _remember(self, key: str, address: ServiceAddress) -> None:
+        with self._lock:
+            self._affinity[key] = address
+            self._affinity.move_to_end(key)
+            while len(self._affinity) > MAX_KEY_AFFINITY:
+                self._affinity.popitem(last=False)
+
+    def _refresh(self) -> None:
+        addresses = self.discovery.services([self.name])
+        with self._lock:
+            known = bool(self._peers)
+        if not addresses and not known:
+            address = self.discovery.wait_for(self.name, self.wait)
+            addresses = [address] if address else []
+
+        with self._lock:
+            current = {address: address for address in addresses}
+            removed = [a for a in self._peers if a not in current]
+            gone = [self._peers.pop(address).client for address in removed]
+            for address in current.values():
+                peer = self._peers.get(address)
+                if peer is None:
+                    client = ServiceClient(
+                        address,
+                        keep_alive=self.keep_alive,
+                        transport=self.transport,
+                        retry=None,
+                    )
+                    peer = _Peer(client, address.load or ServiceLoad())
+                    peer.announced = address.load
+                    self._peers[address] = peer
+                elif address.load is not None and address.load != peer.announced:
+                    # A newer announcement, it replaces the load of the last response
+                    peer.announced = address.load
+                    peer.load = address.load
+
+        for client in gone:
+            client.close()
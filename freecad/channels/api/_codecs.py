@@ -0,0 +1,117 @@
+# SPDX-License: LGPL-3.0-or-later
+# (c) 2025 Frank David Martínez Muñoz. <mnesarco at gmail.com>
+
+"""
+FreeCAD Channels: Payload codecs.
+
+Services accept two content types over http:
+
+- ``application/json``: Compact json, binary arrays are sent as lists.
+- ``application/x-freecad-channels-frame``: A single frame, see _frames.
+  Binary arrays travel as raw bytes.
+
+Any of them may be compressed with a content encoding: ``deflate`` (zlib)
+is fast, ``xz`` (lzma) is smaller but much slower. Bodies are compressed
+only above COMPRESS_MIN_SIZE. The codecs supported by a service are
+announced in discovery, so clients know what they can use in advance.
+"""
+
+from __future__ import annotations
+
+import lzma
+import zlib
+
+CONTENT_JSON = "application/json"
+CONTENT_FRAME = "application/x-freecad-channels-frame"
+
+ENCODING_IDENTITY = "identity"
+ENCODING_DEFLATE = "deflate"
+ENCODING_XZ = "xz"
+
+# Content encodings in order of preference
+ENCODINGS = (ENCODING_DEFLATE, ENCODING_XZ)
+
+# Codec names announced in discovery
+CODEC_FRAME = "frame"
+CODECS = (CODEC_FRAME, *ENCODINGS)
+
+# Smaller bodies are not worth the compression time
+COMPRESS_MIN_SIZE = 64 * 1024
+
+# Fast levels, most of the gain at a fraction of the cost
+DEFLATE_LEVEL = 1
+XZ_PRESET = 1
+
+
+class CodecError(ValueError):
+    """Unsupported or corrupt encoded payload."""
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """
+    Compress data.
+
+    :param data: The data.
+    :param encoding: ENCODING_DEFLATE or ENCODING_XZ.
+    :return: The compressed data.
+    """
+    if encoding == ENCODING_DEFLATE:
+        return zlib.compress(data, DEFLATE_LEVEL)
+    if encoding == ENCODING_XZ:
+        return lzma.compress(data, preset=XZ_PRESET)
+    msg = f"Unsupported content encoding: {encoding}"
+    raise CodecError(msg)
+
+
+def decompress(data: bytes, encoding: str, max_size: int) -> bytes:
+    """
+    Decompress data, refusing to expand beyond max_size bytes.
+
+    :param data: The compressed data.
+    :param encoding: ENCODING_DEFLATE or ENCODING_XZ.
+    :param max_size: Maximum size of the result.
+    :return: The original data.
+    """
+    try:
+        if encoding == ENCODING_DEFLATE:
+            decompressor = zlib.decompressobj()
+            result = decompressor.decompress(data, max_size + 1)
+            complete = decompressor.eof
+        elif encoding == ENCODING_XZ:
+            decompressor = lzma.LZMADecompressor()
+            result = decompressor.decompress(data, max_size + 1)
+            complete = decompressor.eof
+        else:
+            msg = f"Unsupported content encoding: {encoding}"
+            raise CodecError(msg)
+    except (zlib.error, lzma.LZMAError) as ex:
+        msg = f"Corrupt {encoding} data: {ex}"
+        raise CodecError(msg) from ex
+    if len(result) > max_size:
+        msg = f"Decompressed data exceeds {max_size} bytes"
+        raise CodecError(msg)
+    if not complete:
+        msg = f"Truncated {encoding} data"
+        raise CodecError(msg)
+    return result
+
+
+def select_encoding(accepted: str | list[str] | None) -> str | None:
+    """
+    Preferred supported encoding of those accepted by a peer.
+
+    :param accepted: Accept-Encoding header value or list of encodings.
+    :return: The encoding or None if there is no common one.
+    """
+    if not accepted:
+        return None
+    if isinstance(accepted, str):
+        accepted = [item.split(";")[0].strip().lower() for item in accepted.split(",")]
+    for encoding in ENCODINGS:
+        if encoding in accepted:
+            return encoding
+    return None
+
+
+def should_compress(size: int, encoding: str | None) -> bool:
+    return encoding is not None and size >= COMPRESS_MIN_SIZE
@@ -0,0 +1,219 @@
+# SPDX-License: LGPL-3.0-or-later
+# (c) 2025 Frank David Martínez Muñoz. <mnesarco at gmail.com>
+
+"""
+FreeCAD Channels: Background discovery.
+"""
+
+from __future__ import annotations
+
+import select
+import socket
+import threading
+import time
+from contextlib import suppress
+from logging import getLogger
+from typing import TYPE_CHECKING
+
+from ._service import (
+    DISCOVERY_DATAGRAM_SIZE,
+    DISCOVERY_PROBE_INTERVAL,
+    DISCOVERY_SERVICE_ADDR,
+    TID,
+    DiscoveryGroup,
+    ServiceAddress,
+    open_probe_socket,
+    parse_announcements,
+    send_probe,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    DiscoveryEventListener = Callable[[str, ServiceAddress], None]
+
+logger = getLogger("FreeCAD.Channels")
+
+# Seconds without announcements before a service is considered gone
+DISCOVERY_TTL = 10.0
+
+# Discovery events
+SERVICE_ADDED = "added"
+SERVICE_REMOVED = "removed"
+
+
+class DiscoveryListener:
+    """
+    Long-lived discovery listener.
+
+    Keeps a live table of announced services. Registries are probed every
+    DISCOVERY_PROBE_INTERVAL and answer to the private probe socket, so
+    several listeners on the same machine all stay up to date. Entries
+    expire when their announcements stop for ``ttl`` seconds. Lookups are
+    plain dictionary reads, they never wait on the network unless
+    explicitly requested with ``wait_for``.
+    """
+
+    def __init__(
+        self,
+        ttl: float = DISCOVERY_TTL,
+        *,
+        multicast: DiscoveryGroup | None = None,
+    ) -> None:
+        """
+        Initialize the listener.
+
+        :param ttl: Seconds without announcements before an entry expires.
+        :param multicast: Also track services announced to this group.
+        """
+        self.ttl = ttl
+        self.multicast = multicast
+        self._services: dict[ServiceAddress, float] = {}
+        self._listeners: list[DiscoveryEventListener] = []
+        self._cond = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._shutdown = False
+        self._probe_requested = threading.Event()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._shutdown = False
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f"freecad-channels-discovery-{next(TID)}",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._shutdown = True
+        if self._thread is not None:
+            self._thread.join()
+
+    def is_running(self) -> bool:
+        return self._thread is not None
+
+    def add_listener(self, listener: DiscoveryEventListener) -> None:
+        """
+        Register a function called with (event, address) on changes.
+
+        Events are SERVICE_ADDED and SERVICE_REMOVED. Listeners are called
+        from the discovery thread.
+
+        :param listener: The event listener.
+        """
+        self._listeners.append(listener)
+
+    def services(self, filter: list[str] | None = None) -> list[ServiceAddress]:  # noqa: A002
+        """
+        Currently known services, most recently announced first.
+
+        :param filter: list of service names to filter by, defaults to None
+        :return: list of ServiceAddress instances
+        """
+        with self._cond:
+            entries = sorted(self._services.items(), key=lambda e: e[1], reverse=True)
+        return [address for address, _ in entries if filter is None or address.name in filter]
+
+    def find(self, name: str) -> ServiceAddress | None:
+        """
+        Most recently announced service with name, without waiting.
+
+        :param name: Service name.
+        :return: The service address or None.
+        """
+        services = self.services([name])
+        return services[0] if services else None
+
+    def wait_for(self, name: str, timeout: float = 5) -> ServiceAddress | None:
+        """
+        Find a service by name, waiting for its first announcement if unknown.
+
+        :param name: Service name.
+        :param timeout: Maximum seconds to wait.
+        :return: The service address or None.
+        """
+        self.start()
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while (address := self.find(name)) is None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.probe()
+                self._cond.wait(min(remaining, DISCOVERY_PROBE_INTERVAL))
+        return address
+
+    def probe(self) -> None:
+        """Ask running registries to announce their services right now."""
+        self._probe_requested.set()
+
+    def _run(self) -> None:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        # Probe replies are unicast to the probe socket
+        probe = open_probe_socket(self.multicast)
+        listening = [sock, probe]
+        self._probe_requested.set()
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind(DISCOVERY_SERVICE_ADDR)
+            if self.multicast is not None:
+                listening.append(self.multicast.open_socket())
+            wait = min(self.ttl / 2, DISCOVERY_PROBE_INTERVAL)
+            next_probe = 0.0
+            while not self._shutdown:
+                # Announcements to the shared port reach only one of the sockets
+                # bound to it, periodic probes get answers on our own socket.
+                if self._probe_requested.is_set() or time.monotonic() >= next_probe:
+                    self._probe_requested.clear()
+                    send_probe(probe, multicast=self.multicast)
+                    next_probe = time.monotonic() + DISCOVERY_PROBE_INTERVAL
+                for ready in select.select(listening, [], [], wait)[0]:
+                    data, _ = ready.recvfrom(DISCOVERY_DATAGRAM_SIZE)
+                    for address in parse_announcements(data):
+                        self._seen(address)
+                self._expire()
+        except Exception:
+            logger.exception("Discovery listener failed")
+        finally:
+            with suppress(Exception):
+                sock.close()
+            for other in listening[1:]:
+                other.close()
+            self._thread = None
+            self._clear()
+        logger.info("Discovery listener stopped")
+
+    def _seen(self, address: ServiceAddress) -> None:
+        with self._cond:
+            # Reinsert so the stored key carries the latest announced load
+            added = self._services.pop(address, None) is None
+            self._services[address] = time.monotonic()
+            if added:
+                self._cond.notify_all()
+        if added:
+            self._emit(SERVICE_ADDED, address)
+
+    def _expire(self) -> None:
+        limit = time.monotonic() - self.ttl
+        with self._cond:
+            expired = [address for address, seen in self._services.items() if seen < limit]
+            for address in expired:
+                del self._services[address]
+        for address in expired:
+            self._emit(SERVICE_REMOVED, address)
+
+    def _clear(self) -> None:
+        with self._cond:
+            removed, self._services = list(self._services), {}
+        for address in removed:
+            self._emit(SERVICE_REMOVED, address)
+
+    def _emit(self, event: str, address: ServiceAddress) -> None:
+        # A failing listener must not stop the others
+        for listener in self._listeners:
+            try:
+                listener(event, address)
+            except Exception:  # noqa: PERF203
+                logger.exception("Discovery listener callback failed")
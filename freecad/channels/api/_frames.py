@@ -0,0 +1,476 @@
+# SPDX-License: LGPL-3.0-or-later
+# (c) 2025 Frank David Martínez Muñoz. <mnesarco at gmail.com>
+
+"""
+FreeCAD Channels: Binary length-prefixed frame transport.
+
+Wire format of a frame::
+
+    +-------+---------+------+------------+----------+--------+------+
+    | magic | version | kind | header_len | body_len | header | body |
+    | 4s    | B       | B    | I          | I        | json   | raw  |
+    +-------+---------+------+------------+----------+--------+------+
+
+The header is a small json document. Binary values of the payload
+(``bytes``, ``bytearray``, ``memoryview`` and ``array.array``) are moved
+out of the header into the body and replaced by buffer references,
+so array data travels without any text encoding.
+
+Large frames may be compressed. The header of a compressed frame only
+has the encoding and sizes, its body is the compressed header and body
+of the original frame. Clients announce the encodings they accept in
+their request headers and get compressed responses in return.
+"""
+
+from __future__ import annotations
+
+import json
+import socket
+import struct
+import sys
+import threading
+from array import array
+from contextlib import suppress
+from socketserver import StreamRequestHandler, ThreadingTCPServer
+from typing import TYPE_CHECKING, Any
+
+from ._codecs import CodecError, compress, decompress, select_encoding, should_compress
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from typing import BinaryIO
+
+
+FRAME_MAGIC = b"FCCH"
+FRAME_VERSION = 1
+FRAME_PREFIX = struct.Struct("!4sBBII")
+
+# Frame kinds
+FRAME_REQUEST = 1
+FRAME_RESPONSE = 2
+FRAME_BATCH = 3
+FRAME_REPLIES = 4
+FRAME_CANCEL = 5
+
+# Default upper limit for header + body, protects against garbage on the
+# socket. Servers may set their own (see FrameServer).
+MAX_FRAME_SIZE = 128 * 1024 * 1024
+
+_BUFFER_REF = "__buffer__"
+
+
+class FrameError(Exception):
+    """Invalid or truncated frame."""
+
+
+def encode_frame(
+    kind: int,
+    payload: dict[str, Any],
+    *,
+    encoding: str | None = None,
+    accept: tuple[str, ...] = (),
+) -> bytes:
+    """
+    Encode a payload into a frame.
+
+    :param kind: Frame kind (FRAME_REQUEST, FRAME_RESPONSE, FRAME_BATCH).
+    :param payload: json compatible dict, may contain binary values.
+    :param encoding: Compress the frame with this encoding if it is large enough.
+    :param accept: Encodings accepted for the response.
+    :return: The encoded frame.
+    """
+    buffers: list[bytes | memoryview] = []
+    header = {"payload": _extract_buffers(payload, buffers)}
+    if buffers:
+        header["byteorder"] = sys.byteorder
+    if accept:
+        header["accept"] = list(accept)
+    header_bytes = _dumps(header)
+    body_len = sum(len(b) for b in buffers)
+    if should_compress(len(header_bytes) + body_len, encoding):
+        inner = b"".join((header_bytes, *buffers))
+        buffers = [compress(inner, encoding)]
+        wrapper = {"encoding": encoding, "header": len(header_bytes), "size": len(inner)}
+        header_bytes = _dumps(wrapper)
+        body_len = len(buffers[0])
+    prefix = FRAME_PREFIX.pack(FRAME_MAGIC, FRAME_VERSION, kind, len(header_bytes), body_len)
+    return b"".join((prefix, header_bytes, *buffers))
+
+
+def decode_frame(header_bytes: bytes, body: bytes) -> dict[str, Any]:
+    """
+    Decode header and body of a frame into the original payload.
+
+    :param header_bytes: The raw json header.
+    :param body: The raw body with the binary buffers.
+    :return: The payload with binary values restored.
+    :raises FrameError: If the frame content is invalid.
+    """
+    return _payload(*_unwrap(_loads(header_bytes), body))
+
+
+def read_frame(stream: BinaryIO) -> tuple[int, dict[str, Any]] | None:
+    """
+    Read one frame from a binary stream.
+
+    :param stream: Readable binary stream (socket file).
+    :return: Tuple (kind, payload) or None if the stream is closed.
+    """
+    frame = read_frame_sized(stream)
+    return None if frame is None else frame[:2]
+
+
+def read_frame_sized(stream: BinaryIO) -> tuple[int, dict[str, Any], int] | None:
+    """
+    Read one frame from a binary stream, see read_frame.
+
+    :param stream: Readable binary stream (socket file).
+    :return: Tuple (kind, payload, frame size in bytes) or None if the stream is closed.
+    """
+    frame = _read_frame(stream)
+    if frame is None:
+        return None
+    kind, header, body, size = frame
+    return kind, _payload(header, body), size
+
+
+def parse_prefix(prefix: bytes, max_size: int = MAX_FRAME_SIZE) -> tuple[int, int, int]:
+    """
+    Validate the fixed size prefix of a frame.
+
+    :param prefix: FRAME_PREFIX.size bytes.
+    :param max_size: Upper limit for header + body.
+    :return: Tuple (kind, header length, body length).
+    """
+    magic, version, kind, header_len, body_len = FRAME_PREFIX.unpack(prefix)
+    if magic != FRAME_MAGIC or version != FRAME_VERSION:
+        msg = "Invalid frame prefix"
+        raise FrameError(msg)
+    if header_len + body_len > max_size:
+        msg = f"Frame too large: {header_len + body_len} bytes"
+        raise FrameError(msg)
+    return kind, header_len, body_len
+
+
+def _read_frame(stream: BinaryIO) -> tuple[int, dict[str, Any], bytes, int] | None:
+    raw = _read_raw_frame(stream)
+    if raw is None:
+        return None
+    kind, header, body = raw
+    size = FRAME_PREFIX.size + len(header) + len(body)
+    return kind, *_unwrap(_loads(header), body), size
+
+
+def _read_raw_frame(
+    stream: BinaryIO,
+    max_size: int = MAX_FRAME_SIZE,
+) -> tuple[int, bytes, bytes] | None:
+    # Frame bytes, not decoded. Errors here leave the stream out of sync.
+    prefix = _read_exact(stream, FRAME_PREFIX.size)
+    if prefix is None:
+        return None
+    kind, header_len, body_len = parse_prefix(prefix, max_size)
+    header = _read_exact(stream, header_len)
+    body = _read_exact(stream, body_len) if body_len else b""
+    if header is None or body is None:
+        msg = "Truncated frame"
+        raise FrameError(msg)
+    return kind, header, body
+
+
+def _loads(header_bytes: bytes) -> dict[str, Any]:
+    try:
+        header = json.loads(header_bytes.decode("utf-8"))
+    except ValueError as ex:  # Includes JSONDecodeError and UnicodeDecodeError
+        msg = f"Invalid frame header: {ex}"
+        raise FrameError(msg) from ex
+    if not isinstance(header, dict):
+        msg = "Invalid frame header: not an object"
+        raise FrameError(msg)
+    return header
+
+
+def _unwrap(
+    header: dict[str, Any],
+    body: bytes,
+    max_size: int = MAX_FRAME_SIZE,
+) -> tuple[dict[str, Any], bytes]:
+    # Header and body of the original frame if this one is compressed
+    encoding = header.get("encoding")
+    if encoding is None:
+        return header, body
+    try:
+        inner = decompress(body, encoding, max_size)
+        split, size = int(header["header"]), int(header["size"])
+    except CodecError as ex:
+        raise FrameError(str(ex)) from ex
+    except (KeyError, TypeError, ValueError) as ex:
+        msg = "Invalid compressed frame"
+        raise FrameError(msg) from ex
+    if len(inner) != size or split > len(inner):
+        msg = "Invalid compressed frame"
+        raise FrameError(msg)
+    return _loads(inner[:split]), inner[split:]
+
+
+def _payload(header: dict[str, Any], body: bytes) -> dict[str, Any]:
+    swap = header.get("byteorder", sys.byteorder) != sys.byteorder
+    try:
+        payload = _restore_buffers(header["payload"], memoryview(body), swap)
+    except (KeyError, TypeError, ValueError) as ex:
+        # Missing payload, malformed buffer reference or bad array typecode
+        msg = f"Invalid frame payload: {ex!r}"
+        raise FrameError(msg) from ex
+    if not isinstance(payload, dict):
+        msg = "Invalid frame payload: not an object"
+        raise FrameError(msg)
+    return payload
+
+
+def _dumps(header: dict[str, Any]) -> bytes:
+    return json.dumps(header, separators=(",", ":")).encode("utf-8")
+
+
+def _read_exact(stream: BinaryIO, size: int) -> bytes | None:
+    data = stream.read(size)
+    if not data:
+        return None
+    if len(data) < size:
+        msg = "Truncated frame"
+        raise FrameError(msg)
+    return data
+
+
+def _extract_buffers(value: Any, buffers: list[bytes | memoryview]) -> Any:
+    if isinstance(value, dict):
+        return {k: _extract_buffers(v, buffers) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_extract_buffers(v, buffers) for v in value]
+    if isinstance(value, array):
+        buffers.append(memoryview(value).cast("B"))
+        return {
+            _BUFFER_REF: len(buffers) - 1,
+            "size": len(buffers[-1]),
+            "typecode": value.typecode,
+        }
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        buffers.append(memoryview(value).cast("B"))
+        return {_BUFFER_REF: len(buffers) - 1, "size": len(buffers[-1])}
+    return value
+
+
+def _restore_buffers(
+    value: Any,
+    body: memoryview,
+    swap: bool,  # noqa: FBT001
+    offset: list[int] | None = None,
+) -> Any:
+    # Buffers are stored in the body in traversal order, which is the same
+    # order used by _extract_buffers, so a running offset is enough.
+    if offset is None:
+        offset = [0]
+    if isinstance(value, dict):
+        if _BUFFER_REF in value:
+            start = offset[0]
+            end = start + value["size"]
+            if end > len(body):
+                msg = "Buffer reference out of frame bounds"
+                raise FrameError(msg)
+            offset[0] = end
+            typecode = value.get("typecode")
+            if typecode is None:
+                return bytes(body[start:end])
+            result = array(typecode)
+            result.frombytes(body[start:end])
+            if swap:
+                result.byteswap()
+            return result
+        return {k: _restore_buffers(v, body, swap, offset) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_restore_buffers(v, body, swap, offset) for v in value]
+    return value
+
+
+class FrameServer(ThreadingTCPServer):
+    """
+    Threaded TCP server speaking the frame protocol.
+
+    Each connection is persistent: request frames are read in a loop and
+    every request gets exactly one response frame.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(
+        self,
+        server_address: tuple[str, int],
+        handlers: dict[int, Callable[[dict[str, Any]], dict[str, Any]]],
+        *,
+        idle_timeout: float | None = None,
+        traffic: Callable[[dict[str, Any], int, int], None] | None = None,
+        max_frame_size: int | None = None,
+    ) -> None:
+        """
+        Initialize the server.
+
+        :param server_address: (host, port) to bind.
+        :param handlers: Functions by frame kind, called with each request payload.
+            They return the response payload.
+        :param idle_timeout: Seconds before an idle connection is closed.
+        :param traffic: Function called with (request payload, bytes in, bytes out)
+            after each response.
+        :param max_frame_size: Upper limit for header + body of request frames,
+            defaults to MAX_FRAME_SIZE.
+        """
+        self.handlers = handlers
+        self.idle_timeout = idle_timeout
+        self.traffic = traffic
+        self.max_frame_size = max_frame_size or MAX_FRAME_SIZE
+        super().__init__(server_address, _FrameHandler)
+
+
+class _FrameHandler(StreamRequestHandler):
+    disable_nagle_algorithm = True
+    server: FrameServer
+
+    def setup(self) -> None:
+        self.timeout = self.server.idle_timeout
+        super().setup()
+
+    def handle(self) -> None:
+        max_size = self.server.max_frame_size
+        while True:
+            try:
+                raw = _read_raw_frame(self.rfile, max_size)
+            except FrameError as ex:
+                # The stream is out of sync, answer and close
+                with suppress(OSError):
+                    self._reply({"status": "error", "message": str(ex)})
+                return
+            except OSError:
+                return
+            if raw is None:
+                return
+            kind, header_bytes, body = raw
+            size = FRAME_PREFIX.size + len(header_bytes) + len(body)
+            header: dict[str, Any] = {}
+            try:
+                header, body = _unwrap(_loads(header_bytes), body, max_size)
+                payload = _payload(header, body)
+            except FrameError as ex:
+                # The frame was read whole, the connection can go on
+                payload = {}
+                response = {"status": "error", "message": str(ex)}
+            else:
+                handler = self.server.handlers.get(kind)
+                if handler is None:
+                    response = {"status": "error", "message": f"Unexpected frame kind {kind}"}
+                else:
+                    response = handler(payload)
+            sent = self._reply(response, header.get("accept"))
+            if self.server.traffic is not None:
+                self.server.traffic(payload, size, sent)
+
+    def _reply(self, response: dict[str, Any], accept: list[str] | None = None) -> int:
+        data = encode_frame(FRAME_RESPONSE, response, encoding=select_encoding(accept))
+        self.wfile.write(data)
+        return len(data)
+
+
+class FrameConnection:
+    """
+    Persistent client connection to a FrameServer.
+
+    The socket is opened lazily and reopened once if the peer closed
+    a previously used connection. Calls are serialized with a lock.
+    """
+
+    def __init__(self, host: str, port: int, *, encoding: str | None = None) -> None:
+        """
+        Initialize the connection.
+
+        :param host: Host of the server.
+        :param port: Frame port of the server.
+        :param encoding: Compress large frames in both directions with this
+            encoding, the server must support it.
+        """
+        self.host = host
+        self.port = port
+        self.encoding = encoding
+        self._sock: socket.socket | None = None
+        self._file: BinaryIO | None = None
+        self._lock = threading.Lock()
+
+    def request(
+        self,
+        payload: dict[str, Any],
+        timeout: float | None = None,
+        *,
+        kind: int = FRAME_REQUEST,
+    ) -> dict[str, Any]:
+        """
+        Send a request frame and wait for its response.
+
+        :param payload: The request payload.
+        :param timeout: Socket timeout in seconds.
+        :param kind: Frame kind of the request.
+        :return: The response payload.
+        """
+        return self.exchange(payload, timeout, kind=kind)[0]
+
+    def exchange(
+        self,
+        payload: dict[str, Any],
+        timeout: float | None = None,
+        *,
+        kind: int = FRAME_REQUEST,
+    ) -> tuple[dict[str, Any], int, int]:
+        """
+        Variant of request that also reports the traffic.
+
+        :return: Tuple (response payload, bytes sent, bytes received).
+        """
+        accept = (self.encoding,) if self.encoding else ()
+        frame = encode_frame(kind, payload, encoding=self.encoding, accept=accept)
+        with self._lock:
+            reused = self._sock is not None
+            try:
+                return self._roundtrip(frame, timeout)
+            except Exception as ex:
+                # The stream state is unknown after any failure
+                self._close()
+                if not reused or not isinstance(ex, (ConnectionError, EOFError)):
+                    raise
+            # Stale connection closed by the peer, retry on a fresh one.
+            try:
+                return self._roundtrip(frame, timeout)
+            except Exception:
+                self._close()
+                raise
+
+    def _roundtrip(self, frame: bytes, timeout: float | None) -> tuple[dict[str, Any], int, int]:
+        if self._sock is None:
+            self._sock = socket.create_connection((self.host, self.port), timeout=timeout)
+            self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._file = self._sock.makefile("rb")
+        else:
+            self._sock.settimeout(timeout)
+        self._sock.sendall(frame)
+        response = read_frame_sized(self._file)
+        if response is None:
+            msg = "Connection closed by peer"
+            raise EOFError(msg)
+        return response[1], len(frame), response[2]
+
+    def _close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def close(self) -> None:
+        with self._lock:
+            self._close()
@@ -0,0 +1,243 @@
+# SPDX-License: LGPL-3.0-or-later
+# (c) 2025 Frank David Martínez Muñoz. <mnesarco at gmail.com>
+
+"""
+FreeCAD Channels: Metrics.
+
+Counters and histograms are plain integers updated under a lock, cheap
+enough to stay always on. Snapshots are json compatible dicts, served
+by services on their metrics path.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import asdict
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from ._types import DrainStats
+
+# Upper bounds of the latency histogram buckets, in seconds
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+# Distinct request names with their own handler histogram, others are merged
+MAX_METRIC_NAMES = 64
+OTHER_NAMES = "*"
+
+
+class Histogram:
+    """
+    Fixed bucket histogram of durations.
+
+    Not thread safe, owners update it under their own lock.
+    """
+
+    __slots__ = ("bounds", "count", "counts", "max", "total")
+
+    def __init__(self, bounds: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """
+        Upper bound of the bucket containing the q quantile.
+
+        :param q: Quantile in [0, 1].
+        :return: Seconds, the maximum observed value for the last bucket.
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        # The last, unbounded bucket is left out, it ends at the maximum
+        for bound, count in zip(self.bounds, self.counts, strict=False):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def snapshot(self) -> dict[str, Any]:
+        bounds = [*self.bounds, "+Inf"]
+        buckets = zip(bounds, self.counts, strict=True)
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+            "buckets": [[bound, count] for bound, count in buckets if count],
+        }
+
+
+class ServiceMetrics:
+    """
+    Service side instrumentation.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.received = 0
+        self.rejected = 0
+        self.handled = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.queue_high_water = 0
+        # Time from enqueue to the start of the handler
+        self.wait = Histogram()
+        self.handler = Histogram()
+        self.handler_by_name: dict[str, Histogram] = {}
+        # Set by the controller driving the service
+        self.drain: DrainStats | None = None
+
+    def record_received(self, count: int, depth: int) -> None:
+        """
+        Record requests accepted into the queue.
+
+        :param count: Number of requests.
+        :param depth: Queue depth after enqueuing them.
+        """
+        with self._lock:
+            self.received += count
+            self.queue_high_water = max(self.queue_high_water, depth)
+
+    def record_rejected(self, count: int) -> None:
+        with self._lock:
+            self.rejected += count
+
+    def record_cancelled(self) -> None:
+        with self._lock:
+            self.cancelled += 1
+
+    def record_handled(
+        self,
+        name: str,
+        wait: float | None,
+        elapsed: float,
+        *,
+        failed: bool,
+    ) -> None:
+        """
+        Record a handled request.
+
+        :param name: Request name.
+        :param wait: Seconds the request waited in the queue, None if unknown.
+        :param elapsed: Seconds spent in the handler.
+        :param failed: The handler raised an exception.
+        """
+        with self._lock:
+            self.handled += 1
+            if failed:
+                self.failed += 1
+            if wait is not None:
+                self.wait.observe(wait)
+            self.handler.observe(elapsed)
+            histogram = self.handler_by_name.get(name)
+            if histogram is None:
+                if len(self.handler_by_name) >= MAX_METRIC_NAMES:
+                    name = OTHER_NAMES
+                histogram = self.handler_by_name.setdefault(name, Histogram())
+            histogram.observe(elapsed)
+
+    def record_traffic(self, bytes_in: int, bytes_out: int) -> None:
+        with self._lock:
+            self.bytes_in += bytes_in
+            self.bytes_out += bytes_out
+
+    def snapshot(self) -> dict[str, Any]:
+        """Json compatible copy of all the metrics."""
+        with self._lock:
+            snapshot = {
+                "uptime": time.time() - self.started,
+                "received": self.received,
+                "rejected": self.rejected,
+                "handled": self.handled,
+                "failed": self.failed,
+                "cancelled": self.cancelled,
+                "bytes_in": self.bytes_in,
+                "bytes_out": self.bytes_out,
+                "queue_high_water": self.queue_high_water,
+                "wait": self.wait.snapshot(),
+                "handler": self.handler.snapshot(),
+                "handler_by_name": {
+                    name: histogram.snapshot() for name, histogram in self.handler_by_name.items()
+                },
+            }
+        if self.drain is not None:
+            snapshot["drain"] = asdict(self.drain)
+        return snapshot
+
+
+class ClientMetrics:
+    """
+    Client side instrumentation.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.sent = 0
+        self.rejected = 0
+        self.retries = 0
+        self.errors = 0
+        self.bytes_out = 0
+        self.bytes_in = 0
+        self.roundtrip = Histogram()
+
+    def record_roundtrip(self, elapsed: float, bytes_out: int, bytes_in: int) -> None:
+        with self._lock:
+            self.sent += 1
+            self.bytes_out += bytes_out
+            self.bytes_in += bytes_in
+            self.roundtrip.observe(elapsed)
+
+    def record_rejected(self, *, retry: bool) -> None:
+        with self._lock:
+            self.rejected += 1
+            if retry:
+                self.retries += 1
+
+    def record_error(self) -> None:
+        with self._lock:
+            self.errors += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        """Json compatible copy of all the metrics."""
+        with self._lock:
+            return {
+                "sent": self.sent,
+                "rejected": self.rejected,
+                "retries": self.retries,
+                "errors": self.errors,
+                "bytes_out": self.bytes_out,
+                "bytes_in": self.bytes_in,
+                "roundtrip": self.roundtrip.snapshot(),
+            }
@@ -7,8 +7,24 @@ FreeCAD Channels: Qt Service dispatcher.
 
 from __future__ import annotations
 
+import threading
+import time
+from typing import Any
+
 from ._service import Channel, Service, ServiceRegistry, ServiceRequestHandler
-from ._types import ServiceController
+from ._types import DrainStats, ServiceController
+
+
+def _qt_core() -> tuple[Any, Any, Any, Any]:
+    # QObject, Qt, QTimer and Signal of the available PySide
+    try:
+        from PySide6.QtCore import QObject, Qt, QTimer, Signal  # type: ignore
+    except ImportError:
+        try:
+            from PySide2.QtCore import QObject, Qt, QTimer, Signal  # type: ignore
+        except ImportError:
+            from PySide.QtCore import QObject, Qt, QTimer, Signal  # type: ignore
+    return QObject, Qt, QTimer, Signal
 
 
 class channel_handler(Channel):  # noqa: N801
@@ -20,10 +36,10 @@ class channel_handler(Channel):  # noqa: N801
 
     class Controller(ServiceController):
         """
-        Service Controller for Blender.
+        Service Controller for Qt.
 
-        This class is the Glue between FreeCAD Channels service and
-        Blender internal threading/state system.
+        Requests are handled in the Qt thread, either from a poll timer
+        or, in push mode, as soon as server threads enqueue them.
         """
 
         def __init__(
@@ -31,44 +47,86 @@ class channel_handler(Channel):  # noqa: N801
             service: Service,
             handler: ServiceRequestHandler,
             poll: float = 0.5,
+            *,
+            push: bool = False,
         ) -> None:
             """
             Initialize the Controller.
 
             This constructor should not be called directly. It is managed.
 
-            :param service: The service instance to control in Blender.
+            :param service: The service instance to control in Qt.
             :param handler: A function to handle service requests.
-            :param poll: The polling interval in seconds.
+            :param poll: The polling interval in seconds. In push mode it is
+                the interval of the fallback timer, 0 disables the fallback.
+            :param push: Wake up the Qt thread as soon as requests are enqueued
+                instead of waiting for the next poll.
             """
-            try:
-                from PySide6.QtCore import QTimer  # type: ignore
-            except ImportError:
-                try:
-                    from PySide2.QtCore import QTimer  # type: ignore
-                except ImportError:
-                    from PySide.QtCore import QTimer  # type: ignore
+            QObject, Qt, QTimer, Signal = _qt_core()
+
+            # Set by server threads, cleared by the Qt thread before draining,
+            # so a burst of requests posts a single wake up event.
+            wake_pending = threading.Event()
+            stats = DrainStats(last_interval=poll)
+            service.metrics.drain = stats
 
             def timeout() -> None:
+                wake_pending.clear()
                 if not service.is_running():
                     service.start()
+                start = time.perf_counter()
+                handled = 0
                 for data in service:
-                    handler(data)
+                    service.dispatch(data, handler)
+                    handled += 1
+                stats.record(handled, service.pending(), time.perf_counter() - start, poll)
 
             timer = QTimer()
             timer.setInterval(int(poll * 1000))
             timer.timeout.connect(timeout)
             self.timer = timer
             self.service = service
+            self.stats = stats
+            self.push = push
+            self._fallback = not push or poll > 0
+            self._active = False
+
+            if push:
+
+                class Wakeup(QObject):
+                    requested = Signal()
+
+                def wakeup() -> None:
+                    if not wake_pending.is_set():
+                        wake_pending.set()
+                        self._wakeup.requested.emit()
+
+                def on_wakeup() -> None:
+                    if self._active:
+                        timeout()
+
+                # Created in the Qt thread, so queued emissions from server
+                # threads are delivered in the Qt event loop.
+                self._wakeup = Wakeup()
+                self._wakeup.requested.connect(on_wakeup, Qt.QueuedConnection)
+                service.add_enqueue_listener(wakeup)
+                self._timeout = timeout
 
         def stop(self) -> None:
+            self._active = False
             if self.timer.isActive():
                 self.timer.stop()
             self.service.shutdown()
 
         def start(self) -> None:
-            if not self.timer.isActive():
+            if self.push and not self._active:
+                self._active = True
+                # Drain whatever arrived while stopped and start the service
+                self._timeout()
+            if self._fallback and not self.timer.isActive():
                 self.timer.start()
 
         def is_running(self) -> bool:
+            if self.push:
+                return self._active
             return self.timer.isActive()
@@ -0,0 +1,283 @@
+# SPDX-License: LGPL-3.0-or-later
+# (c) 2025 Frank David Martínez Muñoz. <mnesarco at gmail.com>
+
+"""
+FreeCAD Channels: Request queues.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from queue import Full, Queue
+from time import monotonic
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Hashable, Sequence
+
+# Priority lanes, lower value is handled first
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+# Actions classified by request_priority when the request has no explicit priority
+CONTROL_ACTIONS = frozenset({"ping", "cancel", "select", "selection_changed"})
+BULK_ACTIONS = frozenset({"import_file", "mesh_buffer"})
+
+# Maximum consecutive requests taken from higher lanes while a lower lane waits
+LANE_BURST = 8
+
+
+def lane_capacity(maxsize: int) -> int:
+    """
+    Default capacity of the lower lanes of a LaneQueue.
+
+    The lower lanes leave 20% of maxsize free for the highest lane.
+
+    :param maxsize: Capacity of the whole queue, 0 is unbounded.
+    :return: Capacity of each lower lane, 0 is unbounded.
+    """
+    if maxsize <= 0:
+        return 0
+    return max(1, maxsize - max(1, maxsize // 5))
+
+
+def request_key(request: Any) -> Hashable | None:
+    """Default coalescing key: the key field of a ServiceRequest."""
+    return getattr(request, "key", None)
+
+
+def request_priority(request: Any) -> int:
+    """
+    Default priority of a ServiceRequest.
+
+    The explicit priority field wins, otherwise control actions go to the
+    high lane, bulk actions to the low lane and everything else to the
+    normal lane.
+    """
+    priority = getattr(request, "priority", None)
+    if priority is not None:
+        return priority
+    data = getattr(request, "data", None)
+    action = data.get("action") if isinstance(data, dict) else None
+    if action in CONTROL_ACTIONS:
+        return PRIORITY_HIGH
+    if action in BULK_ACTIONS:
+        return PRIORITY_LOW
+    return PRIORITY_NORMAL
+
+
+class CoalescingQueue(Queue):
+    """
+    FIFO queue that collapses superseded requests.
+
+    A request with the same key as a pending one replaces it in place:
+    it keeps the position of the old one and does not take a new slot.
+    Requests without key are always appended. The replaced request is
+    passed to ``on_supersede`` if set, it is never returned by get.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 0,
+        key: Callable[[Any], Hashable | None] | None = request_key,
+    ) -> None:
+        """
+        Initialize the queue.
+
+        :param maxsize: Maximum number of pending requests, 0 is unbounded.
+        :param key: Function to get the coalescing key of a request,
+            None disables coalescing.
+        """
+        self.key = key or (lambda _: None)
+        self.superseded = 0
+        # Called with each replaced request, outside of the queue lock
+        self.on_supersede: Callable[[Any], None] | None = None
+        super().__init__(maxsize)
+
+    def _init(self, _maxsize: int) -> None:
+        # Entries are single item lists so they can be replaced in place
+        self.queue: deque[list[Any]] = deque()
+        self._pending: dict[Hashable, list[Any]] = {}
+
+    def _qsize(self) -> int:
+        return len(self.queue)
+
+    def _put(self, item: Any) -> None:
+        entry = [item]
+        self._append(entry)
+        key = self.key(item)
+        if key is not None:
+            self._pending[key] = entry
+
+    def _append(self, entry: list[Any]) -> None:
+        self.queue.append(entry)
+
+    def _get(self) -> Any:
+        return self._forget(self.queue.popleft())
+
+    def _forget(self, entry: list[Any]) -> Any:
+        item = entry[0]
+        key = self.key(item)
+        if key is not None and self._pending.get(key) is entry:
+            del self._pending[key]
+        return item
+
+    def _replaces(self, item: Any) -> bool:
+        key = self.key(item)
+        return key is not None and key in self._pending
+
+    def supersedes(self, item: Any) -> bool:
+        """Check if item would replace a pending request."""
+        with self.mutex:
+            return self._replaces(item)
+
+    def has_room(self, items: Sequence[Any]) -> bool:
+        """
+        Check if all items can be put without blocking.
+
+        :param items: Items to put.
+        :return: True if there is room for all of them.
+        """
+        with self.mutex:
+            return self._has_room(items)
+
+    def _has_room(self, items: Sequence[Any]) -> bool:
+        if self.maxsize <= 0:
+            return True
+        return self.maxsize - self._qsize() >= len(self._new_items(items))
+
+    def _new_items(self, items: Sequence[Any]) -> list[Any]:
+        # Items that take a new slot: not replacing pending ones nor
+        # replacing another item of the same batch.
+        keys = set()
+        new_items = []
+        for item in items:
+            key = self.key(item)
+            if key is None or (key not in self._pending and key not in keys):
+                new_items.append(item)
+            if key is not None:
+                keys.add(key)
+        return new_items
+
+    def put(self, item: Any, block: bool = True, timeout: float | None = None) -> None:  # noqa: FBT001, FBT002
+        key = self.key(item)
+        if key is not None:
+            with self.mutex:
+                entry = self._pending.get(key)
+                if entry is not None:
+                    replaced, entry[0] = entry[0], item
+                    self.superseded += 1
+            if entry is not None:
+                if self.on_supersede is not None:
+                    self.on_supersede(replaced)
+                return
+        super().put(item, block, timeout)
+
+
+class LaneQueue(CoalescingQueue):
+    """
+    Queue with priority lanes.
+
+    Requests are taken from the highest priority lane first. To avoid
+    starvation, each lane has its own capacity limit and every waiting
+    lower lane is served after ``burst`` consecutive requests of higher
+    lanes, counted per lane.
+    Coalescing works as in CoalescingQueue within the lane of the request.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        maxsize: int = 0,
+        key: Callable[[Any], Hashable | None] | None = None,
+        *,
+        priority: Callable[[Any], int] = request_priority,
+        lanes: int = 3,
+        lane_sizes: Sequence[int] | None = None,
+        burst: int = LANE_BURST,
+    ) -> None:
+        """
+        Initialize the queue.
+
+        :param maxsize: Maximum number of pending requests in all lanes, 0 is unbounded.
+        :param key: Function to get the coalescing key of a request,
+            None (default) disables coalescing.
+        :param priority: Function to get the lane of a request, 0 is the highest.
+            Out of range values are clamped.
+        :param lanes: Number of lanes.
+        :param lane_sizes: Capacity of each lane, 0 is unbounded. By default the
+            lower lanes leave 20% of maxsize free for the highest lane.
+        :param burst: Consecutive requests from higher lanes before serving
+            a waiting lower lane.
+        """
+        self.priority = priority
+        self.lanes = lanes
+        if lane_sizes is None:
+            lane_sizes = [0] + [lane_capacity(maxsize)] * (lanes - 1)
+        if len(lane_sizes) != lanes:
+            msg = "lane_sizes must have one value per lane"
+            raise ValueError(msg)
+        self.lane_sizes = tuple(lane_sizes)
+        self.burst = burst
+        super().__init__(maxsize, key)
+
+    def _init(self, maxsize: int) -> None:
+        super()._init(maxsize)
+        self.queue = [deque() for _ in range(self.lanes)]
+        # Consecutive requests served from higher lanes while each lane waited
+        self._waited = [0] * self.lanes
+
+    def _lane(self, item: Any) -> int:
+        return min(max(self.priority(item), 0), self.lanes - 1)
+
+    def _qsize(self) -> int:
+        return sum(len(lane) for lane in self.queue)
+
+    def lane_size(self, lane: int) -> int:
+        """Number of pending requests in a lane."""
+        with self.mutex:
+            return len(self.queue[lane])
+
+    def _append(self, entry: list[Any]) -> None:
+        self.queue[self._lane(entry[0])].append(entry)
+
+    def _get(self) -> Any:
+        pending = [i for i, lane in enumerate(self.queue) if lane]
+        # A lower lane that waited long enough is served once, every
+        # waiting lane has its own count so none of them starves.
+        served = next((i for i in pending[1:] if self._waited[i] >= self.burst), pending[0])
+        for i in range(self.lanes):
+            if i == served or not self.queue[i]:
+                self._waited[i] = 0
+            elif i > served:
+                self._waited[i] += 1
+        return self._forget(self.queue[served].popleft())
+
+    def _lane_full(self, item: Any) -> bool:
+        lane = self._lane(item)
+        size = self.lane_sizes[lane]
+        return size > 0 and len(self.queue[lane]) >= size and not self._replaces(item)
+
+    def _has_room(self, items: Sequence[Any]) -> bool:
+        if not super()._has_room(items):
+            return False
+        needed = [0] * self.lanes
+        for item in self._new_items(items):
+            needed[self._lane(item)] += 1
+        return all(
+            size <= 0 or len(lane) + n <= size
+            for size, lane, n in zip(self.lane_sizes, self.queue, needed, strict=True)
+        )
+
+    def put(self, item: Any, block: bool = True, timeout: float | None = None) -> None:  # noqa: FBT001, FBT002
+        with self.not_full:
+            if self._lane_full(item):
+                if not block:
+                    raise Full
+                deadline = None if timeout is None else monotonic() + timeout
+                while self._lane_full(item):
+                    remaining = None if deadline is None else deadline - monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise Full
+                    self.not_full.wait(remaining)
+        super().put(item, block, timeout)
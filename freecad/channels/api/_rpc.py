@@ -0,0 +1,251 @@
+# SPDX-License: LGPL-3.0-or-later
+# (c) 2025 Frank David Martínez Muñoz. <mnesarco at gmail.com>
+
+"""
+FreeCAD Channels: Request/response correlation.
+
+A request sent with ``reply_to`` set is a call. When the service handler
+returns, its result is stored in the service ``ReplyStore`` under that id
+and the caller collects it with a long poll. Calls replaced in the queue
+by a newer request with the same key are replied as cancelled. On the client side,
+``PendingCalls`` keeps one ``Future`` per id and resolves them from a
+background poller thread.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import suppress
+from itertools import count
+from logging import getLogger
+from typing import TYPE_CHECKING, Any
+from uuid import uuid4
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+logger = getLogger("FreeCAD.Channels")
+
+# Seconds a reply is kept on the service waiting to be collected
+REPLY_TTL = 300.0
+
+# Maximum time the service holds a reply long poll
+REPLY_MAX_WAIT = 5.0
+
+# Long poll time requested by the client poller
+REPLY_POLL_WAIT = 1.0
+
+# Pause between polls when the service does not hold long polls
+REPLY_POLL_INTERVAL = 0.05
+
+_poller_ids = count(1)
+
+
+class RemoteError(RuntimeError):
+    """The remote handler failed while processing a call."""
+
+
+def new_reply_id() -> int:
+    """Random correlation id, unique enough across processes."""
+    return uuid4().int >> 66
+
+
+class ReplyStore:
+    """
+    Service side store of call results waiting to be collected.
+    """
+
+    def __init__(self, ttl: float = REPLY_TTL, max_wait: float = REPLY_MAX_WAIT) -> None:
+        """
+        Initialize the store.
+
+        :param ttl: Seconds an uncollected reply or cancellation is kept.
+        :param max_wait: Upper limit for long polls, 0 disables long polling.
+        """
+        self.ttl = ttl
+        self.max_wait = max_wait
+        self._replies: dict[int, tuple[float, dict[str, Any]]] = {}
+        self._cancelled: dict[int, float] = {}
+        self._cond = threading.Condition()
+
+    def put(self, reply_id: int, payload: dict[str, Any]) -> None:
+        """
+        Store a reply and wake up waiting collectors.
+
+        :param reply_id: Correlation id of the call.
+        :param payload: Reply payload (status, result or message).
+        """
+        now = time.monotonic()
+        with self._cond:
+            self._expire(now)
+            if self._cancelled.pop(reply_id, None) is not None:
+                return
+            self._replies[reply_id] = (now, {"id": reply_id, **payload})
+            self._cond.notify_all()
+
+    def cancel(self, ids: Iterable[int]) -> None:
+        """
+        Cancel calls, their replies are discarded.
+
+        :param ids: Correlation ids of the calls to cancel.
+        """
+        now = time.monotonic()
+        with self._cond:
+            for reply_id in ids:
+                if self._replies.pop(reply_id, None) is None:
+                    self._cancelled[reply_id] = now
+
+    def is_cancelled(self, reply_id: int) -> bool:
+        with self._cond:
+            return reply_id in self._cancelled
+
+    def collect(self, ids: Iterable[int], wait: float = 0) -> list[dict[str, Any]]:
+        """
+        Take the available replies for ids.
+
+        :param ids: Correlation ids of interest.
+        :param wait: Seconds to wait for at least one reply.
+        :return: Reply payloads, possibly empty.
+        """
+        ids = set(ids)
+        deadline = time.monotonic() + min(wait, self.max_wait)
+        with self._cond:
+            while True:
+                ready = ids & self._replies.keys()
+                remaining = deadline - time.monotonic()
+                if ready or remaining <= 0:
+                    return [self._replies.pop(reply_id)[1] for reply_id in ready]
+                self._cond.wait(remaining)
+
+    def _expire(self, now: float) -> None:
+        limit = now - self.ttl
+        for reply_id in [k for k, (t, _) in self._replies.items() if t < limit]:
+            del self._replies[reply_id]
+        for reply_id in [k for k, t in self._cancelled.items() if t < limit]:
+            del self._cancelled[reply_id]
+
+
+class PendingCalls:
+    """
+    Client side futures waiting for replies.
+
+    A poller thread runs only while there are calls in flight.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[list[int], float], list[dict[str, Any]]],
+        cancel: Callable[[list[int]], None],
+    ) -> None:
+        """
+        Initialize the pending calls table.
+
+        :param fetch: Function (ids, wait) -> replies, long polls the service.
+        :param cancel: Function (ids) -> None, notifies cancelled calls to the service.
+        """
+        self._fetch = fetch
+        self._cancel = cancel
+        self._lock = threading.Lock()
+        self._calls: dict[int, tuple[Future, float | None]] = {}
+        self._cancelled: list[int] = []
+        self._thread: threading.Thread | None = None
+
+    def add(self, reply_id: int, timeout: float | None = None) -> Future:
+        """
+        Register a call in flight.
+
+        :param reply_id: Correlation id of the call.
+        :param timeout: Seconds to wait for the reply, None waits forever.
+        :return: Future resolved with the result of the call.
+        """
+        future = Future()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        future.add_done_callback(lambda f: self._on_done(reply_id, f))
+        with self._lock:
+            self._calls[reply_id] = (future, deadline)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name=f"freecad-channels-replies-{next(_poller_ids)}",
+                    daemon=True,
+                )
+                self._thread.start()
+        return future
+
+    def fail(self, reply_id: int, ex: BaseException) -> None:
+        with self._lock:
+            call = self._calls.pop(reply_id, None)
+        if call:
+            with suppress(Exception):
+                call[0].set_exception(ex)
+
+    def _on_done(self, reply_id: int, future: Future) -> None:
+        with self._lock:
+            # Calls cancelled by the service are no longer pending
+            pending = self._calls.pop(reply_id, None) is not None
+            if pending and future.cancelled():
+                self._cancelled.append(reply_id)
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                cancelled, self._cancelled = self._cancelled, []
+                ids = list(self._calls)
+                if not ids and not cancelled:
+                    self._thread = None
+                    return
+
+            if cancelled:
+                try:
+                    self._cancel(cancelled)
+                except Exception:  # noqa: BLE001
+                    logger.warning("Failed to notify %d cancelled calls", len(cancelled))
+
+            self._expire()
+            if not ids:
+                continue
+
+            start = time.monotonic()
+            try:
+                replies = self._fetch(ids, REPLY_POLL_WAIT)
+            except Exception as ex:  # noqa: BLE001
+                for reply_id in ids:
+                    self.fail(reply_id, ex)
+                continue
+
+            for reply in replies:
+                self._resolve(reply)
+
+            if not replies and time.monotonic() - start < REPLY_POLL_INTERVAL:
+                # Service does not hold long polls
+                time.sleep(REPLY_POLL_INTERVAL)
+
+    def _resolve(self, reply: dict[str, Any]) -> None:
+        with self._lock:
+            call = self._calls.pop(reply.get("id"), None)
+        if call is None:
+            return
+        future, _ = call
+        with suppress(Exception):  # Already cancelled
+            status = reply.get("status")
+            if status == "ok":
+                future.set_result(reply.get("result"))
+            elif status == "cancelled":
+                future.cancel()
+            else:
+                future.set_exception(RemoteError(reply.get("message", "remote call failed")))
+
+    def _expire(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            expired = [
+                reply_id
+                for reply_id, (_, deadline) in self._calls.items()
+                if deadline is not None and deadline < now
+            ]
+        for reply_id in expired:
+            self.fail(reply_id, TimeoutError(f"No reply for call {reply_id}"))
+            with self._lock:
+                self._cancelled.append(reply_id)
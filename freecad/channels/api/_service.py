@@ -9,39 +9,139 @@ FreeCAD Channels: Services.
 
 from __future__ import annotations
 
+import asyncio
+import io
 import json
+import math
+import select
 import socket
 import threading
 import time
+from array import array
 from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
 from contextlib import suppress
-from dataclasses import asdict, dataclass, field
-from http.server import BaseHTTPRequestHandler, HTTPServer
+from dataclasses import dataclass, field, replace
+from http import HTTPStatus
+from http.client import BadStatusLine, HTTPConnection
+from http.server import BaseHTTPRequestHandler, HTTPServer, ThreadingHTTPServer
+from ipaddress import ip_address
 from itertools import count
 from logging import getLogger
-from queue import Empty, Queue
+from queue import Empty, Full, Queue
 from threading import Thread
 from typing import TYPE_CHECKING, Any, ClassVar, Protocol, TypeAlias
 from urllib import request as _request, error
+from urllib.parse import quote, unquote
+
+from ._codecs import (
+    CODEC_FRAME,
+    CODECS,
+    CONTENT_FRAME,
+    CONTENT_JSON,
+    ENCODING_DEFLATE,
+    ENCODING_IDENTITY,
+    ENCODINGS,
+    CodecError,
+    compress,
+    decompress,
+    select_encoding,
+    should_compress,
+)
+from ._frames import (
+    FRAME_BATCH,
+    FRAME_CANCEL,
+    FRAME_REPLIES,
+    FRAME_REQUEST,
+    FRAME_RESPONSE,
+    MAX_FRAME_SIZE,
+    FrameConnection,
+    FrameError,
+    FrameServer,
+    encode_frame,
+    read_frame,
+)
+from ._metrics import ClientMetrics, ServiceMetrics
+from ._queues import CoalescingQueue, LaneQueue, request_key
+from ._rpc import REPLY_MAX_WAIT, PendingCalls, RemoteError, ReplyStore, new_reply_id
 
 if TYPE_CHECKING:
-    from collections.abc import Iterator
+    from collections.abc import Iterable, Iterator, Sequence
+    from email.message import Message
 
     from ._types import ServiceController
 
 
+@dataclass(slots=True, frozen=True)
+class ServiceLoad:
+    """
+    Load of a service at announcement time.
+    """
+
+    pending: int = 0
+    capacity: int = 0
+    # Moving average of the handler time in seconds
+    latency: float = 0.0
+
+    def is_full(self) -> bool:
+        return self.capacity > 0 and self.pending >= self.capacity
+
+    def expected_wait(self, extra: int = 0) -> float:
+        """
+        Estimated seconds before a new request is handled.
+
+        :param extra: Requests known to be on their way to the service.
+        """
+        return (self.pending + extra + 1) * max(self.latency, LOAD_MIN_LATENCY)
+
+
 @dataclass(unsafe_hash=True, slots=True, frozen=True)
 class ServiceAddress:
     """
     Address information for a service.
+
+    The announced load and codecs are informative, they are not part of
+    the identity of the address. Shared addresses belong to a shared
+    endpoint, requests are routed by service name.
     """
 
     host: str
     name: str
     port: int
+    frame_port: int = 0
+    load: ServiceLoad | None = field(default=None, compare=False, hash=False)
+    shared: bool = False
+    # Content types and encodings accepted by the service, see _codecs
+    codecs: tuple[str, ...] = field(default=(), compare=False, hash=False)
 
     def __str__(self) -> str:
-        return f"{DISCOVERY_SERVICE_TYPE}:{self.name}@{self.host}:{self.port}"
+        return self.join([self])
+
+    @staticmethod
+    def join(addresses: Sequence[ServiceAddress]) -> str:
+        """
+        Single announcement of services sharing an endpoint.
+
+        Names and loads are comma separated lists in the same order.
+
+        :param addresses: Addresses with the same host, ports and shared flag.
+        :return: The announcement text, see parse_all.
+        """
+        first = addresses[0]
+        names = ",".join(address.name for address in addresses)
+        text = f"{DISCOVERY_SERVICE_TYPE}:{names}@{first.host}:{first.port}"
+        if first.frame_port:
+            text += f";frame={first.frame_port}"
+        if first.shared:
+            text += ";shared=1"
+        if first.codecs:
+            text += ";codecs=" + ",".join(first.codecs)
+        loads = [address.load for address in addresses]
+        if all(load is not None for load in loads):
+            text += ";pending=" + ",".join(str(load.pending) for load in loads)
+            text += ";capacity=" + ",".join(str(load.capacity) for load in loads)
+            text += ";latency=" + ",".join(f"{load.latency:.6f}" for load in loads)
+        return text
 
     @property
     def display(self) -> str:
@@ -49,26 +149,117 @@ class ServiceAddress:
 
     @classmethod
     def parse(cls, address: str) -> ServiceAddress:
+        addresses = cls.parse_all(address)
+        if len(addresses) != 1:
+            msg = f"Not a single service address: {address}"
+            raise ValueError(msg)
+        return addresses[0]
+
+    @classmethod
+    def parse_all(cls, address: str) -> list[ServiceAddress]:
+        """
+        Parse an announcement of one or many services, see join.
+
+        :param address: The announcement text.
+        :return: One address per announced name.
+        """
         parts = address.split(":")
         if parts[0] != DISCOVERY_SERVICE_TYPE:
             msg = f"Invalid service address: {address}"
             raise ValueError(msg)
-        name, host = parts[1].split("@")
-        return cls(host, name, int(parts[2]))
+        names, host = parts[1].split("@")
+        port, *params = parts[2].split(";")
+        options = dict(param.partition("=")[::2] for param in params)
+        names = names.split(",")
+        loads = [None] * len(names)
+        if "pending" in options:
+            columns = [options.get(k, "").split(",") for k in ("pending", "capacity", "latency")]
+            if any(len(column) != len(names) for column in columns):
+                msg = f"Invalid service load: {address}"
+                raise ValueError(msg)
+            loads = [
+                ServiceLoad(int(pending), int(capacity), float(latency))
+                for pending, capacity, latency in zip(*columns, strict=True)
+            ]
+        frame_port = int(options.get("frame", 0))
+        shared = options.get("shared") == "1"
+        codecs = tuple(filter(None, options.get("codecs", "").split(",")))
+        return [
+            cls(host, name, int(port), frame_port, load, shared, codecs)
+            for name, load in zip(names, loads, strict=True)
+        ]
+
+
+@dataclass(frozen=True, slots=True)
+class DiscoveryGroup:
+    """
+    Multicast group for LAN-wide discovery.
+
+    Discovery is limited to the local machine by default. Registries
+    configured with a group also announce their services to it and
+    answer probes received from it. Listeners join the group on
+    ``interface``, using the loopback interface keeps the whole setup
+    on the local machine.
+    """
+
+    interface: str = "127.0.0.1"
+    group: str = "239.255.58.87"
+    port: int = 58989
+    ttl: int = 1
+
+    @property
+    def addr(self) -> tuple[str, int]:
+        return (self.group, self.port)
+
+    def open_socket(self) -> socket.socket:
+        """Socket joined to the group, to send and receive group datagrams."""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind(("", self.port))
+            membership = socket.inet_aton(self.group) + socket.inet_aton(self.interface)
+            sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, membership)
+            self.configure(sock)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    def configure(self, sock: socket.socket) -> None:
+        """Send multicast datagrams of sock through the group interface."""
+        sock.setsockopt(
+            socket.IPPROTO_IP,
+            socket.IP_MULTICAST_IF,
+            socket.inet_aton(self.interface),
+        )
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, self.ttl)
+        # Peers on the same machine are discovered through the group too
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_LOOP, 1)
+
+    def reaches(self, address: ServiceAddress) -> bool:
+        """Check if peers of the group can connect to address."""
+        return is_loopback(self.interface) or not is_loopback(address.host)
 
 
 @dataclass(kw_only=True)
 class ServiceRegistry:
     """Service registry to announce and find services."""
 
-    interval: float = 1.0
+    interval: float = 3.0
+    # Opt-in LAN-wide discovery, services are always announced on loopback too
+    multicast: DiscoveryGroup | None = None
 
-    _actions: Queue[tuple[str, ServiceAddress | None]] = field(init=False, default_factory=Queue)
+    _actions: Queue[tuple[str, ServiceAddress | None, LoadProvider | None]] = field(
+        init=False,
+        default_factory=Queue,
+    )
     _services: dict[str, ServiceAddress] = field(init=False, default_factory=dict)
+    _loads: dict[str, LoadProvider] = field(init=False, default_factory=dict)
     _shutdown: bool = field(init=False, default=False)
     _announce_thread: Thread | None = field(init=False, default=None)
+    _next_announce: float = field(init=False, default=0)
 
-    def register(self, service: ServiceAddress) -> None:
+    def register(self, service: ServiceAddress, load: LoadProvider | None = None) -> None:
         """
         Register a service to announce.
 
@@ -76,8 +267,10 @@ class ServiceRegistry:
         announced on the network using pseudo mDNS.
 
         :param service: The service to register.
+        :param load: Function returning the current load of the service,
+            it is included in every announcement.
         """
-        self._actions.put(("register", service))
+        self._actions.put(("register", service, load))
         if self._announce_thread is None:
             self._start_announce()
 
@@ -90,18 +283,18 @@ class ServiceRegistry:
 
         :param service: The service to unregister.
         """
-        self._actions.put(("unregister", service))
+        self._actions.put(("unregister", service, None))
 
     def shutdown(self) -> None:
         """
         Shutdown the service registry and stop announcing and discovering services.
         """
-        self._actions.put(("shutdown", None))
+        self._actions.put(("shutdown", None, None))
 
     def _update(self) -> None:
         with suppress(Empty):
             while True:
-                action, service = self._actions.get(block=False)
+                action, service, load = self._actions.get(block=False)
                 match action:
                     case "shutdown":
                         logger.info("Shutting down discovery service")
@@ -110,17 +303,32 @@ class ServiceRegistry:
                     case "register":
                         logger.info("Registering service %s", service.name)
                         self._services[service.name] = service
+                        if load is not None:
+                            self._loads[service.name] = load
+                        self._next_announce = 0
                     case "unregister" if service.name in self._services:
                         logger.info("Unregistering service %s", service.name)
                         del self._services[service.name]
+                        self._loads.pop(service.name, None)
                 self._actions.task_done()
 
     def _run(self) -> None:
         sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        probes = _open_probe_listener()
+        group = self._open_group()
+        listening = [s for s in (probes, group) if s is not None]
         try:
             while not self._shutdown:
-                self._announce(sock)
-                time.sleep(self.interval)
+                if time.monotonic() >= self._next_announce:
+                    self._announce(sock, group)
+                    self._next_announce = time.monotonic() + self.interval
+                # Short waits keep registrations and probes responsive
+                wait = max(0, min(self._next_announce - time.monotonic(), REGISTRY_TICK))
+                if not listening:
+                    time.sleep(wait)
+                else:
+                    for ready in select.select(listening, [], [], wait)[0]:
+                        self._answer_probe(ready, self.multicast if ready is group else None)
                 self._update()
         except Exception as ex:
             logger.exception(str(ex.args))
@@ -129,11 +337,54 @@ class ServiceRegistry:
                 self._announce_thread = None
                 sock.shutdown(socket.SHUT_RDWR)
                 sock.close()
+            for listener in listening:
+                listener.close()
         logger.info("Discovery service stopped")
 
-    def _announce(self, sock: socket.socket) -> None:
-        for service in self._services.values():
-            sock.sendto(str(service).encode("utf-8"), DISCOVERY_SERVICE_ADDR)
+    def _open_group(self) -> socket.socket | None:
+        if self.multicast is None:
+            return None
+        try:
+            return self.multicast.open_socket()
+        except OSError as ex:
+            logger.warning("Multicast discovery disabled: %s", ex)
+            return None
+
+    def _announce(self, sock: socket.socket, group: socket.socket | None = None) -> None:
+        services = [self._with_load(service) for service in self._services.values()]
+        for announcement in format_announcements(services):
+            sock.sendto(announcement, DISCOVERY_SERVICE_ADDR)
+        if group is not None:
+            reachable = [service for service in services if self.multicast.reaches(service)]
+            for announcement in format_announcements(reachable):
+                group.sendto(announcement, self.multicast.addr)
+
+    def _answer_probe(self, sock: socket.socket, multicast: DiscoveryGroup | None = None) -> None:
+        # A failed datagram must not stop the registry thread
+        try:
+            data, addr = sock.recvfrom(DISCOVERY_DATAGRAM_SIZE)
+            names = parse_probe(data)
+            if names is None:
+                return
+            services = [
+                self._with_load(service)
+                for service in self._services.values()
+                if (not names or service.name in names)
+                and (multicast is None or multicast.reaches(service))
+            ]
+            for announcement in format_announcements(services):
+                sock.sendto(announcement, addr)
+        except OSError as ex:
+            logger.warning("Discovery probe not answered: %s", ex)
+
+    def _with_load(self, service: ServiceAddress) -> ServiceAddress:
+        load = self._loads.get(service.name)
+        if load is not None:
+            try:
+                return replace(service, load=load())
+            except Exception:  # noqa: BLE001
+                logger.debug("Failed to get the load of %s", service.name)
+        return service
 
     def _start_announce(self) -> None:
         logger.info("Starting announcement service")
@@ -151,8 +402,63 @@ class ServiceRegistry:
         queue: Queue[dict] | None = None,
         *,
         start: bool = True,
+        **options: Any,
     ) -> Service:
-        return Service(self, name, queue or Queue(), start=start)
+        """
+        Create a service registered in this registry.
+
+        :param name: The name of the service.
+        :param queue: The queue to receive requests from.
+        :param start: Start the service immediately.
+        :param options: Extra keyword options passed to Service.
+        """
+        return Service(self, name, queue or Queue(), start=start, **options)
+
+
+class ThreadPoolHTTPServer(HTTPServer):
+    """
+    HTTP server that handles connections on a bounded pool of worker threads.
+
+    When all workers are busy, new connections wait in the listen backlog
+    instead of spawning more threads.
+    """
+
+    def __init__(
+        self,
+        server_address: tuple[str, int],
+        handler_class: type[BaseHTTPRequestHandler],
+        *,
+        workers: int | None = None,
+    ) -> None:
+        super().__init__(server_address, handler_class)
+        workers = workers or SERVER_POOL_WORKERS
+        self._slots = threading.BoundedSemaphore(workers)
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix=f"freecad-channels-worker-{next(TID)}",
+        )
+
+    def process_request(self, request: socket.socket, client_address: tuple) -> None:
+        self._slots.acquire()
+        try:
+            self._executor.submit(self._process_request, request, client_address)
+        except RuntimeError:
+            # Executor already shut down
+            self._slots.release()
+            self.shutdown_request(request)
+
+    def _process_request(self, request: socket.socket, client_address: tuple) -> None:
+        try:
+            self.finish_request(request, client_address)
+        except Exception:  # noqa: BLE001
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._slots.release()
+
+    def server_close(self) -> None:
+        super().server_close()
+        self._executor.shutdown(wait=False)
 
 
 @dataclass(slots=True)
@@ -160,141 +466,730 @@ class ServiceRequest:
     name: str
     reply_to: int | None = None
     data: dict[str, Any] = field(default_factory=dict)
+    # Coalescing key, a newer pending request with the same key replaces
+    # this one in services using a CoalescingQueue.
+    key: str | None = None
+    # Priority lane in services using a LaneQueue, 0 is the highest.
+    # Derived from the request data when not set.
+    priority: int | None = None
+    # Monotonic time the service received the request, not sent on the wire
+    received: float | None = field(default=None, repr=False, compare=False)
+
+    def payload(self) -> dict[str, Any]:
+        """Wire representation of the request."""
+        return {
+            "name": self.name,
+            "reply_to": self.reply_to,
+            "data": self.data,
+            "key": self.key,
+            "priority": self.priority,
+        }
+
+
+class ServiceEndpoint:
+    """
+    Servers delivering requests to services.
+
+    Every service gets a private endpoint by default, listening on its own
+    ports. A shared endpoint serves all the services attached to it on the
+    same ports, saving a server, its threads and its sockets per service.
+    Requests to a shared endpoint are routed by service name: http paths
+    are prefixed with the name (``/Blender/batch``) and frames carry it in
+    their ``service`` field. Clients do it transparently for addresses
+    announced as shared.
+
+    The servers start with the first attached service and stop when the
+    last one is detached.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        *,
+        shared: bool = False,
+        host: str | None = None,
+        advertise: str | None = None,
+        keep_alive: bool = False,
+        keep_alive_timeout: float | None = None,
+        engine: str | None = None,
+        workers: int | None = None,
+        frames: bool = False,
+        max_frame_size: int | None = None,
+    ) -> None:
+        """
+        Initialize the endpoint.
+
+        :param shared: Serve many services routed by name.
+        :param host: Interface address to listen on, defaults to LOCALHOST.
+            Use a LAN address (or ANY_HOST) together with a multicast
+            registry to make the services reachable from other machines.
+        :param advertise: Host announced to clients, defaults to host. When
+            listening on ANY_HOST it defaults to the primary address of the machine.
+        :param keep_alive: Speak HTTP/1.1 and keep client connections open between requests.
+        :param keep_alive_timeout: Seconds an idle persistent connection is kept open.
+            defaults to KEEP_ALIVE_TIMEOUT.
+        :param engine: Server engine, one of SERVER_ENGINES. "simple" handles one
+            connection at a time, "threading" uses a thread per connection and
+            "pool" a bounded pool of worker threads. Defaults to "threading" with
+            keep_alive and "simple" otherwise.
+        :param workers: Number of worker threads of the "pool" engine,
+            defaults to SERVER_POOL_WORKERS.
+        :param frames: Also listen on a binary frame transport port (see _frames).
+            It is announced in the service address and preferred by clients.
+        :param max_frame_size: Upper limit in bytes for request frames,
+            defaults to MAX_FRAME_SIZE.
+        """
+        if engine is None:
+            # Persistent connections hold a handler for their whole lifetime,
+            # so they need concurrent handlers to not starve other clients.
+            engine = "threading" if keep_alive else "simple"
+        if engine not in SERVER_ENGINES:
+            msg = f"Invalid server engine: {engine}"
+            raise ValueError(msg)
+
+        self.shared = shared
+        self.bind_host = host or LOCALHOST
+        self.advertise = advertise
+        self.keep_alive = keep_alive
+        self.keep_alive_timeout = keep_alive_timeout or KEEP_ALIVE_TIMEOUT
+        self.engine = engine
+        self.workers = workers
+        self.frames = frames
+        self.max_frame_size = max_frame_size
+        self.host = None
+        self.port = None
+        self.frame_port = 0
+        self._services: dict[str, Service] = {}
+        self._lock = threading.Lock()
+        self._server = None
+        self._frame_server = None
+        self._thread = None
+
+    def attach(self, service: Service) -> None:
+        """
+        Serve a service, starting the servers if needed, and register it.
+
+        :param service: The service to serve.
+        """
+        with self._lock:
+            current = self._services.get(service.name)
+            if current is service:
+                return
+            if current is not None or (self._services and not self.shared):
+                msg = f"Endpoint can not serve another service named {service.name}"
+                raise ValueError(msg)
+            self._services[service.name] = service
+            if self._thread is None:
+                self._start()
+            service.registry.register(service.address(), service.load)
+
+    def detach(self, service: Service) -> None:
+        """
+        Stop serving a service and unregister it.
+
+        :param service: The service to stop serving.
+        """
+        with self._lock:
+            if self._services.get(service.name) is not service:
+                return
+            del self._services[service.name]
+            service.registry.unregister(service.address())
+            if not self._services:
+                self._stop()
+
+    def is_attached(self, service: Service) -> bool:
+        return self._services.get(service.name) is service
+
+    def services(self) -> list[Service]:
+        return list(self._services.values())
+
+    def resolve(self, path: str) -> tuple[Service | None, str]:
+        """
+        Find the service of a http request path.
+
+        :param path: The request path.
+        :return: Tuple (service, path relative to the service).
+        """
+        if not self.shared:
+            return next(iter(self._services.values()), None), path
+        name, _, rest = path.lstrip("/").partition("/")
+        return self._services.get(unquote(name)), f"/{rest}"
+
+    def _start(self) -> None:
+        self._server = self._create_server()
+        self.port = self._server.server_address[1]
+        self.host = self.advertise or self._server.server_address[0]
+        if self.host == ANY_HOST:
+            self.host = primary_address()
+        if self.frames:
+            self._start_frame_server()
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            name=f"freecad-channels-{self._label()}-{next(TID)}",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def _stop(self) -> None:
+        if self._frame_server:
+            self._frame_server.shutdown()
+            self._frame_server.server_close()
+            self._frame_server = None
+            self.frame_port = 0
+        self._server.shutdown()
+        self._thread.join()
+        self._server.server_close()
+        self._server = None
+        self._thread = None
+        self.port = None
+
+    def _label(self) -> str:
+        if self.shared:
+            return "endpoint"
+        return next(iter(self._services), "service")
+
+    def _create_server(self) -> HTTPServer:
+        address = (self.bind_host, 0)
+        match self.engine:
+            case "pool":
+                return ThreadPoolHTTPServer(address, self._handler(), workers=self.workers)
+            case "threading":
+                return ThreadingHTTPServer(address, self._handler())
+            case _:
+                return HTTPServer(address, self._handler())
+
+    def _route_frame(self, payload: dict[str, Any]) -> Service | None:
+        if self.shared:
+            return self._services.get(payload.get("service"))
+        return next(iter(self._services.values()), None)
+
+    def _frame_traffic(self, payload: dict[str, Any], bytes_in: int, bytes_out: int) -> None:
+        service = self._route_frame(payload)
+        if service is not None:
+            service.metrics.record_traffic(bytes_in, bytes_out)
+
+    def _start_frame_server(self) -> None:
+        def route(method: str) -> Callable[[dict[str, Any]], dict[str, Any]]:
+            def handle(payload: dict[str, Any]) -> dict[str, Any]:
+                service = self._route_frame(payload)
+                if service is None:
+                    return {"status": "error", "message": "service not found"}
+                return getattr(service, method)(payload)
+
+            return handle
+
+        self._frame_server = FrameServer(
+            (self.bind_host, 0),
+            {
+                FRAME_REQUEST: route("submit"),
+                FRAME_BATCH: route("submit_batch"),
+                FRAME_REPLIES: route("collect_replies"),
+                FRAME_CANCEL: route("cancel_replies"),
+            },
+            idle_timeout=self.keep_alive_timeout,
+            traffic=self._frame_traffic,
+            max_frame_size=self.max_frame_size,
+        )
+        self.frame_port = self._frame_server.server_address[1]
+        threading.Thread(
+            target=self._frame_server.serve_forever,
+            name=f"freecad-channels-{self._label()}-frames-{next(TID)}",
+            daemon=True,
+        ).start()
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        attributes: dict[str, Any] = {"endpoint": self}
+        if self.keep_alive:
+            attributes["protocol_version"] = "HTTP/1.1"
+            attributes["timeout"] = self.keep_alive_timeout
+            # Headers and body are written separately, avoid the
+            # Nagle/delayed-ACK stall on persistent connections.
+            attributes["disable_nagle_algorithm"] = True
+        return type("ServiceHandler", (_ServiceHandler,), attributes)
+
+
+# Service method handling each POST path
+_POST_ROUTES = {
+    "/": "submit",
+    "/batch": "submit_batch",
+    "/replies": "collect_replies",
+    "/cancel": "cancel_replies",
+}
+
+
+class _ServiceHandler(BaseHTTPRequestHandler):
+    """Http Handler for the services of an endpoint, see ServiceEndpoint._handler."""
+
+    endpoint: ClassVar[ServiceEndpoint]
+
+    def send_json(self, payload: dict[str, Any], status: int = HTTPStatus.OK) -> int:
+        # Content type and encoding negotiated with the Accept headers
+        content_type = CONTENT_JSON
+        if CONTENT_FRAME in self.headers.get("Accept", ""):
+            content_type = CONTENT_FRAME
+        encoding = select_encoding(self.headers.get("Accept-Encoding"))
+        body, encoding = encode_body(payload, content_type, encoding, FRAME_RESPONSE)
+        if payload.get("status") == "rejected":
+            status = HTTPStatus.SERVICE_UNAVAILABLE
+        self.send_response(status)
+        self.send_header("Content-type", content_type)
+        if encoding is not None:
+            self.send_header("Content-Encoding", encoding)
+        self.send_header("Content-Length", str(len(body)))
+        if "retry_after" in payload and status == HTTPStatus.SERVICE_UNAVAILABLE:
+            self.send_header("Retry-After", str(math.ceil(payload["retry_after"])))
+        self.end_headers()
+        self.wfile.write(body)
+        return len(body)
+
+    def send_error_json(self, message: str, status: int = HTTPStatus.BAD_REQUEST) -> None:
+        self.send_json({"status": "error", "message": message}, status)
+
+    def not_found(self) -> None:
+        self.send_error_json("not found", HTTPStatus.NOT_FOUND)
+
+    def do_GET(self) -> None:
+        endpoint = self.endpoint
+        service, path = endpoint.resolve(self.path)
+        if service is None and endpoint.shared and path == "/":
+            if self.path == METRICS_PATH:
+                metrics = {s.name: s.metrics.snapshot() for s in endpoint.services()}
+                self.send_json({"status": "ok", "services": metrics})
+                return
+            services = [str(service.address()) for service in endpoint.services()]
+            self.send_json({"status": "ok", "services": services})
+        elif service is None:
+            self.not_found()
+        elif path == METRICS_PATH:
+            self.send_json({"status": "ok", **service.metrics.snapshot()})
+        else:
+            self.send_json({
+                "status": "full" if service.is_full() else "ok",
+                "service": str(service.address()),
+            })
+
+    def do_POST(self) -> None:
+        body = self._read_body()
+        if body is None:
+            return
+        service, path = self.endpoint.resolve(self.path)
+        method = _POST_ROUTES.get(path)
+        if service is None or method is None:
+            self.not_found()
+            return
+
+        try:
+            data = decode_body(
+                body,
+                self.headers.get("Content-Type", CONTENT_JSON),
+                self.headers.get("Content-Encoding"),
+            )
+        except (CodecError, FrameError, ValueError) as ex:
+            self.send_error_json(str(ex))
+            return
+        if not isinstance(data, dict):
+            self.send_error_json("request body must be an object")
+            return
+
+        response = getattr(service, method)(data)
+        status = HTTPStatus.BAD_REQUEST if response["status"] == "error" else HTTPStatus.OK
+        sent = self.send_json(response, status)
+        service.metrics.record_traffic(len(body), sent)
+
+    def _read_body(self) -> bytes | None:
+        # The body is always consumed so that a persistent connection
+        # stays in sync for the next request. Without a valid length it
+        # cannot be, the connection is closed.
+        try:
+            content_length = int(self.headers["Content-Length"])
+        except (KeyError, TypeError):
+            self.close_connection = True
+            self.send_error_json("length required", HTTPStatus.LENGTH_REQUIRED)
+            return None
+        except ValueError:
+            self.close_connection = True
+            self.send_error_json("invalid content length")
+            return None
+        return self.rfile.read(content_length)
 
 
 class Service:
     """FreeCAD Channels Service"""
 
-    def __init__(
+    def __init__(  # noqa: PLR0913
         self,
         registry: ServiceRegistry,
         name: str,
         request_queue: Queue[ServiceRequest],
         *,
         start: bool = True,
+        keep_alive: bool = False,
+        keep_alive_timeout: float | None = None,
+        engine: str | None = None,
+        workers: int | None = None,
+        frames: bool = False,
+        max_frame_size: int | None = None,
+        host: str | None = None,
+        advertise: str | None = None,
+        endpoint: ServiceEndpoint | None = None,
     ) -> None:
         """
         Initialize the service.
 
+        The server options are those of ServiceEndpoint, they are used to
+        create a private endpoint and ignored when an endpoint is given.
+
         :param registry: The service registry to register the service in.
         :param name: The name of the service.
         :param request_queue: The queue to receive requests from.
+        :param keep_alive: See ServiceEndpoint.
+        :param keep_alive_timeout: See ServiceEndpoint.
+        :param engine: See ServiceEndpoint.
+        :param workers: See ServiceEndpoint.
+        :param frames: See ServiceEndpoint.
+        :param max_frame_size: See ServiceEndpoint.
+        :param host: See ServiceEndpoint.
+        :param advertise: See ServiceEndpoint.
+        :param endpoint: Endpoint serving the service, usually a shared one
+            (see shared_endpoint). Defaults to a private endpoint.
         """
+        if endpoint is None:
+            endpoint = ServiceEndpoint(
+                host=host,
+                advertise=advertise,
+                keep_alive=keep_alive,
+                keep_alive_timeout=keep_alive_timeout,
+                engine=engine,
+                workers=workers,
+                frames=frames,
+                max_frame_size=max_frame_size,
+            )
+
         self.registry = registry
         self.name = name
-        self.port = None
-        self.host = None
-        self._server = None
-        self._thread = None
+        self.endpoint = endpoint
+        self._submit_lock = threading.Lock()
+        self._enqueue_listeners: list[Callable[[], None]] = []
+        self._handle_time = 0.0
+        self.metrics = ServiceMetrics()
+        # A single threaded server can not hold long polls
+        self._replies = ReplyStore(max_wait=0 if endpoint.engine == "simple" else REPLY_MAX_WAIT)
         self._queue = request_queue or Queue()
+        if isinstance(self._queue, CoalescingQueue):
+            self._queue.on_supersede = self._superseded
         if start:
             self.start()
 
+    @property
+    def host(self) -> str | None:
+        return self.endpoint.host
+
+    @property
+    def port(self) -> int | None:
+        return self.endpoint.port
+
+    @property
+    def frame_port(self) -> int:
+        return self.endpoint.frame_port
+
     def start(self) -> None:
-        self._thread = threading.Thread(
-            target=self._run,
-            name=f"freecad-channels-{self.name}-{next(TID)}",
-            daemon=True,
-        )
-        self._thread.start()
+        self.endpoint.attach(self)
 
     def is_full(self) -> bool:
         return self._queue.maxsize > 0 and self._queue.qsize() >= self._queue.maxsize
 
-    def _run(self) -> None:
-        self._server = HTTPServer((LOCALHOST, 0), self._handler())
-        self.host, self.port = self._server.server_address
-        self.registry.register(self.address())
-        self._server.serve_forever()
-        self.registry.unregister(self.address())
+    def _has_room(self, requests: list[ServiceRequest]) -> bool:
+        # Queues with coalescing or lanes know better how much room is needed
+        has_room = getattr(self._queue, "has_room", None)
+        if has_room is not None:
+            return has_room(requests)
+        maxsize = self._queue.maxsize
+        return maxsize <= 0 or maxsize - self._queue.qsize() >= len(requests)
 
     def address(self) -> ServiceAddress:
-        return ServiceAddress(self.host, self.name, self.port)
+        return ServiceAddress(
+            self.host,
+            self.name,
+            self.port,
+            self.frame_port,
+            shared=self.endpoint.shared,
+            codecs=CODECS,
+        )
 
-    def _handler(self) -> type[BaseHTTPRequestHandler]:
-        service = self
-
-        class ServiceHandler(BaseHTTPRequestHandler):
-            """Http Handler for the service."""
-
-            def do_GET(self) -> None:
-                self.send_response(200)
-                self.send_header("Content-type", "application/json")
-                self.end_headers()
-                self.wfile.write(
-                    json.dumps({
-                        "status": "full" if service.is_full() else "ok",
-                        "service": str(service.address()),
-                    }).encode("utf-8"),
-                )
+    def load(self) -> ServiceLoad:
+        """Current load of the service, announced to balancing clients."""
+        return ServiceLoad(self._queue.qsize(), self._queue.maxsize, self._handle_time)
 
-            def do_POST(self) -> None:
-                queue = service._queue  # noqa: SLF001
-                if service.is_full():
-                    self.send_response(200)
-                    self.send_header("Content-type", "application/json")
-                    self.end_headers()
-                    self.wfile.write(
-                        json.dumps({
-                            "status": "rejected",
-                            "message": "queue full",
-                        }).encode("utf-8"),
-                    )
-                    return
-
-                content_length = int(self.headers.get("Content-Length"))
-                body = self.rfile.read(content_length).decode("utf-8")
-                data = json.loads(body)
-                queue.put(
-                    ServiceRequest(
-                        data.get("name"),
-                        data.get("reply_to"),
-                        data.get("data"),
-                    ),
-                )
-                self.send_response(200)
-                self.send_header("Content-type", "application/json")
-                self.end_headers()
-                self.wfile.write(json.dumps({"status": "ok"}).encode("utf-8"))
+    def submit(self, data: dict[str, Any]) -> dict[str, Any]:
+        """
+        Enqueue a decoded request payload.
+
+        This is the common entry point of all transports.
+
+        :param data: Request payload with name, reply_to and data keys.
+        :return: Response payload with the status of the request.
+        """
+        if not _is_request(data):
+            return {"status": "error", "message": "invalid request"}
+        request = _make_request(data)
+        with self._submit_lock:
+            if not self._has_room([request]):
+                self.metrics.record_rejected(1)
+                return self.rejected()
+            try:
+                self._queue.put_nowait(request)
+            except Full:
+                self.metrics.record_rejected(1)
+                return self.rejected()
+            self.metrics.record_received(1, self._queue.qsize())
+        self._notify_enqueue()
+        return self.accepted()
+
+    def submit_batch(self, data: dict[str, Any]) -> dict[str, Any]:
+        """
+        Enqueue a batch of decoded request payloads atomically.
+
+        Either all valid requests are enqueued or the whole batch is
+        rejected when the queue has no room for all of them.
+
+        :param data: Batch payload with a list of requests under the requests key.
+        :return: Response payload with the batch status and one status per item.
+        """
+        items = data.get("requests") or []
+        requests: list[ServiceRequest | None] = [
+            _make_request(item) if _is_request(item) else None for item in items
+        ]
+        valid = [request for request in requests if request is not None]
+
+        with self._submit_lock:
+            if not self._has_room(valid):
+                self.metrics.record_rejected(len(valid))
+                return {
+                    **self.rejected(len(valid)),
+                    "items": [{"status": "rejected"} for _ in items],
+                }
+            # Consumers only remove items and producers hold the lock,
+            # so the room checked above is guaranteed.
+            for request in valid:
+                self._queue.put_nowait(request)
+            self.metrics.record_received(len(valid), self._queue.qsize())
+
+        if valid:
+            self._notify_enqueue()
+        return {
+            **self.accepted(),
+            "items": [
+                {"status": "ok"}
+                if request is not None
+                else {"status": "error", "message": "invalid request"}
+                for request in requests
+            ],
+        }
+
+    def retry_after(self, needed: int = 1) -> float:
+        """
+        Estimate seconds until the queue has room for needed requests.
 
-        return ServiceHandler
+        The estimate uses the average handling time of recent requests.
+
+        :param needed: Number of free slots needed.
+        :return: Seconds, clamped to RETRY_AFTER_MIN..RETRY_AFTER_MAX.
+        """
+        maxsize = self._queue.maxsize
+        missing = max(1, needed - (maxsize - self._queue.qsize())) if maxsize > 0 else 1
+        handle_time = self._handle_time or RETRY_AFTER_DEFAULT
+        return min(max(missing * handle_time, RETRY_AFTER_MIN), RETRY_AFTER_MAX)
+
+    def accepted(self) -> dict[str, Any]:
+        """Response payload for accepted requests, with the queue state."""
+        response = {
+            "status": "ok",
+            "pending": self._queue.qsize(),
+            "capacity": self._queue.maxsize,
+            "latency": self._handle_time,
+        }
+        if self.is_full():
+            response["retry_after"] = self.retry_after()
+        return response
+
+    def rejected(self, needed: int = 1) -> dict[str, Any]:
+        """Response payload for requests rejected because the queue is full."""
+        return {
+            "status": "rejected",
+            "message": "queue full",
+            "retry_after": self.retry_after(needed),
+            "pending": self._queue.qsize(),
+            "capacity": self._queue.maxsize,
+            "latency": self._handle_time,
+        }
+
+    def add_enqueue_listener(self, listener: Callable[[], None]) -> None:
+        """
+        Register a function called after requests are enqueued.
+
+        Listeners are called from server threads, they must be thread-safe
+        and return quickly (i.e. post an event to the consumer thread).
+
+        :param listener: Function without arguments.
+        """
+        self._enqueue_listeners.append(listener)
+
+    def _notify_enqueue(self) -> None:
+        # A failing listener must not stop the others
+        for listener in self._enqueue_listeners:
+            try:
+                listener()
+            except Exception:  # noqa: PERF203
+                logger.exception("Enqueue listener failed")
+
+    def dispatch(self, request: ServiceRequest, handler: ServiceRequestHandler) -> None:
+        """
+        Call handler with request and route its result back to the caller.
+
+        Requests without reply_to are fire-and-forget, their result is ignored.
+
+        :param request: The request to handle.
+        :param handler: The service handler.
+        """
+        reply_id = request.reply_to
+        if reply_id is not None and self._replies.is_cancelled(reply_id):
+            self.metrics.record_cancelled()
+            return
+
+        wait = None if request.received is None else time.monotonic() - request.received
+        start = time.perf_counter()
+        failed = False
+        try:
+            result = handler(request)
+        except Exception as ex:
+            failed = True
+            if reply_id is None:
+                raise
+            logger.exception("Failed to handle request %s", request.name)
+            self._replies.put(reply_id, {"status": "error", "message": str(ex)})
+        else:
+            if reply_id is not None:
+                self._replies.put(reply_id, {"status": "ok", "result": result})
+        finally:
+            # Moving average of handling time, used for retry hints
+            elapsed = time.perf_counter() - start
+            self._handle_time += (elapsed - self._handle_time) * 0.2
+            self.metrics.record_handled(request.name, wait, elapsed, failed=failed)
+
+    def _superseded(self, request: ServiceRequest) -> None:
+        # A replaced call never runs, its caller must not wait for it
+        if request.reply_to is not None:
+            self.metrics.record_cancelled()
+            self._replies.put(
+                request.reply_to,
+                {"status": "cancelled", "message": "superseded by a newer request"},
+            )
+
+    def collect_replies(self, data: dict[str, Any]) -> dict[str, Any]:
+        """
+        Long poll for call results.
+
+        :param data: Payload with the correlation ids and the seconds to wait.
+        :return: Response payload with the available replies.
+        """
+        replies = self._replies.collect(data.get("ids") or (), float(data.get("wait", 0)))
+        return {"status": "ok", "replies": replies}
+
+    def cancel_replies(self, data: dict[str, Any]) -> dict[str, Any]:
+        """
+        Cancel calls, pending requests are skipped and results discarded.
+
+        :param data: Payload with the correlation ids to cancel.
+        :return: Response payload.
+        """
+        self._replies.cancel(data.get("ids") or ())
+        return {"status": "ok"}
 
     def __iter__(self) -> Iterator[ServiceRequest]:
+        while (request := self.next_request()) is not None:
+            yield request
+
+    def next_request(self) -> ServiceRequest | None:
+        """
+        Take the next pending request without blocking.
+
+        :return: The request or None if the queue is empty.
+        """
         try:
-            while True:
-                yield self._queue.get(block=False)
-                self._queue.task_done()
+            request = self._queue.get(block=False)
         except Empty:
-            return
+            return None
+        self._queue.task_done()
+        return request
+
+    def pending(self) -> int:
+        """Approximate number of requests waiting in the queue."""
+        return self._queue.qsize()
 
     def shutdown(self) -> None:
-        if self._server:
-            self.registry.unregister(self.address())
-            self._server.shutdown()
-            self._thread.join()
-            self._thread = None
+        self.endpoint.detach(self)
 
     def is_running(self) -> bool:
-        return self._thread
+        return self.endpoint.is_attached(self)
+
+
+def shared_endpoint(**options: Any) -> ServiceEndpoint:
+    """
+    Process wide shared endpoint.
+
+    Services asking for the same server options share the same endpoint,
+    so a process with many channels runs a single server.
+
+    :param options: Server options, see ServiceEndpoint.
+    :return: The shared endpoint.
+    """
+    key = tuple(sorted(options.items()))
+    with _shared_endpoints_lock:
+        endpoint = _shared_endpoints.get(key)
+        if endpoint is None:
+            endpoint = ServiceEndpoint(shared=True, **options)
+            _shared_endpoints[key] = endpoint
+        return endpoint
+
+
+def _is_request(data: Any) -> bool:
+    # A request payload must name the request, the same check for all transports
+    return isinstance(data, dict) and bool(data.get("name"))
+
+
+def _make_request(data: dict[str, Any]) -> ServiceRequest:
+    return ServiceRequest(
+        data.get("name"),
+        data.get("reply_to"),
+        data.get("data"),
+        data.get("key"),
+        data.get("priority"),
+        time.monotonic(),
+    )
 
 
 class ServiceDispatcher(Protocol):
     def __call__(
         self,
         service: Service,
-        handler: Callable[[ServiceRequest], None],
+        handler: Callable[[ServiceRequest], Any],
         poll: float = 0.5,
+        *,
+        push: bool = False,
     ) -> ServiceController: ...
 
 
-ServiceRequestHandler: TypeAlias = Callable[[ServiceRequest], None]
+# Handlers may return a result, it is sent back to callers that set reply_to.
+ServiceRequestHandler: TypeAlias = Callable[[ServiceRequest], Any]
+
+# Function returning the current load of a service
+LoadProvider: TypeAlias = Callable[[], ServiceLoad]
 
 
 class Channel:
     registry: ClassVar[ServiceRegistry | None] = None
     Controller: ClassVar[ServiceDispatcher | None] = None
 
-    def __init__(
+    def __init__(  # noqa: PLR0913
         self,
         *,
         name: str,
@@ -302,6 +1197,14 @@ class Channel:
         poll: float = 0.5,
         queue_size: int = 0,
         start: bool = True,
+        keep_alive: bool = False,
+        engine: str | None = None,
+        frames: bool = False,
+        push: bool = False,
+        coalesce: bool = False,
+        priorities: bool = False,
+        host: str | None = None,
+        shared: bool = False,
     ) -> None:
         cls = self.__class__
         self.registry = registry or cls.registry
@@ -309,6 +1212,14 @@ class Channel:
         self.poll = poll
         self.queue_size = queue_size
         self.start = start
+        self.keep_alive = keep_alive
+        self.engine = engine
+        self.frames = frames
+        self.push = push
+        self.coalesce = coalesce
+        self.priorities = priorities
+        self.host = host
+        self.shared = shared
 
         if not self.registry:
             msg = "No registry set"
@@ -318,89 +1229,802 @@ class Channel:
             msg = "No controller set"
             raise RuntimeError(msg)
 
-    def __call__(self, handler: Callable[[ServiceRequest], None]) -> ServiceController:
-        service = self.registry.create_service(
-            self.name,
-            Queue(maxsize=self.queue_size),
-            start=self.start,
-        )
-        return self.Controller(service, handler, self.poll)
+    def __call__(self, handler: ServiceRequestHandler) -> ServiceController:
+        key = request_key if self.coalesce else None
+        if self.priorities:
+            queue = LaneQueue(self.queue_size, key)
+        elif self.coalesce:
+            queue = CoalescingQueue(self.queue_size, key)
+        else:
+            queue = Queue(maxsize=self.queue_size)
+        options = {
+            "keep_alive": self.keep_alive,
+            "engine": self.engine,
+            "frames": self.frames,
+            "host": self.host,
+        }
+        if self.shared:
+            options = {"endpoint": shared_endpoint(**options)}
+        service = self.registry.create_service(self.name, queue, start=self.start, **options)
+        return self.Controller(service, handler, self.poll, push=self.push)
+
+
+class ConnectionPool:
+    """
+    Small pool of persistent HTTP/1.1 connections per service address.
+
+    Idle connections are checked before reuse, connections closed by the
+    peer are discarded and replaced transparently.
+    """
+
+    def __init__(self, maxsize: int = 4) -> None:
+        """
+        Initialize the pool.
+
+        :param maxsize: Maximum number of idle connections kept per address.
+        """
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._idle: dict[ServiceAddress, list[HTTPConnection]] = {}
+
+    def acquire(
+        self,
+        address: ServiceAddress,
+        timeout: float | None = None,
+    ) -> tuple[HTTPConnection, bool]:
+        """
+        Get a connection to address.
+
+        :param address: The service address to connect to.
+        :param timeout: Socket timeout for the connection.
+        :return: The connection and a flag telling if it was reused.
+        """
+        with self._lock:
+            idle = self._idle.get(address)
+            while idle:
+                conn = idle.pop()
+                if self._is_alive(conn):
+                    conn.timeout = timeout
+                    conn.sock.settimeout(timeout)
+                    return conn, True
+                conn.close()
+        return HTTPConnection(address.host, address.port, timeout=timeout), False
+
+    def release(self, address: ServiceAddress, conn: HTTPConnection) -> None:
+        """
+        Return a connection to the pool for reuse.
+
+        :param address: The service address the connection belongs to.
+        :param conn: The connection to return.
+        """
+        with self._lock:
+            idle = self._idle.setdefault(address, [])
+            if conn.sock is not None and len(idle) < self.maxsize:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def clear(self, address: ServiceAddress | None = None) -> None:
+        """
+        Close idle connections.
+
+        :param address: Only close connections to this address, defaults to all.
+        """
+        with self._lock:
+            if address is None:
+                pools, self._idle = list(self._idle.values()), {}
+            else:
+                pools = [self._idle.pop(address, [])]
+        for idle in pools:
+            for conn in idle:
+                conn.close()
+
+    @staticmethod
+    def _is_alive(conn: HTTPConnection) -> bool:
+        # An idle socket is readable only if the peer closed it (EOF) or
+        # sent something unexpected, either way it is not reusable.
+        if conn.sock is None:
+            return False
+        try:
+            readable, _, _ = select.select([conn.sock], [], [], 0)
+        except (OSError, ValueError):
+            return False
+        return not readable
+
+
+class ServiceBusyError(RuntimeError):
+    """The service rejected a request because its queue is full."""
+
+    def __init__(self, message: str, retry_after: float = 0) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+@dataclass(frozen=True, slots=True)
+class RetryPolicy:
+    """
+    Bounded exponential backoff for rejected requests.
+
+    The actual wait is the larger of the backoff and the retry hint of the service.
+    """
+
+    attempts: int = 5
+    initial_delay: float = 0.05
+    factor: float = 2.0
+    max_delay: float = 2.0
+
+    def delay(self, attempt: int) -> float:
+        return min(self.initial_delay * self.factor**attempt, self.max_delay)
+
+
+DEFAULT_RETRY = RetryPolicy()
 
 
 class ServiceClient:
-    def __init__(self, address: ServiceAddress) -> None:
+    def __init__(  # noqa: PLR0913
+        self,
+        address: ServiceAddress,
+        *,
+        keep_alive: bool = False,
+        pool: ConnectionPool | None = None,
+        transport: str = "auto",
+        retry: RetryPolicy | None = DEFAULT_RETRY,
+        compression: str | None = "auto",
+    ) -> None:
+        """
+        Initialize the client.
+
+        :param address: The address of the service.
+        :param keep_alive: Reuse persistent connections from a pool.
+        :param pool: The connection pool to use, defaults to a shared pool.
+        :param transport: "http", "frame" or "auto". "auto" uses the binary
+            frame transport if the service announces it and http otherwise.
+        :param retry: Retry policy for requests rejected because the service
+            queue is full, None to fail immediately with ServiceBusyError.
+        :param compression: Encoding of large requests and responses, "deflate",
+            "xz", None or "auto". "auto" uses deflate with remote services that
+            announce it, local traffic is not worth compressing.
+        """
+        if transport not in ("auto", "http", "frame"):
+            msg = f"Invalid transport: {transport}"
+            raise ValueError(msg)
+        if transport == "frame" and not address.frame_port:
+            msg = f"Service {address.display} does not support frame transport"
+            raise ValueError(msg)
+        compression, content_type = negotiate_codecs(address, compression)
+
         self.address = address
+        self.pool = (pool or _default_pool) if keep_alive else None
+        self.compression = compression
+        self.content_type = content_type
+        self._keep_alive = keep_alive
+        self._frames = None
+        if transport != "http" and address.frame_port:
+            self._frames = FrameConnection(address.host, address.frame_port, encoding=compression)
+        self._calls: PendingCalls | None = None
+        self._calls_lock = threading.Lock()
+        self.retry = retry
+        # Peer queue state learned from responses
+        self.capacity = 0
+        self.pending = 0
+        self.latency = 0.0
+        self._not_before = 0.0
+        self.metrics = ClientMetrics()
+
+    @property
+    def transport(self) -> str:
+        return "frame" if self._frames else "http"
+
+    @property
+    def not_before(self) -> float:
+        """Monotonic time before which the peer asked not to receive requests."""
+        return self._not_before
+
+    def load(self) -> ServiceLoad:
+        """Load of the peer as seen in its last response."""
+        return ServiceLoad(self.pending, self.capacity, self.latency)
 
     def send(self, request: ServiceRequest, timeout: float | None = None) -> None:
-        data = json.dumps(asdict(request)).encode("utf-8")
-        url = f"http://{LOCALHOST}:{self.address.port}/"
-        req = _request.Request(
-            url,
-            data=data,
-            method="POST",
-            headers={"Content-Type": "application/json"},
+        self._submit("/", FRAME_REQUEST, request.payload(), timeout)
+
+    def send_many(
+        self,
+        requests: list[ServiceRequest],
+        timeout: float | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Send many requests in a single message.
+
+        The service enqueues the whole batch atomically or rejects it as
+        a whole if there is not enough room in its queue.
+
+        :param requests: The requests to send.
+        :param timeout: Timeout in seconds.
+        :return: One status dict per request, in the same order.
+        """
+        payload = {"requests": [request.payload() for request in requests]}
+        response = self._submit("/batch", FRAME_BATCH, payload, timeout)
+        return response.get("items", [])
+
+    def call(self, request: ServiceRequest, timeout: float | None = None) -> Future:
+        """
+        Send a request and get a future for the result of its handler.
+
+        :param request: The request to send, reply_to is assigned if missing.
+        :param timeout: Seconds to wait for the reply, None waits forever.
+            Cancelling the future cancels the call in the service.
+        :return: Future resolved with the handler result, or failing with
+            RemoteError, TimeoutError or transport errors.
+        """
+        future = Future()
+        try:
+            future = self.start_call(request, timeout)
+        except Exception as ex:  # noqa: BLE001
+            future.set_exception(ex)
+        return future
+
+    def start_calls(
+        self,
+        requests: list[ServiceRequest],
+        timeout: float | None = None,
+        reply_timeout: float | None = None,
+    ) -> list[Future]:
+        """
+        Variant of start_call that sends many calls in a single batch, see send_many.
+
+        :param requests: The requests to send, reply_to is assigned if missing.
+        :param timeout: Timeout in seconds to deliver the batch.
+        :param reply_timeout: Seconds to wait for each reply, None waits forever.
+        :return: One future per request, in the same order. Requests the
+            service refused fail with RemoteError.
+        """
+        requests = [
+            request if request.reply_to is not None else replace(request, reply_to=new_reply_id())
+            for request in requests
+        ]
+        calls = self._pending_calls()
+        futures = [calls.add(request.reply_to, reply_timeout) for request in requests]
+        try:
+            items = self.send_many(requests, timeout)
+        except Exception as ex:
+            for request in requests:
+                calls.fail(request.reply_to, ex)
+            raise
+        # Calls without an item are left to their reply timeout
+        for request, item in zip(requests, items, strict=False):
+            if item.get("status") != "ok":
+                calls.fail(request.reply_to, RemoteError(item.get("message", "request refused")))
+        return futures
+
+    def start_call(self, request: ServiceRequest, timeout: float | None = None) -> Future:
+        """
+        Variant of call that raises errors sending the request.
+
+        Useful to try another peer when the request could not be delivered.
+
+        :param request: The request to send, reply_to is assigned if missing.
+        :param timeout: Seconds to wait for the reply, None waits forever.
+        :return: Future resolved with the handler result.
+        """
+        if request.reply_to is None:
+            request = replace(request, reply_to=new_reply_id())
+        calls = self._pending_calls()
+        future = calls.add(request.reply_to, timeout)
+        try:
+            self._submit("/", FRAME_REQUEST, request.payload(), timeout)
+        except Exception as ex:
+            calls.fail(request.reply_to, ex)
+            raise
+        return future
+
+    async def acall(self, request: ServiceRequest, timeout: float | None = None) -> Any:
+        """
+        Awaitable variant of call.
+
+        :param request: The request to send.
+        :param timeout: Seconds to wait for the reply, None waits forever.
+        :return: The handler result.
+        """
+        loop = asyncio.get_running_loop()
+        future = await loop.run_in_executor(None, self.call, request, timeout)
+        return await asyncio.wrap_future(future)
+
+    def _pending_calls(self) -> PendingCalls:
+        with self._calls_lock:
+            if self._calls is None:
+                # Long polls use their own connection to not block sends
+                poller = ServiceClient(
+                    self.address,
+                    keep_alive=self._keep_alive,
+                    transport=self.transport,
+                )
+
+                def fetch(ids: list[int], wait: float) -> list[dict[str, Any]]:
+                    payload = {"ids": ids, "wait": wait}
+                    timeout = wait + REPLY_MAX_WAIT
+                    response = poller._request("/replies", FRAME_REPLIES, payload, timeout)
+                    return response.get("replies", [])
+
+                def cancel(ids: list[int]) -> None:
+                    poller._request("/cancel", FRAME_CANCEL, {"ids": ids}, 5)
+
+                self._calls = PendingCalls(fetch, cancel)
+            return self._calls
+
+    def _submit(
+        self,
+        path: str,
+        kind: int,
+        payload: dict[str, Any],
+        timeout: float | None,
+    ) -> dict[str, Any]:
+        # Enqueue requests with flow control: sends are paced by the last
+        # retry hint of the peer and rejections are retried with backoff.
+        attempt = 0
+        while True:
+            delay = self._not_before - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+            response = self._request(path, kind, payload, timeout)
+            self.capacity = response.get("capacity", self.capacity)
+            self.pending = response.get("pending", self.pending)
+            self.latency = float(response.get("latency", self.latency))
+            retry_after = float(response.get("retry_after", 0))
+            self._not_before = time.monotonic() + retry_after
+
+            if response.get("status") != "rejected":
+                return response
+
+            retry = self.retry is not None and attempt < self.retry.attempts
+            self.metrics.record_rejected(retry=retry)
+            if not retry:
+                msg = f"Service {self.address.display} is busy: {response.get('message')}"
+                raise ServiceBusyError(msg, retry_after)
+
+            backoff = self.retry.delay(attempt)
+            if backoff > retry_after:
+                self._not_before = time.monotonic() + backoff
+            attempt += 1
+
+    def _request(
+        self,
+        path: str,
+        kind: int,
+        payload: dict[str, Any],
+        timeout: float | None,
+    ) -> dict[str, Any]:
+        path, payload = route_request(self.address, path, payload)
+        start = time.perf_counter()
+        try:
+            if self._frames is not None:
+                response, sent, received = self._frames.exchange(payload, timeout, kind=kind)
+            else:
+                data, encoding = encode_body(payload, self.content_type, self.compression)
+                headers = {"Content-Type": self.content_type, "Accept": self.content_type}
+                if encoding is not None:
+                    headers["Content-Encoding"] = encoding
+                if self.compression is not None:
+                    headers["Accept-Encoding"] = self.compression
+                if self.pool is not None:
+                    status, reply_headers, body = self._post_pooled(path, data, headers, timeout)
+                else:
+                    status, reply_headers, body = self._post(path, data, headers, timeout)
+                response, sent, received = None, len(data), len(body)
+        except Exception:
+            self.metrics.record_error()
+            raise
+        self.metrics.record_roundtrip(time.perf_counter() - start, sent, received)
+
+        if response is not None:
+            if response.get("status") == "error":
+                msg = f"Failed to send service request to {self.address.display}"
+                raise RuntimeError(msg)
+            return response
+
+        if status not in (HTTPStatus.OK, HTTPStatus.SERVICE_UNAVAILABLE):
+            msg = f"Failed to send service request to {self.address.display}"
+            raise RuntimeError(msg)
+        return decode_body(
+            body,
+            reply_headers.get("Content-Type", CONTENT_JSON),
+            reply_headers.get("Content-Encoding"),
         )
+
+    def _post(
+        self,
+        path: str,
+        data: bytes,
+        headers: dict[str, str],
+        timeout: float | None,
+    ) -> tuple[int, Message, bytes]:
+        url = f"http://{self.address.host}:{self.address.port}{path}"
+        req = _request.Request(url, data=data, method="POST", headers=headers)
         try:
             with _request.urlopen(req, timeout=timeout) as resp:
-                if resp.status != 200:
-                    msg = f"Failed to send service request to {url}"
-                    raise RuntimeError(msg)
+                return resp.status, resp.headers, resp.read()
         except error.HTTPError as ex:
+            if ex.code == HTTPStatus.SERVICE_UNAVAILABLE:  # Busy, the body has the retry hint
+                return ex.code, ex.headers, ex.read()
             logger.exception(str(ex.args))
             raise
 
+    def _post_pooled(
+        self,
+        path: str,
+        data: bytes,
+        headers: dict[str, str],
+        timeout: float | None,
+    ) -> tuple[int, Message, bytes]:
+        while True:
+            conn, reused = self.pool.acquire(self.address, timeout)
+            try:
+                conn.request("POST", path, body=data, headers=headers)
+                resp = conn.getresponse()
+                body = resp.read()
+            except (ConnectionError, BadStatusLine):
+                conn.close()
+                if reused:
+                    # Stale connection closed by the peer, retry on a fresh one.
+                    continue
+                raise
+            except Exception:
+                conn.close()
+                raise
+            break
+
+        if resp.will_close:
+            conn.close()
+        else:
+            self.pool.release(self.address, conn)
+
+        return resp.status, resp.headers, body
+
+    def close(self) -> None:
+        if self._frames is not None:
+            self._frames.close()
+        if self.pool is not None:
+            self.pool.clear(self.address)
+
+
+def negotiate_codecs(address: ServiceAddress, compression: str | None) -> tuple[str | None, str]:
+    """
+    Codecs a client uses with a service, see ServiceClient.
+
+    :param address: The service address with its announced codecs.
+    :param compression: Requested encoding, None or "auto".
+    :return: Tuple (encoding or None, http content type).
+    """
+    if compression == "auto":
+        remote = ENCODING_DEFLATE in address.codecs and not is_loopback(address.host)
+        compression = ENCODING_DEFLATE if remote else None
+    elif compression is not None and compression not in address.codecs:
+        msg = f"Service {address.display} does not support {compression} encoding"
+        raise ValueError(msg)
+    # Binary arrays are sent raw to services that accept frames over http
+    content_type = CONTENT_FRAME if CODEC_FRAME in address.codecs else CONTENT_JSON
+    return compression, content_type
+
+
+def route_request(
+    address: ServiceAddress,
+    path: str,
+    payload: dict[str, Any],
+) -> tuple[str, dict[str, Any]]:
+    """
+    Http path and payload of a request to a service.
+
+    Shared endpoints route requests by service name.
+
+    :param address: The service address.
+    :param path: Path of the operation ("/", "/batch", ...).
+    :param payload: The request payload.
+    :return: Tuple (path, payload).
+    """
+    if not address.shared:
+        return path, payload
+    route = f"/{quote(address.name, safe='')}"
+    path = route if path == "/" else route + path
+    return path, {**payload, "service": address.name}
+
+
+def _json_default(value: Any) -> Any:
+    # Binary arrays are only native in the frame content type
+    if isinstance(value, array):
+        return value.tolist()
+    msg = f"Object of type {type(value).__name__} is not JSON serializable"
+    raise TypeError(msg)
+
+
+def encode_body(
+    payload: dict[str, Any],
+    content_type: str,
+    encoding: str | None = None,
+    kind: int = FRAME_REQUEST,
+) -> tuple[bytes, str | None]:
+    """
+    Encode an http body.
+
+    :param payload: The payload.
+    :param content_type: CONTENT_JSON or CONTENT_FRAME.
+    :param encoding: Compress with this encoding if the body is large enough.
+    :param kind: Frame kind used with CONTENT_FRAME.
+    :return: Tuple (body, content encoding or None if not compressed).
+    """
+    if content_type == CONTENT_FRAME:
+        body = encode_frame(kind, payload)
+    else:
+        body = json.dumps(payload, separators=(",", ":"), default=_json_default).encode("utf-8")
+    if should_compress(len(body), encoding):
+        return compress(body, encoding), encoding
+    return body, None
+
+
+def decode_body(body: bytes, content_type: str, encoding: str | None = None) -> dict[str, Any]:
+    """
+    Decode an http body, see encode_body.
+
+    :param body: The body.
+    :param content_type: Value of the Content-Type header.
+    :param encoding: Value of the Content-Encoding header.
+    :return: The payload.
+    """
+    if encoding and encoding != ENCODING_IDENTITY:
+        if encoding not in ENCODINGS:
+            msg = f"Unsupported content encoding: {encoding}"
+            raise CodecError(msg)
+        body = decompress(body, encoding, MAX_FRAME_SIZE)
+    content_type = content_type.partition(";")[0].strip()
+    if content_type == CONTENT_FRAME:
+        frame = read_frame(io.BytesIO(body))
+        if frame is None:
+            msg = "Empty frame body"
+            raise CodecError(msg)
+        return frame[1]
+    if content_type != CONTENT_JSON:
+        msg = f"Unsupported content type: {content_type}"
+        raise CodecError(msg)
+    return json.loads(body.decode("utf-8"))
+
 
 def find_channel_service(
     *,
     filter: list[str] | None = None,  # noqa: A002
     timeout: float = 5,
     maxcount: int = 0,
+    multicast: DiscoveryGroup | None = None,
 ) -> list[ServiceAddress]:
     """
     Find services.
 
     Find services that match the given filter on the network using mDNS.
+    A probe is sent first, so running registries answer immediately
+    instead of on their next periodic announcement.
 
     :param filter: list of service names to filter by, defaults to None
     :param timeout: maximum time to wait for responses, defaults to 5 seconds
     :param maxcount: maximum number of services to return, defaults to 0 (unlimited)
+    :param multicast: Also discover services announced to this group, defaults to None
     :return: list of ServiceAddress instances
     """
     sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
     sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
     sock.bind(DISCOVERY_SERVICE_ADDR)
-    sock.setblocking(False)  # noqa: FBT003
+    # Probe replies are unicast to the probe socket
+    probe = open_probe_socket(multicast)
+    listening = [sock, probe]
+    if multicast is not None:
+        listening.append(multicast.open_socket())
     result = set()
 
-    with suppress(TimeoutError):
-        prefix = DISCOVERY_SERVICE_TYPE.encode("utf-8")
-        start = time.time()
-        while time.time() - start < timeout:
-            sock.settimeout(timeout)
-            data, addr = sock.recvfrom(1024)
-            if data.startswith(prefix):
-                service_addr = ServiceAddress.parse(data.decode("utf-8"))
-                if filter is None or service_addr.name in filter:
-                    result.add(service_addr)
-                    if maxcount > 0 and len(result) >= maxcount:
-                        break
-
-    with suppress(Exception):
-        sock.shutdown(socket.SHUT_RDWR)
-        sock.close()
+    try:
+        deadline = time.monotonic() + timeout
+        next_probe = 0
+        while (remaining := deadline - time.monotonic()) > 0:
+            if time.monotonic() >= next_probe:
+                send_probe(probe, filter, multicast)
+                next_probe = time.monotonic() + DISCOVERY_PROBE_INTERVAL
+            wait = min(remaining, DISCOVERY_PROBE_INTERVAL)
+            for ready in select.select(listening, [], [], wait)[0]:
+                data, _ = ready.recvfrom(DISCOVERY_DATAGRAM_SIZE)
+                for service_addr in parse_announcements(data):
+                    if filter is None or service_addr.name in filter:
+                        result.add(service_addr)
+            if maxcount > 0 and len(result) >= maxcount:
+                break
+    finally:
+        with suppress(Exception):
+            sock.shutdown(socket.SHUT_RDWR)
+            sock.close()
+        for other in listening[1:]:
+            other.close()
 
     return list(result)
 
 
+def format_announcements(addresses: Iterable[ServiceAddress]) -> list[bytes]:
+    """
+    Announcement datagrams of services.
+
+    Services of the same shared endpoint are announced in a single datagram.
+
+    :param addresses: The addresses to announce.
+    :return: The datagrams.
+    """
+    datagrams = []
+    shared: dict[tuple[str, int, int], list[ServiceAddress]] = {}
+    for address in addresses:
+        if address.shared:
+            key = (address.host, address.port, address.frame_port)
+            shared.setdefault(key, []).append(address)
+        else:
+            datagrams.append(str(address).encode("utf-8"))
+    datagrams.extend(ServiceAddress.join(group).encode("utf-8") for group in shared.values())
+    return datagrams
+
+
+def parse_announcements(data: bytes) -> list[ServiceAddress]:
+    """
+    Parse an announcement datagram.
+
+    :param data: The datagram.
+    :return: The announced addresses, empty if data is not a valid announcement.
+    """
+    if not data.startswith(DISCOVERY_SERVICE_TYPE.encode("utf-8")):
+        return []
+    try:
+        return ServiceAddress.parse_all(data.decode("utf-8"))
+    except (ValueError, UnicodeDecodeError):
+        logger.warning("Invalid announcement: %s", data)
+        return []
+
+
+def open_probe_socket(multicast: DiscoveryGroup | None = None) -> socket.socket:
+    """
+    Socket to send discovery probes and receive the answers.
+
+    :param multicast: Group the probes are also sent to. The socket then
+        listens on all interfaces so remote registries can answer.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+    if multicast is None:
+        sock.bind((LOCALHOST, 0))
+    else:
+        multicast.configure(sock)
+        sock.bind((ANY_HOST, 0))
+    return sock
+
+
+def send_probe(
+    sock: socket.socket | asyncio.DatagramTransport,
+    filter: list[str] | None = None,  # noqa: A002
+    multicast: DiscoveryGroup | None = None,
+) -> None:
+    """
+    Ask all registries to announce their services right now.
+
+    :param sock: Socket from open_probe_socket or a datagram transport
+        over it, answers are sent to it.
+    :param filter: Only services with these names should answer.
+    :param multicast: Also ask the registries of this group.
+    """
+    probe = f"{DISCOVERY_PROBE_TYPE}:{','.join(filter or ())}".encode()
+    targets = [DISCOVERY_PROBE_ADDR]
+    if multicast is not None:
+        targets.append(multicast.addr)
+    # A failing target must not skip the others
+    for target in targets:
+        try:
+            sock.sendto(probe, target)
+        except OSError as ex:  # noqa: PERF203
+            # Probes are an optimization, periodic announcements still work
+            logger.debug("Discovery probe to %s failed: %s", target, ex)
+
+
+def parse_probe(data: bytes) -> set[str] | None:
+    """
+    Parse a probe datagram.
+
+    :param data: The datagram.
+    :return: Set of requested names (empty means all), None if not a probe.
+    """
+    prefix = f"{DISCOVERY_PROBE_TYPE}:".encode()
+    if not data.startswith(prefix):
+        return None
+    names = data[len(prefix) :].decode("utf-8", errors="replace")
+    return {name for name in names.split(",") if name}
+
+
+def _open_probe_listener() -> socket.socket | None:
+    # All registries bind the broadcast probe address, each one gets every probe.
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind(DISCOVERY_PROBE_ADDR)
+    except OSError as ex:
+        logger.warning("Discovery probes disabled: %s", ex)
+        sock.close()
+        return None
+    return sock
+
+
+def is_loopback(host: str) -> bool:
+    """Check if host is a loopback address."""
+    try:
+        return ip_address(host).is_loopback
+    except ValueError:
+        return host == "localhost"
+
+
+def primary_address() -> str:
+    """
+    Address of the interface used for the default route.
+
+    No packet is sent, connecting a datagram socket only selects the route.
+    Falls back to LOCALHOST on machines without network.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        sock.connect(("192.0.2.1", 9))  # TEST-NET-1, never routed to a real host
+        return sock.getsockname()[0]
+    except OSError:
+        return LOCALHOST
+    finally:
+        sock.close()
+
+
 logger = getLogger("FreeCAD.Channels")
 
 LOCALHOST = "127.0.0.1"
 
+# Listen on all interfaces
+ANY_HOST = "0.0.0.0"  # noqa: S104
+
+# Retry hints of busy services, in seconds
+RETRY_AFTER_MIN = 0.05
+RETRY_AFTER_MAX = 5.0
+RETRY_AFTER_DEFAULT = 0.5
+
+# Server engines available for Service
+SERVER_ENGINES = ("simple", "threading", "pool")
+SERVER_POOL_WORKERS = 8
+
+# Lower bound of the handling time used to estimate the wait in a service,
+# so idle services with unknown latency still compare by queue depth
+LOAD_MIN_LATENCY = 0.001
+
+# Path of the metrics snapshot, prefixed with the service name on shared endpoints
+METRICS_PATH = "/metrics"
+
+# Idle timeout for persistent (keep-alive) connections on the server side
+KEEP_ALIVE_TIMEOUT = 15.0
+
 # Discovery service config
 DISCOVERY_SERVICE_HOST = LOCALHOST
 DISCOVERY_SERVICE_TYPE = "_freecad_channels._tcp.local."
 DISCOVERY_SERVICE_PORT = 58987
 DISCOVERY_SERVICE_ADDR = (DISCOVERY_SERVICE_HOST, DISCOVERY_SERVICE_PORT)
 
+# Receive buffer of discovery datagrams, shared endpoints announce many names at once
+DISCOVERY_DATAGRAM_SIZE = 8192
+
+# Discovery probes are broadcast on loopback to all registries
+DISCOVERY_PROBE_TYPE = "_freecad_channels._probe.local."
+DISCOVERY_PROBE_HOST = "127.255.255.255"
+DISCOVERY_PROBE_PORT = 58988
+DISCOVERY_PROBE_ADDR = (DISCOVERY_PROBE_HOST, DISCOVERY_PROBE_PORT)
+DISCOVERY_PROBE_INTERVAL = 0.5
+
+# Maximum wait of the registry loop between checks of registrations and probes
+REGISTRY_TICK = 0.25
+
 # Threads id sequence
 TID = count(1)
+
+# Connection pool shared by keep-alive clients
+_default_pool = ConnectionPool()
+
+# Shared endpoints by server options
+_shared_endpoints: dict[tuple, ServiceEndpoint] = {}
+_shared_endpoints_lock = threading.Lock()
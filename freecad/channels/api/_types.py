@@ -5,6 +5,7 @@
 FreeCAD Channels: Common types.
 """
 
+from dataclasses import dataclass
 from typing import Protocol
 
 
@@ -12,3 +13,38 @@ class ServiceController(Protocol):
     def stop(self) -> None: ...
     def start(self) -> None: ...
     def is_running(self) -> bool: ...
+
+
+@dataclass(slots=True)
+class DrainStats:
+    """
+    Queue drain statistics of a service controller.
+    """
+
+    ticks: int = 0
+    handled: int = 0
+    deferred_ticks: int = 0
+    last_handled: int = 0
+    last_pending: int = 0
+    last_duration: float = 0.0
+    max_duration: float = 0.0
+    last_interval: float = 0.0
+
+    def record(self, handled: int, pending: int, duration: float, interval: float) -> None:
+        """
+        Record one drain tick.
+
+        :param handled: Requests handled in the tick.
+        :param pending: Requests left in the queue after the tick.
+        :param duration: Seconds spent in the tick.
+        :param interval: Seconds until the next tick.
+        """
+        self.ticks += 1
+        self.handled += handled
+        if pending:
+            self.deferred_ticks += 1
+        self.last_handled = handled
+        self.last_pending = pending
+        self.last_duration = duration
+        self.max_duration = max(self.max_duration, duration)
+        self.last_interval = interval
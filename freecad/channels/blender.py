@@ -3,41 +3,133 @@
 
 from __future__ import annotations
 
+from functools import partial
+from itertools import zip_longest
 from typing import TYPE_CHECKING
 
-from freecad.channels.api import ServiceClient, ServiceRequest, find_channel_service
+from freecad.channels.api import BalancingClient, DiscoveryListener, ServiceRequest
 
 import FreeCAD as App  # type: ignore
 
+from .config import discovery_group
+
 if TYPE_CHECKING:
+    from concurrent.futures import Future
     from pathlib import Path
 
+    from .spool import ExportSpool
+
+# Seconds to wait for Blender to acknowledge the import of a spooled file,
+# once delivered
+IMPORT_ACK_TIMEOUT = 300
+
 
 class _State:
-    client: ServiceClient | None = None
+    client: BalancingClient | None = None
+    discovery: DiscoveryListener | None = None
+
+
+def discovery() -> DiscoveryListener:
+    """Background discovery listener, started on first use."""
+    if _State.discovery is None:
+        _State.discovery = DiscoveryListener(multicast=discovery_group())
+        _State.discovery.start()
+    return _State.discovery
 
 
-def find_blender(*, rediscover: bool = False, timeout: float = 5) -> ServiceClient:
-    if rediscover or _State.client is None:
-        servers = find_channel_service(filter=["Blender"], timeout=timeout, maxcount=1)
-        if servers:
-            App.Console.PrintMessage(f"Blender channel found: {servers[0]}\n")
-            _State.client = ServiceClient(servers[0])
-        else:
+def find_blender(*, rediscover: bool = False, timeout: float = 5) -> BalancingClient:
+    """
+    Client for all the Blender instances announcing the Blender channel.
+
+    Requests are spread over the instances by load, so several Blender
+    workers share the work.
+
+    :param rediscover: Ask running instances to announce themselves now.
+    :param timeout: Seconds to wait for a first instance.
+    """
+    client = _State.client
+    if client is None:
+        client = BalancingClient("Blender", discovery(), wait=timeout)
+        _State.client = client
+    if rediscover:
+        discovery().probe()
+        if discovery().wait_for("Blender", timeout) is None:
             msg = "Blender channel server not found"
             raise RuntimeError(msg)
-    return _State.client
+    return client
+
+
+def send_files(paths: list[Path], keys: list[str | None], timeout: float = 5) -> None:
+    """
+    Ask Blender to import exported files, one import per file, in the given order.
+
+    Files are sent in batches that fit the Blender queue. Spooled files
+    are released when Blender acknowledges their import, when a newer
+    import with the same key replaces it, when the acknowledgement times
+    out, or when they could not be sent at all.
 
+    :param paths: The exported files.
+    :param keys: Coalescing key of each file, a pending import with the same key is replaced.
+    :param timeout: Timeout in seconds to deliver each batch.
+    """
+    from .spool import export_spool
 
-def send_objects(path: Path, timeout: float = 5) -> None:
-    client = find_blender()
-    client.send(
+    spool = export_spool()
+    requests = [
         ServiceRequest(
             "FreeCAD",
             data={
                 "action": "import_file",
                 "path": str(path),
             },
-        ),
-        timeout=timeout,
-    )
+            key=key,
+        )
+        for path, key in zip(paths, keys, strict=True)
+    ]
+    futures = []
+    try:
+        futures = find_blender().call_many(
+            requests,
+            timeout=timeout,
+            reply_timeout=IMPORT_ACK_TIMEOUT,
+        )
+    finally:
+        # Files not handed over to Blender are released right away. Files
+        # outside the spool (cache hits) are ignored by release.
+        for path, future in zip_longest(paths, futures):
+            if future is None:
+                spool.release(path)
+            else:
+                future.add_done_callback(partial(_release, spool, path))
+    App.Console.PrintLog(f"{len(paths)} files sent to Blender channel\n")
+
+
+def _release(spool: ExportSpool, path: Path, _future: Future) -> None:
+    spool.release(path)
+
+
+def send_meshes(objects: list[App.DocumentObject], timeout: float = 5) -> None:
+    """
+    Send objects to Blender as binary mesh buffers, in batches that fit its queue.
+
+    :param objects: The objects to tessellate and send.
+    :param timeout: Timeout in seconds.
+    """
+    from .export import mesh_buffer
+
+    requests = [
+        ServiceRequest("FreeCAD", data=mesh_buffer(obj), key=mesh_key(obj)) for obj in objects
+    ]
+    find_blender().send_batches(requests, timeout=timeout)
+    App.Console.PrintLog(f"{len(requests)} meshes sent to Blender channel\n")
+
+
+def selection_key(objects: list[App.DocumentObject]) -> str:
+    """Coalescing key of an import of objects."""
+    names = sorted(f"{obj.Document.Name}#{obj.Name}" for obj in objects)
+    return "import_file:" + ",".join(names)
+
+
+def mesh_key(obj: App.DocumentObject) -> str:
+    """Coalescing key of a mesh buffer of an object."""
+    return f"mesh_buffer:{obj.Document.Name}#{obj.Name}"
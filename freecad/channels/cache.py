@@ -0,0 +1,252 @@
+# SPDX-License: LGPL-3.0-or-later
+# (c) 2025 Frank David Martínez Muñoz. <mnesarco at gmail.com>
+
+"""
+FreeCAD Channels: Tessellation cache.
+
+Exported files are stored under a content key, a digest of the object
+geometry (its BREP), the view properties written to the file and the
+export settings. Sending an unchanged object again reuses its file
+instead of tessellating it again, also across sessions.
+
+An entry is the set of files sharing the key as stem (.obj + .mtl,
+.gltf + .bin). The cache is bounded by size on disk and number of
+entries, least recently used entries are evicted first.
+
+Writers export to temporary names and move the main file into place
+last, an entry without its main file is still being written.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from collections import OrderedDict
+from contextlib import contextmanager, suppress
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    import FreeCAD as App  # type: ignore
+
+# Bounds of the cache
+CACHE_MAX_BYTES = 1024 * 1024 * 1024
+CACHE_MAX_ENTRIES = 4096
+
+# Files being written, and seconds after which they are leftovers of killed writers
+TEMP_SUFFIX = ".tmp"
+TEMP_MAX_AGE = 3600
+
+# Main file of each export format, the other files of an entry are its companions
+MAIN_SUFFIXES = frozenset((".obj", ".gltf"))
+
+# View properties that end up in the exported files
+VIEW_PROPERTIES = (
+    "ShapeColor",
+    "DiffuseColor",
+    "ShapeAppearance",
+    "Transparency",
+    "Deviation",
+    "AngularDeflection",
+)
+
+
+class TessellationCache:
+    """
+    Content addressed cache of exported files.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        *,
+        max_bytes: int = CACHE_MAX_BYTES,
+        max_entries: int = CACHE_MAX_ENTRIES,
+    ) -> None:
+        """
+        Initialize the cache, indexing the entries already on disk.
+
+        :param directory: Directory of the cached files.
+        :param max_bytes: Maximum total size of the cached files.
+        :param max_entries: Maximum number of entries.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, int] = OrderedDict()
+        self._size = 0
+        self._load()
+
+    def key(self, obj: App.DocumentObject, settings: str) -> str | None:
+        """
+        Content key of the export of an object.
+
+        :param obj: The object to export.
+        :param settings: Format and export settings, see export.export_settings.
+        :return: The key, None if the object can not be cached.
+        """
+        if obj.isDerivedFrom("App::Part"):
+            # Containers are exported with the colors of their children
+            return None
+        try:
+            import Part  # type: ignore
+
+            shape = Part.getShape(obj)
+        except Exception:  # noqa: BLE001
+            return None
+        if shape.isNull():
+            return None
+        content = "|".join((geometry_digest(shape), view_signature(obj), settings))
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()[:40]
+
+    def path(self, key: str, fmt: str) -> Path:
+        """File to export an entry to."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        return self.directory / f"{key}.{fmt}"
+
+    @contextmanager
+    def staging(self, key: str, fmt: str) -> Iterator[Path]:
+        """
+        File to export an entry to, moved into the cache once complete.
+
+        Exporters name companion files after the main file, so the export
+        goes to a private temporary directory. When the block exits
+        without error the companions are moved into place first and the
+        main file last.
+
+        :param key: Content key.
+        :param fmt: File extension of the main file.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix=f"{key}.", suffix=TEMP_SUFFIX, dir=self.directory))
+        try:
+            path = staging / f"{key}.{fmt}"
+            yield path
+            for file in staging.iterdir():
+                if file != path:
+                    file.replace(self.directory / file.name)
+            path.replace(self.directory / path.name)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def lookup(self, key: str, fmt: str) -> Path | None:
+        """
+        Cached file of an entry.
+
+        :param key: Content key.
+        :param fmt: File extension of the main file.
+        :return: The file, None if it is not cached.
+        """
+        path = self.directory / f"{key}.{fmt}"
+        if key in self._entries and path.exists():
+            self._entries.move_to_end(key)
+            with suppress(OSError):
+                os.utime(path)
+            self.hits += 1
+            return path
+        self._discard(key)
+        self.misses += 1
+        return None
+
+    def store(self, key: str) -> None:
+        """
+        Register the files just exported for key and evict old entries.
+
+        :param key: Content key.
+        """
+        self._discard(key)
+        size = sum(file.stat().st_size for file in self._files(key))
+        self._entries[key] = size
+        self._size += size
+        while len(self._entries) > 1 and (
+            self._size > self.max_bytes or len(self._entries) > self.max_entries
+        ):
+            oldest = next(iter(self._entries))
+            self._discard(oldest)
+            for file in self._files(oldest):
+                file.unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        """Delete all the cached files."""
+        for key in list(self._entries):
+            self._discard(key)
+            for file in self._files(key):
+                file.unlink(missing_ok=True)
+
+    def _files(self, key: str) -> list[Path]:
+        return [file for file in self.directory.glob(f"{key}.*") if file.suffix != TEMP_SUFFIX]
+
+    def _discard(self, key: str) -> None:
+        size = self._entries.pop(key, None)
+        if size is not None:
+            self._size -= size
+
+    def _load(self) -> None:
+        if not self.directory.is_dir():
+            return
+        entries: dict[str, tuple[float, int]] = {}
+        complete = set()
+        stale = time.time() - TEMP_MAX_AGE
+        for file in self.directory.iterdir():
+            with suppress(OSError):
+                stat = file.stat()
+                if file.suffix == TEMP_SUFFIX:
+                    if stat.st_mtime < stale:
+                        _remove(file)
+                    continue
+                used, size = entries.get(file.stem, (0.0, 0))
+                entries[file.stem] = (max(used, stat.st_mtime), size + stat.st_size)
+                if file.suffix in MAIN_SUFFIXES:
+                    complete.add(file.stem)
+        for key, (_, size) in sorted(entries.items(), key=lambda e: e[1][0]):
+            if key in complete:
+                self._entries[key] = size
+                self._size += size
+
+
+def _remove(path: Path) -> None:
+    if path.is_dir():
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        path.unlink(missing_ok=True)
+
+
+def geometry_digest(shape: Any) -> str:
+    """
+    Digest of the BREP of a shape.
+
+    The shape is serialized every time: hashCode is based on memory
+    addresses and can be reused by a different shape.
+    """
+    brep = shape.exportBrepToString().encode("utf-8")
+    return hashlib.sha256(brep).hexdigest()
+
+
+def view_signature(obj: App.DocumentObject) -> str:
+    """Label and view properties of an object that are written to exported files."""
+    values = [obj.Label]
+    if (view := getattr(obj, "ViewObject", None)) is not None:
+        for name in VIEW_PROPERTIES:
+            value = getattr(view, name, None)
+            if name == "ShapeAppearance" and value is not None:
+                # Materials have no stable repr
+                value = [
+                    (
+                        m.AmbientColor,
+                        m.DiffuseColor,
+                        m.SpecularColor,
+                        m.EmissiveColor,
+                        m.Shininess,
+                        m.Transparency,
+                    )
+                    for m in value
+                ]
+            values.append(repr(value))
+    return "|".join(values)
@@ -8,4 +8,11 @@ FreeCAD Channels: Commands.
 """
 
 from .service import StartService, StopService
-from .blender import BlenderSendGltf, BlenderSendObj, BlenderFindService, BlenderDownloadExtension
+from .blender import (
+    BlenderDownloadExtension,
+    BlenderFindService,
+    BlenderLiveSync,
+    BlenderSendGltf,
+    BlenderSendMesh,
+    BlenderSendObj,
+)
@@ -6,9 +6,7 @@ from pathlib import Path
 
 import FreeCAD as App  # type: ignore
 
-from freecad.channels.blender import send_objects, find_blender
 from freecad.channels.config import commands, resources
-from freecad.channels.export import export_gltf, export_obj
 from freecad.channels.vendor.fcapi.lang import QT_TRANSLATE_NOOP
 
 
@@ -18,14 +16,14 @@ from freecad.channels.vendor.fcapi.lang import QT_TRANSLATE_NOOP
     icon=resources.icon("discover.svg"),
 )
 def BlenderFindService() -> None:
+    from freecad.channels.blender import find_blender
     from freecad.channels.vendor.fcapi.fcui import show_info, show_error
 
     try:
         service = find_blender(rediscover=True, timeout=5)
-        if service:
-            show_info(
-                f"Blender service channel found at: {service.address.display}", title="Channels"
-            )
+        if peers := service.peers():
+            found = ", ".join(peer.display for peer in peers)
+            show_info(f"Blender service channel found at: {found}", title="Channels")
         else:
             show_error("Blender service channel not found", title="Channels")
     except Exception:  # noqa: BLE001
@@ -41,15 +39,21 @@ class BlenderSendObj:
     """Send objects to Blender using .obj format."""
 
     def on_activated(self) -> None:
+        from freecad.channels.blender import selection_key, send_files
+        from freecad.channels.export import FORMAT_OBJ, export_obj
+        from freecad.channels.sync import live_sync
+
         objects = App.Gui.Selection.getSelection()
-        path = export_obj(objects)
+        paths = export_obj(objects)
         try:
-            send_objects(path)
+            send_files(paths, [selection_key([obj]) for obj in objects])
         except Exception:  # noqa: BLE001
             App.Console.PrintError(
                 "Failed to send objects to Blender. "
                 "Is FreeCAD Channels extension activated in Blender?\n",
             )
+        else:
+            live_sync().track(objects, FORMAT_OBJ)
 
     def is_active(self) -> bool:
         selection = App.Gui.Selection.getSelection()
@@ -65,21 +69,77 @@ class BlenderSendGltf:
     """Send objects to Blender using .glTF format."""
 
     def on_activated(self) -> None:
+        from freecad.channels.blender import selection_key, send_files
+        from freecad.channels.export import FORMAT_GLTF, export_gltf
+        from freecad.channels.sync import live_sync
+
         objects = App.Gui.Selection.getSelection()
-        path = export_gltf(objects)
+        paths = export_gltf(objects)
         try:
-            send_objects(path)
+            send_files(paths, [selection_key([obj]) for obj in objects])
         except Exception:  # noqa: BLE001
             App.Console.PrintError(
                 "Failed to send objects to Blender. "
                 "Is FreeCAD Channels extension activated in Blender?\n",
             )
+        else:
+            live_sync().track(objects, FORMAT_GLTF)
 
     def is_active(self) -> bool:
         selection = App.Gui.Selection.getSelection()
         return selection and all(is_shape(obj) or is_part(obj) for obj in selection)
 
 
+@commands.add(
+    label=QT_TRANSLATE_NOOP("Channels", "Send Objects to Blender as meshes"),
+    tooltip=QT_TRANSLATE_NOOP(
+        "Channels",
+        "Send Objects to Blender as binary mesh data, without intermediate files",
+    ),
+    icon=resources.icon("send.svg"),
+)
+class BlenderSendMesh:
+    """Send objects to Blender as binary mesh buffers."""
+
+    def on_activated(self) -> None:
+        from freecad.channels.blender import send_meshes
+        from freecad.channels.export import FORMAT_MESH
+        from freecad.channels.sync import live_sync
+
+        objects = App.Gui.Selection.getSelection()
+        try:
+            send_meshes(objects)
+        except Exception:  # noqa: BLE001
+            App.Console.PrintError(
+                "Failed to send objects to Blender. "
+                "Is FreeCAD Channels extension activated in Blender?\n",
+            )
+        else:
+            live_sync().track(objects, FORMAT_MESH)
+
+    def is_active(self) -> bool:
+        selection = App.Gui.Selection.getSelection()
+        return selection and all(map(is_shape, selection))
+
+
+@commands.add(
+    label=QT_TRANSLATE_NOOP("Channels", "Live sync with Blender"),
+    tooltip=QT_TRANSLATE_NOOP(
+        "Channels",
+        "Send objects already sent to Blender again when they change",
+    ),
+    icon=resources.icon("send.svg"),
+    checked=False,
+)
+class BlenderLiveSync:
+    """Toggle live sync of the objects sent to Blender."""
+
+    def on_activated(self, checked: bool = False) -> None:  # noqa: FBT001, FBT002
+        from freecad.channels.sync import live_sync
+
+        live_sync().enabled = bool(checked)
+
+
 @commands.add(
     label=QT_TRANSLATE_NOOP("Channels", "Download Blender extension for FreeCAD Channels"),
     tooltip=QT_TRANSLATE_NOOP("Channels", "Download Blender extension for FreeCAD Channels"),
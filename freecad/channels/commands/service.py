@@ -8,6 +8,7 @@ FreeCAD Channels: Start Channels Main Service.
 from __future__ import annotations
 
 from freecad.channels.config import commands, resources
+from freecad.channels.service import is_running, service
 from freecad.channels.vendor.fcapi.lang import QT_TRANSLATE_NOOP
 
 
@@ -20,14 +21,10 @@ class StartService:
     """Start Channels Main Service."""
 
     def on_activated(self) -> None:
-        from freecad.channels.service import service
-
-        service.start()
+        service().start()
 
     def is_active(self) -> bool:
-        from freecad.channels.service import service
-
-        return not service.is_running()
+        return not is_running()
 
 
 @commands.add(
@@ -39,11 +36,7 @@ class StopService:
     """Stop Channels Main Service."""
 
     def on_activated(self) -> None:
-        from freecad.channels.service import service
-
-        service.stop()
+        service().stop()
 
     def is_active(self) -> bool:
-        from freecad.channels.service import service
-
-        return service.is_running()
+        return is_running()
@@ -1,12 +1,85 @@
 # SPDX-License: LGPL-3.0-or-later
 # (c) 2025 Frank David Martínez Muñoz. <mnesarco at gmail.com>
 
+"""
+FreeCAD Channels: Configuration.
+
+Only what FreeCAD needs at startup is loaded here: resources and the
+command registry. Preferences and the channels api load on first use.
+"""
+
+from __future__ import annotations
+
+from functools import cache
+from typing import TYPE_CHECKING
+
+import FreeCAD as App  # type: ignore
+
 from .vendor.fcapi.resources import Resources
 from .vendor.fcapi.commands import CommandRegistry
 
 from . import resources as channels_resources
-from .preferences import ChannelsPreferences
+
+if TYPE_CHECKING:
+    from .api import DiscoveryGroup
+    from .preferences import ChannelsPreferences
 
 resources = Resources(channels_resources)
 commands = CommandRegistry("Chn_")
-preferences = ChannelsPreferences()
+
+# Parameter group of ChannelsPreferences
+PREFERENCES_GROUP = "Preferences/Mod/Channels/General"
+PREFERENCES_UI_GROUP = "Channels"
+
+
+@cache
+def preferences() -> ChannelsPreferences:
+    """Channels preferences, the preferences machinery is loaded on first use."""
+    from .preferences import ChannelsPreferences
+
+    return ChannelsPreferences()
+
+
+def start_on_boot() -> bool:
+    """Cheap read of the start_on_boot preference, used during FreeCAD startup."""
+    group = App.ParamGet(f"User parameter:BaseApp/{PREFERENCES_GROUP}")
+    return group.GetBool("start_on_boot", False)  # noqa: FBT003
+
+
+def discovery_group() -> DiscoveryGroup | None:
+    """Multicast discovery group enabled in preferences, None for local only discovery."""
+    from .api import DiscoveryGroup, primary_address
+
+    if not preferences().lan_discovery():
+        return None
+    return DiscoveryGroup(interface=preferences().lan_interface() or primary_address())
+
+
+class ChannelsPreferencesPage:
+    """
+    Channels page of the FreeCAD preferences dialog.
+
+    Installed at startup, the real page is built when the dialog shows it.
+    FreeCAD keys pages by class name, so the name must be unique.
+    """
+
+    def __init__(self, _parent: object = None) -> None:
+        """
+        Build the page.
+
+        :param _parent: Parent widget given by FreeCAD, unused.
+        """
+        from .preferences import preferences_page
+
+        self._impl = preferences_page()()
+        self.form = self._impl.build()
+
+    def saveSettings(self) -> None:
+        self._impl.on_save()
+
+    def loadSettings(self) -> None:
+        self._impl.on_load()
+
+
+def install_preferences_page() -> None:
+    App.Gui.addPreferencePage(ChannelsPreferencesPage, PREFERENCES_UI_GROUP)
@@ -3,24 +3,187 @@
 
 from __future__ import annotations
 
+from array import array
 from pathlib import Path
-from typing import TYPE_CHECKING
-from uuid import uuid4
+from typing import TYPE_CHECKING, Any
+
+from .cache import TessellationCache
+from .spool import export_spool
+from .tessellation import (
+    DEFAULT_COLOR,
+    WORKER_WRITER,
+    tessellation_parameters,
+    tessellation_pool,
+)
 
 if TYPE_CHECKING:
     import FreeCAD as App  # type: ignore
 
+# Export formats, also the file extensions
+FORMAT_OBJ = "obj"
+FORMAT_GLTF = "gltf"
+
+# Meshes sent as binary buffers, no file involved
+FORMAT_MESH = "mesh"
+
+# Preference groups with settings that change the exported files
+EXPORT_PARAMETERS = ("Mod/Mesh", "Mod/Import", "Mod/Arch")
+
+
+class _State:
+    cache: TessellationCache | None = None
+
+
+def tessellation_cache() -> TessellationCache:
+    if _State.cache is None:
+        _State.cache = TessellationCache(Path.home() / ".freecad" / "channels" / "cache")
+    return _State.cache
+
+
+def export_settings(fmt: str) -> str:
+    """Format and export preferences, part of the tessellation cache keys."""
+    import FreeCAD as App  # type: ignore
+
+    values = [fmt]
+    for group in EXPORT_PARAMETERS:
+        param = App.ParamGet(f"User parameter:BaseApp/Preferences/{group}")
+        if hasattr(param, "GetContents"):
+            values.append(repr(sorted(param.GetContents() or (), key=repr)))
+    return "|".join(values)
+
+
+def export_objects(objects: list[App.DocumentObject], fmt: str) -> list[Path]:
+    """
+    Export objects one file per object, reusing cached files of unchanged objects.
+
+    Objects that can not be cached are exported to the spool, the files
+    are released by blender.send_files once imported.
+
+    Objects not cached are exported to .obj in parallel by the tessellation
+    pool when it is available. All the misses use the same writer and the
+    writer is part of the cache key, jobs the pool could not do are
+    exported in process to the spool instead of the cache.
+
+    :param objects: The objects to export.
+    :param fmt: FORMAT_OBJ or FORMAT_GLTF.
+    :return: One file per object, in the same order.
+    """
+    cache = tessellation_cache()
+    pool = tessellation_pool() if fmt == FORMAT_OBJ else None
+    settings = export_settings(fmt)
+    if pool is not None:
+        settings += f"|{WORKER_WRITER}"
+    paths: list[Path | None] = []
+    misses = []
+    for obj in objects:
+        key = cache.key(obj, settings)
+        if key is None:
+            paths.append(_export([obj], export_spool().file(fmt), fmt))
+        elif (path := cache.lookup(key, fmt)) is not None:
+            paths.append(path)
+        else:
+            misses.append((len(paths), obj, key))
+            paths.append(None)
+
+    if pool is None:
+        for index, obj, key in misses:
+            with cache.staging(key, fmt) as path:
+                _export([obj], path, fmt)
+            paths[index] = cache.path(key, fmt)
+            cache.store(key)
+        return paths
+
+    exported = pool.export_obj([(obj, cache.path(key, fmt)) for _, obj, key in misses])
+    for (index, obj, key), done in zip(misses, exported, strict=True):
+        if done:
+            paths[index] = cache.path(key, fmt)
+            cache.store(key)
+        else:
+            # Written by another writer, not cached under the key of the pool
+            paths[index] = _export([obj], export_spool().file(fmt), fmt)
+    return paths
+
+
+def export_obj(objects: list[App.DocumentObject]) -> list[Path]:
+    return export_objects(objects, FORMAT_OBJ)
+
+
+def export_gltf(objects: list[App.DocumentObject]) -> list[Path]:
+    return export_objects(objects, FORMAT_GLTF)
+
+
+def mesh_buffer(obj: App.DocumentObject) -> dict[str, Any]:
+    """
+    Tessellate an object into flat binary arrays, see the mesh_buffer action in Blender.
+
+    Faces of shapes are tessellated separately so vertices are not shared
+    across edges, per vertex normals are averaged within each face only.
+
+    :param obj: The object.
+    :return: Request data with name, vertices (xyz float32), normals (xyz
+        float32, one per vertex), indices (uint32, three per triangle) and
+        color (rgba).
+    """
+    vertices = array("f")
+    normals = array("f")
+    indices = array("I")
+    if obj.isDerivedFrom("Mesh::Feature"):
+        _append_mesh(*obj.Mesh.Topology, vertices, normals, indices)
+    else:
+        import Part  # type: ignore
+
+        shape = Part.getShape(obj)
+        deflection, _ = tessellation_parameters(obj, shape)
+        for face in shape.Faces:
+            _append_mesh(*face.tessellate(deflection), vertices, normals, indices)
+
+    view = getattr(obj, "ViewObject", None)
+    r, g, b = getattr(view, "ShapeColor", DEFAULT_COLOR)[:3]
+    alpha = 1.0 - getattr(view, "Transparency", 0) / 100.0
+    return {
+        "action": "mesh_buffer",
+        "name": obj.Label,
+        "vertices": vertices,
+        "normals": normals,
+        "indices": indices,
+        "color": [r, g, b, alpha],
+    }
+
+
+def _append_mesh(
+    points: list[App.Vector],
+    triangles: list[tuple[int, int, int]],
+    vertices: array,
+    normals: array,
+    indices: array,
+) -> None:
+    offset = len(vertices) // 3
+    accum = [[0.0, 0.0, 0.0] for _ in points]
+    for a, b, c in triangles:
+        # Area weighted triangle normal
+        n = (points[b] - points[a]).cross(points[c] - points[a])
+        for i in (a, b, c):
+            acc = accum[i]
+            acc[0] += n.x
+            acc[1] += n.y
+            acc[2] += n.z
+        indices.extend((a + offset, b + offset, c + offset))
+    for p in points:
+        vertices.extend((p.x, p.y, p.z))
+    for x, y, z in accum:
+        length = (x * x + y * y + z * z) ** 0.5 or 1.0
+        normals.extend((x / length, y / length, z / length))
+
 
-def temp(name: str, ext: str) -> Path:
-    parent = Path.home() / ".freecad" / "channels"
-    parent.mkdir(parents=True, exist_ok=True)
-    return parent / f"{name}.{ext}"
+def _export(objects: list[App.DocumentObject], filename: Path, fmt: str) -> Path:
+    if fmt == FORMAT_OBJ:
+        return _export_obj(objects, filename)
+    return _export_gltf(objects, filename)
 
 
-def export_obj(objects: list[App.DocumentObject]) -> Path:
+def _export_obj(objects: list[App.DocumentObject], filename: Path) -> Path:
     from importers import importOBJ  # type: ignore
 
-    filename = temp(str(uuid4()), "obj")
     if hasattr(importOBJ, "exportOptions"):
         options = importOBJ.exportOptions(str(filename))
         importOBJ.export(objects, str(filename), options)
@@ -37,10 +200,9 @@ def export_obj(objects: list[App.DocumentObject]) -> Path:
     return filename
 
 
-def export_gltf(objects: list[App.DocumentObject]) -> Path:
+def _export_gltf(objects: list[App.DocumentObject], filename: Path) -> Path:
     import ImportGui  # type: ignore
 
-    filename = temp(str(uuid4()), "gltf")
     if hasattr(ImportGui, "exportOptions"):
         options = ImportGui.exportOptions(str(filename))
         ImportGui.export(objects, str(filename), options)
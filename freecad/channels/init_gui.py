@@ -1,15 +1,18 @@
 # SPDX-License: LGPL-3.0-or-later
 # (c) 2025 Frank David Martínez Muñoz. <mnesarco at gmail.com>
 
-# ruff: noqa: F401
+# Commands and menus are registered here. The service, the channels api
+# and the preferences machinery are loaded on first use.
 
-from . import service
 from . import commands
 from . import config
+from . import service
+from . import spool
 
 from freecad.channels.vendor.fcapi.workbenches import Rules
 
 config.commands.install()
+config.install_preferences_page()
 
 rules = Rules("Channels_WBM")
 
@@ -17,10 +20,15 @@ rules = Rules("Channels_WBM")
 rules.menubar_append(commands.StartService.name, sibling="Std_DlgParameter")
 rules.menubar_append(commands.StopService.name, sibling="Std_DlgParameter")
 rules.menubar_append(commands.BlenderFindService.name, sibling="Std_DlgParameter")
+rules.menubar_append(commands.BlenderLiveSync.name, sibling="Std_DlgParameter")
 rules.menubar_append(commands.BlenderDownloadExtension.name, sibling="Std_DlgParameter")
 
 # Context menu
 rules.context_menu_append(commands.BlenderSendObj.name, sibling="Std_Placement")
 rules.context_menu_append(commands.BlenderSendGltf.name, sibling="Std_Placement")
+rules.context_menu_append(commands.BlenderSendMesh.name, sibling="Std_Placement")
 
 rules.install()
+
+service.start_deferred()
+spool.sweep_deferred()
@@ -3,18 +3,24 @@
 
 from __future__ import annotations
 
+from .config import PREFERENCES_GROUP, PREFERENCES_UI_GROUP
 from .vendor.fcapi.preferences import (
     Preference,
     Preferences,
+    PreferencesPage,
     auto_gui,
+    make_preferences_page,
     validators as valid,
 )
 from .vendor.fcapi.lang import dtr
 
 
+# The page is installed by config.ChannelsPreferencesPage, not on gui_up,
+# so this module is only loaded when needed.
 @auto_gui(
-    default_ui_group="Channels",
+    default_ui_group=PREFERENCES_UI_GROUP,
     default_ui_page=dtr("Channels", "General"),
+    install=False,
     enable_presets=False,
 )
 class ChannelsPreferences(Preferences):
@@ -22,7 +28,7 @@ class ChannelsPreferences(Preferences):
     Channels Import Preferences.
     """
 
-    group = "Preferences/Mod/Channels/General"
+    group = PREFERENCES_GROUP
 
     start_on_boot = Preference(
         group,
@@ -35,3 +41,56 @@ class ChannelsPreferences(Preferences):
         ),
         ui_section=dtr("Channels", "Service"),
     )
+
+    lan_discovery = Preference(
+        group,
+        name="lan_discovery",
+        default=False,
+        label=dtr("Channels", "Discover services on the local network"),
+        description=dtr(
+            "Channels",
+            "Announce and discover services on the local network using multicast. "
+            "Services listen on the LAN interface and accept connections from other machines.",
+        ),
+        ui_section=dtr("Channels", "Network"),
+    )
+
+    lan_interface = Preference(
+        group,
+        name="lan_interface",
+        default="",
+        label=dtr("Channels", "LAN interface address"),
+        description=dtr(
+            "Channels",
+            "IPv4 address of the network interface used for LAN discovery. "
+            "Empty uses the interface of the default route.",
+        ),
+        ui_section=dtr("Channels", "Network"),
+    )
+
+    export_workers = Preference(
+        group,
+        name="export_workers",
+        default=0,
+        label=dtr("Channels", "Export worker processes"),
+        description=dtr(
+            "Channels",
+            "Number of background FreeCAD processes tessellating objects in parallel "
+            "on export. 0 uses one per core, 1 exports in the main process.",
+        ),
+        ui_section=dtr("Channels", "Export"),
+        ui_validators=[valid.min(0), valid.max(64)],
+    )
+
+
+def preferences_page() -> type[PreferencesPage]:
+    """Page class for the preferences dialog, built from the auto_gui declarations."""
+    gui = ChannelsPreferences._gui  # noqa: SLF001
+    [(group, pages)] = gui.ui_groups.items()
+    [(title, items)] = pages.items()
+    return make_preferences_page(
+        group=group,
+        title=title,
+        elements=items,
+        enable_presets=gui.enable_presets,
+    )
@@ -1,11 +1,57 @@
 # SPDX-License: LGPL-3.0-or-later
 # (c) 2025 Frank David Martínez Muñoz. <mnesarco at gmail.com>
 
-from freecad.channels.api import ServiceRequest, channel_handler
-from .config import preferences
+"""
+FreeCAD Channels: FreeCAD channel service.
 
-start_on_boot = preferences.start_on_boot()
+The service, its registry and threads are created on first use, not
+during FreeCAD startup.
+"""
 
-@channel_handler(name="FreeCAD", queue_size=50, start=start_on_boot)
-def service(data: ServiceRequest) -> None:
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from .config import discovery_group, start_on_boot
+
+if TYPE_CHECKING:
+    from freecad.channels.api import ServiceController, ServiceRequest
+
+
+class _State:
+    service: ServiceController | None = None
+
+
+def handler(data: ServiceRequest) -> None:
     pass
+
+
+def service() -> ServiceController:
+    """FreeCAD channel service controller, created on first use."""
+    if _State.service is None:
+        from freecad.channels.api import ServiceRegistry, channel_handler
+
+        multicast = discovery_group()
+        _State.service = channel_handler(
+            name="FreeCAD",
+            queue_size=50,
+            start=False,
+            keep_alive=True,
+            push=True,
+            registry=ServiceRegistry(multicast=multicast) if multicast else None,
+            host=multicast.interface if multicast else None,
+        )(handler)
+    return _State.service
+
+
+def is_running() -> bool:
+    """The service is running, without creating it."""
+    return _State.service is not None and _State.service.is_running()
+
+
+def start_deferred() -> None:
+    """Start the service once FreeCAD startup is done, if enabled in preferences."""
+    if start_on_boot():
+        from PySide.QtCore import QTimer  # type: ignore
+
+        QTimer.singleShot(0, lambda: service().start())
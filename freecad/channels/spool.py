@@ -0,0 +1,210 @@
+# SPDX-License: LGPL-3.0-or-later
+# (c) 2025 Frank David Martínez Muñoz. <mnesarco at gmail.com>
+
+"""
+FreeCAD Channels: Export spool.
+
+Exports that are not kept in the tessellation cache are written to the
+spool, in RAM (/dev/shm) when available. Each FreeCAD process uses its
+own directory so concurrent instances do not step on each other. Files
+are released when Blender acknowledges the import or replaces it with a
+newer one, files never acknowledged are evicted by age and total size,
+and directories left by processes that are gone are swept at startup.
+"""
+
+from __future__ import annotations
+
+import atexit
+import getpass
+import os
+import shutil
+import stat
+import tempfile
+import threading
+import time
+from contextlib import suppress
+from pathlib import Path
+from uuid import uuid4
+
+# Bounds of the spool, files are evicted oldest first
+SPOOL_MAX_BYTES = 256 * 1024 * 1024
+SPOOL_MAX_AGE = 3600
+
+# Spool directories are private to the user
+SPOOL_MODE = 0o700
+
+# Preferred tmpfs mount, RAM backed on Linux
+SHM_DIRECTORY = Path("/dev/shm")  # noqa: S108
+
+# Exports written by older versions directly in this directory
+LEGACY_DIRECTORY = Path.home() / ".freecad" / "channels"
+LEGACY_SUFFIXES = frozenset((".obj", ".mtl", ".gltf", ".bin"))
+
+
+class ExportSpool:
+    """
+    Bounded directory of transient export files.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        *,
+        max_bytes: int = SPOOL_MAX_BYTES,
+        max_age: float = SPOOL_MAX_AGE,
+    ) -> None:
+        """
+        Initialize the spool.
+
+        :param directory: Directory of this process, created on first use.
+        :param max_bytes: Maximum total size of the files.
+        :param max_age: Seconds before files never released are evicted.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._lock = threading.Lock()
+
+    def file(self, ext: str) -> Path:
+        """
+        New file name in the spool, old files are evicted first.
+
+        :param ext: File extension without dot.
+        """
+        self.evict()
+        self.directory.mkdir(mode=SPOOL_MODE, parents=True, exist_ok=True)
+        return self.directory / f"{uuid4()}.{ext}"
+
+    def owns(self, path: Path) -> bool:
+        return path.parent == self.directory
+
+    def release(self, path: Path) -> None:
+        """
+        Delete a spooled file and its companions (.mtl, .bin).
+
+        Files outside the spool are ignored.
+
+        :param path: The spooled file.
+        """
+        if not self.owns(path):
+            return
+        with self._lock:
+            for file in self.directory.glob(f"{path.stem}.*"):
+                file.unlink(missing_ok=True)
+
+    def evict(self) -> None:
+        """Delete files older than max_age, then the oldest until below max_bytes."""
+        if not self.directory.is_dir():
+            return
+        with self._lock:
+            files = []
+            for file in self.directory.iterdir():
+                with suppress(OSError):
+                    stat = file.stat()
+                    files.append((stat.st_mtime, stat.st_size, file))
+            files.sort()
+            expired = time.time() - self.max_age
+            total = sum(size for _, size, _ in files)
+            for mtime, size, file in files:
+                if mtime >= expired and total <= self.max_bytes:
+                    break
+                file.unlink(missing_ok=True)
+                total -= size
+
+    def clear(self) -> None:
+        """Delete the directory of this process."""
+        with self._lock:
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+
+class _State:
+    root: Path | None = None
+    spool: ExportSpool | None = None
+
+
+def spool_root() -> Path:
+    """
+    Parent of the spool directories, in RAM if possible.
+
+    The shared path is predictable, so it is only used if it is a real
+    directory owned by the current user. Otherwise this process uses a
+    private temporary directory, deleted at exit.
+    """
+    if _State.root is None:
+        base = SHM_DIRECTORY
+        if not (base.is_dir() and os.access(base, os.W_OK)):
+            base = Path(tempfile.gettempdir())
+        root = base / f"freecad-channels-{getpass.getuser()}"
+        with suppress(OSError):
+            root.mkdir(mode=SPOOL_MODE, exist_ok=True)
+        if not _is_private(root):
+            root = Path(tempfile.mkdtemp(prefix="freecad-channels-"))
+            atexit.register(shutil.rmtree, root, ignore_errors=True)
+        _State.root = root
+    return _State.root
+
+
+def export_spool() -> ExportSpool:
+    """Spool of this process, deleted at exit."""
+    if _State.spool is None:
+        _State.spool = ExportSpool(spool_root() / str(os.getpid()))
+        atexit.register(_State.spool.clear)
+    return _State.spool
+
+
+def sweep_leftovers() -> None:
+    """Delete spool directories of processes that are gone and legacy export files."""
+    root = spool_root()
+    if root.is_dir():
+        for directory in root.iterdir():
+            if directory.name.isdigit() and _is_stale(directory):
+                shutil.rmtree(directory, ignore_errors=True)
+    if LEGACY_DIRECTORY.is_dir():
+        for file in LEGACY_DIRECTORY.iterdir():
+            if file.suffix in LEGACY_SUFFIXES and file.is_file():
+                file.unlink(missing_ok=True)
+
+
+def sweep_deferred() -> None:
+    """Sweep leftovers once FreeCAD startup is done."""
+    from PySide.QtCore import QTimer  # type: ignore
+
+    QTimer.singleShot(0, sweep_leftovers)
+
+
+def _is_private(directory: Path) -> bool:
+    try:
+        info = directory.lstat()
+    except OSError:
+        return False
+    if not stat.S_ISDIR(info.st_mode):
+        # Symbolic links are not followed
+        return False
+    getuid = getattr(os, "getuid", None)
+    if getuid is not None and info.st_uid != getuid():
+        return False
+    if stat.S_IMODE(info.st_mode) != SPOOL_MODE:
+        # Created with the default mode by older versions
+        try:
+            directory.chmod(SPOOL_MODE)
+        except OSError:
+            return False
+    return True
+
+
+def _is_stale(directory: Path) -> bool:
+    pid = int(directory.name)
+    if pid == os.getpid():
+        return False
+    if os.name == "nt":
+        # os.kill would terminate the process, rely on the age instead
+        with suppress(OSError):
+            return time.time() - directory.stat().st_mtime > SPOOL_MAX_AGE
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return True
+    except OSError:
+        return False
+    return False
@@ -0,0 +1,168 @@
+# SPDX-License: LGPL-3.0-or-later
+# (c) 2025 Frank David Martínez Muñoz. <mnesarco at gmail.com>
+
+"""
+FreeCAD Channels: Live sync with Blender.
+
+Objects sent to Blender are tracked per document. While live sync is
+enabled, changes to a tracked object, or to anything it depends on, mark
+it dirty. Once the document has been quiet for LIVE_SYNC_SETTLE seconds
+after a recompute, only the dirty objects are exported and sent again.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import FreeCAD as App  # type: ignore
+
+from .export import FORMAT_GLTF, FORMAT_MESH, FORMAT_OBJ
+from .vendor.fcapi.events import events
+
+if TYPE_CHECKING:
+    from PySide.QtCore import QTimer  # type: ignore
+
+# Seconds without changes after a recompute before dirty objects are sent
+LIVE_SYNC_SETTLE = 0.3
+
+# Properties whose changes are visible in Blender
+SYNC_PROPERTIES = frozenset(("Shape", "Placement", "Mesh"))
+
+
+class LiveSync:
+    """
+    Tracks the objects sent to Blender and resends them when they change.
+    """
+
+    def __init__(self, settle: float = LIVE_SYNC_SETTLE) -> None:
+        """
+        Initialize the tracker, live sync starts disabled.
+
+        :param settle: Seconds without changes before dirty objects are sent.
+        """
+        self.settle = settle
+        self.enabled = False
+        # Document name: {object name: export format}
+        self._tracked: dict[str, dict[str, str]] = {}
+        self._dirty: dict[str, set[str]] = {}
+        self._timers: dict[str, QTimer] = {}
+
+    def track(self, objects: list[App.DocumentObject], fmt: str) -> None:
+        """
+        Remember objects sent to Blender.
+
+        :param objects: The sent objects.
+        :param fmt: Export format used, FORMAT_OBJ, FORMAT_GLTF or FORMAT_MESH.
+        """
+        for obj in objects:
+            self._tracked.setdefault(obj.Document.Name, {})[obj.Name] = fmt
+
+    def tracked(self, doc: App.Document) -> list[str]:
+        """Names of the objects of doc tracked for live sync."""
+        return list(self._tracked.get(doc.Name, ()))
+
+    def clear(self) -> None:
+        """Forget all tracked objects."""
+        self._tracked.clear()
+        self._dirty.clear()
+        for timer in self._timers.values():
+            timer.stop()
+
+    @events.doc_object.changed
+    def on_changed(self, event: events.DocumentObjectPropertyEvent) -> None:
+        if event.prop in SYNC_PROPERTIES:
+            self._touch(event.obj)
+
+    @events.doc_object.recomputed
+    def on_recomputed(self, event: events.DocumentObjectEvent) -> None:
+        self._touch(event.obj)
+
+    @events.document.recomputed
+    def on_document_recomputed(self, event: events.DocumentEvent) -> None:
+        if event.doc.Name in self._dirty:
+            self._schedule(event.doc.Name)
+
+    @events.doc_object.deleted
+    def on_deleted(self, event: events.DocumentObjectEvent) -> None:
+        doc = event.obj.Document.Name
+        if tracked := self._tracked.get(doc):
+            tracked.pop(event.obj.Name, None)
+        if dirty := self._dirty.get(doc):
+            dirty.discard(event.obj.Name)
+
+    @events.document.deleted
+    def on_document_deleted(self, event: events.DocumentEvent) -> None:
+        self._tracked.pop(event.doc.Name, None)
+        self._dirty.pop(event.doc.Name, None)
+        if timer := self._timers.pop(event.doc.Name, None):
+            timer.stop()
+
+    def _touch(self, obj: App.DocumentObject) -> None:
+        if not self.enabled:
+            return
+        doc = obj.Document.Name
+        tracked = self._tracked.get(doc)
+        if not tracked:
+            return
+        if obj.Name in tracked:
+            affected = {obj.Name}
+        else:
+            # Tracked containers and links do not always recompute with their sources
+            affected = {o.Name for o in obj.InListRecursive} & tracked.keys()
+        if affected:
+            self._dirty.setdefault(doc, set()).update(affected)
+            self._schedule(doc)
+
+    def _schedule(self, doc: str) -> None:
+        # Restarted on every change, fires once the document is quiet
+        timer = self._timers.get(doc)
+        if timer is None:
+            from PySide.QtCore import QTimer  # type: ignore
+
+            timer = QTimer()
+            timer.setSingleShot(True)
+            timer.timeout.connect(lambda: self.flush(doc))
+            self._timers[doc] = timer
+        timer.start(int(self.settle * 1000))
+
+    def flush(self, doc_name: str) -> None:
+        """
+        Send the dirty objects of a document now.
+
+        :param doc_name: Name of the document.
+        """
+        dirty = self._dirty.pop(doc_name, set())
+        doc = App.listDocuments().get(doc_name)
+        tracked = self._tracked.get(doc_name, {})
+        if not dirty or doc is None or not self.enabled:
+            return
+
+        from .blender import selection_key, send_files, send_meshes
+        from .export import export_gltf, export_obj
+
+        exports = ((FORMAT_OBJ, export_obj), (FORMAT_GLTF, export_gltf), (FORMAT_MESH, None))
+        for fmt, export in exports:
+            names = sorted(name for name in dirty if tracked.get(name) == fmt)
+            objects = [obj for name in names if (obj := doc.getObject(name)) is not None]
+            if not objects:
+                continue
+            try:
+                if export is None:
+                    send_meshes(objects)
+                else:
+                    send_files(export(objects), [selection_key([obj]) for obj in objects])
+            except Exception as ex:  # noqa: BLE001
+                App.Console.PrintError(f"Live sync of {len(objects)} objects failed: {ex}\n")
+            else:
+                App.Console.PrintLog(f"Live sync: {len(objects)} objects sent to Blender\n")
+
+
+class _State:
+    live_sync: LiveSync | None = None
+
+
+def live_sync() -> LiveSync:
+    """Live sync tracker, subscribed to document events on first use."""
+    if _State.live_sync is None:
+        _State.live_sync = LiveSync()
+    return _State.live_sync
@@ -0,0 +1,313 @@
+# SPDX-License: LGPL-3.0-or-later
+# (c) 2025 Frank David Martínez Muñoz. <mnesarco at gmail.com>
+
+"""
+FreeCAD Channels: Parallel tessellation.
+
+Exporting a large selection in the GUI process uses a single core. The
+pool runs headless FreeCAD processes (FreeCADCmd) executing
+tessellation_worker.py and hands them one job per object: the shape as a
+BREP file plus the view properties written to the file. Workers are
+started on first use and kept alive, jobs run in parallel and the result
+of each one is reported back in order. Failed jobs, and jobs not done
+within EXPORT_TIMEOUT, are exported by the caller in process.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import math
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from itertools import count
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any
+
+import FreeCAD as App  # type: ignore
+
+from .tessellation_worker import REPLY_PREFIX
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from concurrent.futures import Future
+
+# Seconds to wait for a worker to finish a job
+WORKER_TIMEOUT = 120
+
+# Seconds the GUI thread waits for all the jobs of an export
+EXPORT_TIMEOUT = 60
+
+# Name of the .obj writer of the workers, part of the tessellation cache keys
+WORKER_WRITER = "tessellation_worker"
+
+# Defaults of the Part view provider
+DEFAULT_DEVIATION = 0.5
+DEFAULT_ANGULAR_DEFLECTION = 28.5
+DEFAULT_COLOR = (0.8, 0.8, 0.8)
+
+WORKER_SCRIPT = Path(__file__).with_name("tessellation_worker.py")
+
+TID = count(1)
+
+
+class WorkerError(RuntimeError):
+    """A worker process failed or died."""
+
+
+class _Worker:
+    """A FreeCADCmd process running tessellation_worker.py."""
+
+    def __init__(self, executable: Path) -> None:
+        self.process = subprocess.Popen(  # noqa: S603
+            [str(executable), str(WORKER_SCRIPT)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding="utf-8",
+            bufsize=1,
+        )
+        self.jobs = count(1)
+
+    def run(self, job: dict[str, Any]) -> None:
+        """Run a job and wait for its reply."""
+        job = {**job, "id": next(self.jobs)}
+        stdin: IO[str] = self.process.stdin
+        try:
+            stdin.write(json.dumps(job) + "\n")
+            stdin.flush()
+        except OSError as ex:
+            msg = f"Tessellation worker is gone: {ex}"
+            raise WorkerError(msg) from ex
+        for reply in self._replies():
+            if reply.get("id") != job["id"]:
+                continue
+            if not reply.get("ok"):
+                raise WorkerError(reply.get("error", "Tessellation failed"))
+            return
+        msg = f"Tessellation worker exited with code {self.process.poll()}"
+        raise WorkerError(msg)
+
+    def close(self) -> None:
+        if self.process.poll() is None:
+            try:
+                self.process.stdin.close()
+                self.process.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                self.process.kill()
+
+    def _replies(self) -> Iterator[dict[str, Any]]:
+        for line in self.process.stdout:
+            if line.startswith(REPLY_PREFIX):
+                yield json.loads(line[len(REPLY_PREFIX) :])
+
+
+class TessellationPool:
+    """
+    Pool of FreeCADCmd processes tessellating objects to .obj files.
+    """
+
+    def __init__(self, executable: Path, workers: int) -> None:
+        """
+        Initialize the pool, processes are started on demand.
+
+        :param executable: FreeCADCmd executable.
+        :param workers: Maximum number of processes.
+        """
+        self.executable = executable
+        self.workers = workers
+        self._idle: list[_Worker] = []
+        self._busy: set[_Worker] = set()
+        self._aborted = threading.Event()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix=f"freecad-channels-tessellation-{next(TID)}",
+        )
+
+    def export_obj(
+        self,
+        items: list[tuple[App.DocumentObject, Path]],
+        timeout: float = EXPORT_TIMEOUT,
+    ) -> list[bool]:
+        """
+        Export objects to .obj files in parallel.
+
+        Jobs are prepared in the calling thread, it must be the GUI thread.
+        Jobs not done within timeout are cancelled and their workers killed,
+        so the caller is never blocked longer than that.
+
+        :param items: Objects and the file to export each one to.
+        :param timeout: Seconds to wait for all the jobs.
+        :return: Whether each export succeeded, in the same order.
+        """
+        self._aborted.clear()
+        with tempfile.TemporaryDirectory(prefix="channels-") as tmp:
+            # An object that can not be prepared only skips its own export
+            jobs = []
+            for n, (obj, output) in enumerate(items):
+                try:
+                    jobs.append(job_for(obj, Path(tmp) / f"{n}.brep", output))
+                except Exception as ex:  # noqa: BLE001, PERF203
+                    App.Console.PrintLog(f"Tessellation job of {obj.Name} not created: {ex}\n")
+                    jobs.append(None)
+            futures = [job and self._executor.submit(self._run, job) for job in jobs]
+            _, late = wait([future for future in futures if future is not None], timeout)
+            if late:
+                self._abort(late)
+            results = [
+                future is not None and future not in late and future.result()
+                for future in futures
+            ]
+        App.Console.PrintLog(
+            f"Tessellated {sum(results)}/{len(results)} objects in {self.workers} workers\n",
+        )
+        return results
+
+    def close(self) -> None:
+        """Stop all the worker processes."""
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.close()
+
+    def _abort(self, futures: set[Future]) -> None:
+        App.Console.PrintLog(f"Tessellation timed out, {len(futures)} jobs left\n")
+        self._aborted.set()
+        for future in futures:
+            future.cancel()
+        # Export calls do not overlap, every busy worker runs a late job.
+        # Killed jobs return at once. Their files are only moved into the
+        # cache once complete, at most a temporary file is left behind.
+        with self._lock:
+            busy = list(self._busy)
+        for worker in busy:
+            worker.process.kill()
+        wait(futures)
+
+    def _run(self, job: dict[str, Any]) -> bool:
+        try:
+            worker = self._acquire()
+        except OSError as ex:
+            App.Console.PrintLog(f"Tessellation worker not started: {ex}\n")
+            return False
+        if self._aborted.is_set():
+            self._release(worker)
+            return False
+        timer = threading.Timer(WORKER_TIMEOUT, worker.process.kill)
+        timer.start()
+        try:
+            worker.run(job)
+        except (WorkerError, ValueError) as ex:
+            App.Console.PrintLog(f"Tessellation of {job['label']} failed: {ex}\n")
+            return False
+        finally:
+            timer.cancel()
+            self._release(worker)
+        return True
+
+    def _acquire(self) -> _Worker:
+        # The executor runs at most `workers` jobs, so there is always a
+        # process available or room to start one.
+        with self._lock:
+            worker = self._idle.pop() if self._idle else None
+        if worker is None:
+            worker = _Worker(self.executable)
+        with self._lock:
+            self._busy.add(worker)
+        return worker
+
+    def _release(self, worker: _Worker) -> None:
+        # Dead or killed processes are replaced on demand
+        with self._lock:
+            self._busy.discard(worker)
+            if worker.process.poll() is None:
+                self._idle.append(worker)
+
+
+class _State:
+    pool: TessellationPool | None = None
+    unavailable = False
+
+
+def tessellation_pool() -> TessellationPool | None:
+    """Shared pool sized from preferences, None if parallel export is disabled or unavailable."""
+    if _State.pool is not None or _State.unavailable:
+        return _State.pool
+    from .config import preferences
+
+    workers = preferences().export_workers() or max((os.cpu_count() or 1) - 1, 1)
+    executable = find_freecadcmd()
+    if workers < 2 or executable is None:  # noqa: PLR2004
+        _State.unavailable = True
+        return None
+    _State.pool = TessellationPool(executable, workers)
+    atexit.register(_State.pool.close)
+    return _State.pool
+
+
+def find_freecadcmd() -> Path | None:
+    """FreeCADCmd executable of this FreeCAD installation."""
+    names = ("FreeCADCmd", "freecadcmd")
+    if os.name == "nt":
+        names = tuple(f"{name}.exe" for name in names)
+    home = Path(App.getHomePath())
+    for directory in (home / "bin", Path(sys.executable).parent, home.parent / "MacOS"):
+        for name in names:
+            if (candidate := directory / name).is_file():
+                return candidate
+    for name in names:
+        if found := shutil.which(name):
+            return Path(found)
+    return None
+
+
+def job_for(obj: App.DocumentObject, brep: Path, output: Path) -> dict[str, Any]:
+    """
+    Tessellation job of an object, see tessellation_worker.export_obj.
+
+    :param obj: The object, its shape is written to brep.
+    :param brep: File to write the shape to.
+    :param output: The .obj file to create.
+    """
+    import Part  # type: ignore
+
+    shape = Part.getShape(obj)
+    shape.exportBrep(str(brep))
+    view = getattr(obj, "ViewObject", None)
+    colors = getattr(view, "DiffuseColor", None) or [getattr(view, "ShapeColor", DEFAULT_COLOR)]
+    deflection, angular = tessellation_parameters(obj, shape)
+    return {
+        "brep": str(brep),
+        "output": str(output),
+        "label": obj.Label,
+        "deflection": deflection,
+        "angular": angular,
+        "colors": [list(color[:3]) for color in colors],
+        "transparency": int(getattr(view, "Transparency", 0)),
+    }
+
+
+def tessellation_parameters(obj: App.DocumentObject, shape: Any) -> tuple[float, float]:
+    """
+    Deflection used by the 3D view for an object.
+
+    :param obj: The object, its view provider has the settings.
+    :param shape: Shape of the object.
+    :return: Tuple (linear deflection, angular deflection in radians).
+    """
+    view = getattr(obj, "ViewObject", None)
+    deviation = float(getattr(view, "Deviation", DEFAULT_DEVIATION))
+    angular = getattr(view, "AngularDeflection", DEFAULT_ANGULAR_DEFLECTION)
+    angular = float(getattr(angular, "Value", angular))
+    # Relative to the size of the shape, as in the view provider
+    bound = shape.BoundBox
+    size = bound.XLength + bound.YLength + bound.ZLength
+    return max(size / 300.0 * deviation, 1e-3), math.radians(angular)
@@ -0,0 +1,112 @@
+# SPDX-License: LGPL-3.0-or-later
+# (c) 2025 Frank David Martínez Muñoz. <mnesarco at gmail.com>
+
+"""
+FreeCAD Channels: Tessellation worker.
+
+Run by FreeCADCmd, see tessellation.TessellationPool. Jobs are read from
+stdin as json lines, one per object: a BREP file and the view properties
+needed to write it as .obj. A reply line prefixed with REPLY_PREFIX is
+written to stdout for each job, other output of FreeCAD is ignored by the
+pool. The worker exits when stdin is closed.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+# Marks replies among other output of FreeCAD
+REPLY_PREFIX = "@channels "
+
+# Suffix of files being written, same as cache.TEMP_SUFFIX (the worker runs standalone)
+TEMP_SUFFIX = ".tmp"
+
+
+def export_obj(job: dict[str, Any]) -> None:
+    """
+    Tessellate a BREP file and write it as .obj + .mtl.
+
+    Both files are written to temporary names and moved into place, the
+    .obj last, so a killed worker never leaves a truncated cache entry.
+
+    :param job: brep, output, label, deflection, angular (radians),
+        colors (one rgb per face, or a single one) and transparency (0-100).
+    """
+    import MeshPart  # type: ignore
+    import Part  # type: ignore
+
+    shape = Part.Shape()
+    shape.importBrep(job["brep"])
+    output = Path(job["output"])
+    mtl = output.with_suffix(".mtl")
+    colors = [tuple(color[:3]) for color in job["colors"]]
+    faces = shape.Faces
+    if len(colors) != len(faces):
+        colors = colors[:1] * len(faces)
+
+    materials: dict[tuple, str] = {}
+    lines = ["# Created by FreeCAD", f"mtllib {mtl.name}", f"o {job['label']}"]
+    offset = 1
+    current = None
+    for face, color in zip(faces, colors, strict=True):
+        mesh = MeshPart.meshFromShape(
+            Shape=face,
+            LinearDeflection=job["deflection"],
+            AngularDeflection=job["angular"],
+            Relative=False,
+        )
+        points, facets = mesh.Topology
+        if not facets:
+            continue
+        material = materials.setdefault(color, f"material{len(materials)}")
+        if material != current:
+            lines.append(f"usemtl {material}")
+            current = material
+        lines.extend(f"v {p.x:.6f} {p.y:.6f} {p.z:.6f}" for p in points)
+        lines.extend(f"f {a + offset} {b + offset} {c + offset}" for a, b, c in facets)
+        offset += len(points)
+
+    alpha = 1.0 - job["transparency"] / 100.0
+    mtl_tmp = _temporary(mtl)
+    output_tmp = _temporary(output)
+    try:
+        with mtl_tmp.open("w", encoding="utf-8") as f:
+            f.write("# Created by FreeCAD\n")
+            for (r, g, b), name in materials.items():
+                f.write(f"newmtl {name}\nKd {r:.6f} {g:.6f} {b:.6f}\nd {alpha:.6f}\n")
+        with output_tmp.open("w", encoding="utf-8") as f:
+            f.write("\n".join(lines))
+            f.write("\n")
+        mtl_tmp.replace(mtl)
+        output_tmp.replace(output)
+    finally:
+        mtl_tmp.unlink(missing_ok=True)
+        output_tmp.unlink(missing_ok=True)
+
+
+def _temporary(path: Path) -> Path:
+    # Same directory, so the rename into place is atomic
+    return path.with_name(f"{path.name}.{os.getpid()}{TEMP_SUFFIX}")
+
+
+def main() -> None:
+    # FreeCAD may redirect sys.stdin/sys.stdout, use the process pipes
+    with io.open(0, encoding="utf-8", closefd=False) as jobs:  # noqa: UP020
+        for line in jobs:
+            if not line.strip():
+                continue
+            job = json.loads(line)
+            try:
+                export_obj(job)
+                reply = {"id": job["id"], "ok": True}
+            except Exception as ex:  # noqa: BLE001
+                reply = {"id": job["id"], "ok": False, "error": str(ex)}
+            os.write(1, f"{REPLY_PREFIX}{json.dumps(reply)}\n".encode())
+
+
+if __name__ == "__main__":
+    main()
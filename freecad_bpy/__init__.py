@@ -5,12 +5,14 @@
 FreeCAD Channels for Blender.
 """
 
-from .service import service
+from . import preferences, service
 
 
 def register() -> None:
-    service.start()
+    preferences.register()
+    service.service().start()
 
 
 def unregister() -> None:
     service.stop()
+    preferences.unregister()
@@ -3,10 +3,13 @@
 
 from __future__ import annotations
 
+import time
+
 import bpy
 
 from .freecad.channels.api import (
     Channel,
+    DrainStats,
     Service,
     ServiceController,
     ServiceRequestHandler,
@@ -28,13 +31,24 @@ class channel_handler(Channel):  # noqa: N801
 
         This class is the Glue between FreeCAD Channels service and
         Blender internal threading/state system.
+
+        Each timer tick handles requests for at most ``budget`` seconds,
+        leftovers are carried over to the next tick, which runs after
+        ``busy_interval``. While idle, the interval doubles from ``poll``
+        up to ``max_idle_interval``.
         """
 
+        budget: float = 0.04  # Seconds of handler time per tick
+        busy_interval: float = 0.01  # Seconds to next tick when work is pending
+        max_idle_interval: float = 2.0  # Upper limit of the idle back off
+
         def __init__(
             self,
             service: Service,
             handler: ServiceRequestHandler,
             poll: float = 0.5,
+            *,
+            push: bool = False,  # noqa: ARG002
         ) -> None:
             """
             Initialize the BpyServiceCtrl.
@@ -43,18 +57,42 @@ class channel_handler(Channel):  # noqa: N801
 
             :param service: The service instance to control in Blender.
             :param handler: A function to handle service requests.
-            :param poll: The polling interval in seconds.
+            :param poll: The polling interval in seconds after some work was done.
+            :param push: Not supported, bpy.app.timers can not be woken up from
+                other threads, the queue is always polled.
             """
 
+            stats = DrainStats(last_interval=poll)
+            service.metrics.drain = stats
+            max_idle = max(poll, self.max_idle_interval)
+
             def timeout() -> float:
                 if not service.is_running():
                     service.start()
-                for data in service:
-                    handler(data)
-                return poll
+
+                start = time.perf_counter()
+                deadline = start + self.budget
+                handled = 0
+                while (data := service.next_request()) is not None:
+                    service.dispatch(data, handler)
+                    handled += 1
+                    if time.perf_counter() >= deadline:
+                        break
+
+                pending = service.pending()
+                if pending:
+                    interval = self.busy_interval
+                elif handled:
+                    interval = poll
+                else:
+                    interval = min(max(stats.last_interval, poll) * 2, max_idle)
+
+                stats.record(handled, pending, time.perf_counter() - start, interval)
+                return interval
 
             self.timeout = timeout
             self.service = service
+            self.stats = stats
 
         def stop(self) -> None:
             if bpy.app.timers.is_registered(self.timeout):
@@ -0,0 +1,78 @@
+# SPDX-License: GPL-3.0
+# (c) 2025 Frank David Martínez Muñoz. <mnesarco at gmail.com>
+
+"""
+FreeCAD Channels for Blender: Add-on preferences.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import bpy
+
+if TYPE_CHECKING:
+    from .freecad.channels.api import DiscoveryGroup
+
+
+def _restart(_self: bpy.types.AddonPreferences, _context: bpy.types.Context) -> None:
+    from .service import restart
+
+    restart()
+
+
+class ChannelsAddonPreferences(bpy.types.AddonPreferences):
+    """Network settings of the Blender channel service."""
+
+    bl_idname = __package__
+
+    lan_discovery: bpy.props.BoolProperty(
+        name="Discover services on the local network",
+        description=(
+            "Announce the Blender service on the local network using multicast. "
+            "The service listens on the LAN interface and accepts connections from "
+            "other machines"
+        ),
+        default=False,
+        update=_restart,
+    )
+
+    lan_interface: bpy.props.StringProperty(
+        name="LAN interface address",
+        description=(
+            "IPv4 address of the network interface used for LAN discovery. "
+            "Empty uses the interface of the default route"
+        ),
+        default="",
+        update=_restart,
+    )
+
+    def draw(self, _context: bpy.types.Context) -> None:
+        layout = self.layout
+        layout.prop(self, "lan_discovery")
+        row = layout.row()
+        row.enabled = self.lan_discovery
+        row.prop(self, "lan_interface")
+
+
+def preferences() -> ChannelsAddonPreferences | None:
+    addon = bpy.context.preferences.addons.get(__package__)
+    return addon.preferences if addon else None
+
+
+def discovery_group() -> DiscoveryGroup | None:
+    """Multicast discovery group enabled in preferences, None for local only discovery."""
+    from .freecad.channels.api import DiscoveryGroup, primary_address
+
+    prefs = preferences()
+    if prefs is None or not prefs.lan_discovery:
+        return None
+    return DiscoveryGroup(interface=prefs.lan_interface or primary_address())
+
+
+def register() -> None:
+    bpy.utils.register_class(ChannelsAddonPreferences)
+
+
+def unregister() -> None:
+    bpy.utils.unregister_class(ChannelsAddonPreferences)
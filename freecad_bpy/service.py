@@ -7,38 +7,91 @@ FreeCAD Channels for Blender.
 
 from __future__ import annotations
 
+from array import array
 from logging import StreamHandler, getLogger
 
 import bmesh
 import bpy
 
 from .bpy_channels import channel_handler, ServiceRequest
+from .preferences import discovery_group
 from pathlib import Path
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     from collections.abc import Callable
 
+    from .freecad.channels.api import ServiceController, ServiceRegistry
+
 logger = getLogger("FreeCAD.Channels")
 logger.setLevel("INFO")
 logger.addHandler(StreamHandler())
 
 
-@channel_handler(name="Blender", queue_size=50)
-def service(req: ServiceRequest) -> None:
+class _State:
+    service: ServiceController | None = None
+    registry: ServiceRegistry | None = None
+
+
+def service() -> ServiceController:
+    """
+    Blender channel service controller, created on first use.
+
+    With LAN discovery enabled in the add-on preferences, the service
+    listens on the LAN interface and is announced to the multicast group.
+    """
+    if _State.service is None:
+        from .freecad.channels.api import ServiceRegistry
+
+        multicast = discovery_group()
+        _State.registry = ServiceRegistry(multicast=multicast) if multicast else None
+        _State.service = channel_handler(
+            name="Blender",
+            queue_size=50,
+            keep_alive=True,
+            engine="pool",
+            frames=True,
+            coalesce=True,
+            priorities=True,
+            registry=_State.registry,
+            host=multicast.interface if multicast else None,
+        )(handler)
+    return _State.service
+
+
+def stop() -> None:
+    """Stop the service, it is created again on next use."""
+    if _State.service is not None:
+        _State.service.stop()
+        _State.service = None
+    if _State.registry is not None:
+        _State.registry.shutdown()
+        _State.registry = None
+
+
+def restart() -> None:
+    """Apply changed network preferences."""
+    if _State.service is not None:
+        stop()
+        service().start()
+
+
+def handler(req: ServiceRequest) -> None:
     """
     Handle service requests for Blender.
 
     This function processes incoming service requests and performs
-    actions based on the request data. Currently, it supports the
-    'import_file' action, which triggers the import of a file into
-    Blender.
+    actions based on the request data. It supports the 'import_file'
+    action, which triggers the import of a file into Blender, and the
+    'mesh_buffer' action, which builds a mesh from binary arrays.
 
     :param req: The service request containing action and data.
     """
     match req.data:
         case {"action": "import_file", "path": path}:
             action_import_file(path)
+        case {"action": "mesh_buffer", "name": str(name)}:
+            action_mesh_buffer(name, req.data)
         case _:
             logger.warning("Unknown request: %s", req)
 
@@ -79,6 +132,74 @@ def action_import_file(path: str) -> None:
             logger.warning("Unknown file format: %s", str(path))
 
 
+def action_mesh_buffer(name: str, data: dict) -> None:
+    """
+    Handle mesh_buffer action in service request.
+
+    Creates the object, or replaces the mesh data of an existing one,
+    from flat arrays using bulk foreach_set calls, no file is involved.
+
+    :param name: Name of the object.
+    :param data: vertices (xyz), normals (xyz, one per vertex), indices
+        (three per triangle) and color (rgba).
+    """
+    vertices = data.get("vertices", ())
+    indices = data.get("indices", ())
+    normals = data.get("normals")
+    if len(vertices) % 3 or len(indices) % 3:
+        logger.warning("Invalid mesh buffer: %s", name)
+        return
+
+    obj = bpy.data.objects.get(name)
+    if obj is None or obj.type != "MESH":
+        obj = None
+        mesh = bpy.data.meshes.new(name)
+        if color := data.get("color"):
+            mesh.materials.append(new_material(name, color))
+    else:
+        mesh = obj.data
+        mesh.clear_geometry()
+
+    triangles = len(indices) // 3
+    mesh.vertices.add(len(vertices) // 3)
+    mesh.vertices.foreach_set("co", vertices)
+    mesh.loops.add(len(indices))
+    mesh.loops.foreach_set("vertex_index", indices)
+    mesh.polygons.add(triangles)
+    mesh.polygons.foreach_set("loop_start", array("i", range(0, len(indices), 3)))
+    mesh.polygons.foreach_set("loop_total", array("i", [3]) * triangles)
+    # Out of range indices would crash Blender later, fix them before use
+    if mesh.validate():
+        logger.warning("Invalid geometry fixed in mesh buffer: %s", name)
+    mesh.update()
+
+    if normals and len(normals) == len(vertices) and len(mesh.vertices) == len(vertices) // 3:
+        mesh.shade_smooth()
+        mesh.normals_split_custom_set_from_vertices(
+            list(zip(normals[0::3], normals[1::3], normals[2::3], strict=True)),
+        )
+
+    if obj is None:
+        obj = bpy.data.objects.new(name, mesh)
+        bpy.context.collection.objects.link(obj)
+
+
+def new_material(name: str, color: list[float]) -> bpy.types.Material:
+    """
+    Create a material with a base color.
+
+    :param name: Name of the material.
+    :param color: rgba color.
+    """
+    material = bpy.data.materials.new(name)
+    material.diffuse_color = color
+    material.use_nodes = True
+    if bsdf := material.node_tree.nodes.get("Principled BSDF"):
+        bsdf.inputs["Base Color"].default_value = color
+        bsdf.inputs["Alpha"].default_value = color[3]
+    return material
+
+
 def import_objects(path: str, operator: Callable[[str], None]) -> list[str]:
     """
     Import a file and return the names of the new objects created.
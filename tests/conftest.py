@@ -0,0 +1,90 @@
+# SPDX-License: LGPL-3.0-or-later
+# (c) 2025 Frank David Martínez Muñoz. <mnesarco at gmail.com>
+
+from __future__ import annotations
+
+import threading
+import time
+from queue import Queue
+from typing import TYPE_CHECKING, Any
+
+import pytest
+
+from freecad.channels.api import Service, ServiceRegistry
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+    from freecad.channels.api import ServiceRequest
+
+
+class Drain:
+    """Stand-in for a controller: handles the requests of a service in a thread."""
+
+    def __init__(
+        self,
+        service: Service,
+        handler: Callable[[ServiceRequest], Any],
+        *,
+        paused: bool = False,
+    ) -> None:
+        self.service = service
+        self.handler = handler
+        self.paused = threading.Event()
+        if paused:
+            self.paused.set()
+        self._done = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._done:
+            if not self.paused.is_set():
+                for request in self.service:
+                    self.service.dispatch(request, self.handler)
+            time.sleep(0.005)
+
+    def stop(self) -> None:
+        self._done = True
+        self._thread.join()
+
+
+@pytest.fixture
+def registry() -> Iterator[ServiceRegistry]:
+    registry = ServiceRegistry()
+    yield registry
+    registry.shutdown()
+
+
+@pytest.fixture
+def start_service(registry: ServiceRegistry) -> Iterator[Callable[..., Service]]:
+    started: list[Service] = []
+
+    def start(name: str, queue: Queue | None = None, **options: Any) -> Service:
+        service = registry.create_service(name, queue or Queue(), **options)
+        while not service.port:
+            time.sleep(0.001)
+        started.append(service)
+        return service
+
+    yield start
+    for service in started:
+        service.shutdown()
+
+
+@pytest.fixture
+def drain_service() -> Iterator[Callable[..., Drain]]:
+    drains: list[Drain] = []
+
+    def drain(
+        service: Service,
+        handler: Callable[[ServiceRequest], Any],
+        *,
+        paused: bool = False,
+    ) -> Drain:
+        drains.append(Drain(service, handler, paused=paused))
+        return drains[-1]
+
+    yield drain
+    for drain in drains:
+        drain.stop()
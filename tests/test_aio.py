@@ -0,0 +1,104 @@
+# SPDX-License: LGPL-3.0-or-later
+# (c) 2025 Frank David Martínez Muñoz. <mnesarco at gmail.com>
+
+from __future__ import annotations
+
+import asyncio
+import socket
+
+import pytest
+
+from freecad.channels.api import (
+    AsyncServiceClient,
+    CoalescingQueue,
+    RemoteError,
+    ServiceRequest,
+    discover_services,
+)
+from freecad.channels.api import _aio
+from freecad.channels.api._aio import _Connection
+
+
+def handler(request: ServiceRequest) -> object:
+    if request.data.get("fail"):
+        msg = "boom"
+        raise ValueError(msg)
+    return request.data.get("value")
+
+
+def test_connection_is_abstract() -> None:
+    with pytest.raises(TypeError):
+        _Connection(None, 0)
+
+
+@pytest.mark.parametrize("transport", ["http", "frame"])
+def test_call_and_send(start_service, drain_service, transport: str) -> None:
+    service = start_service("TestAio", keep_alive=True, frames=True)
+    drain_service(service, handler)
+
+    async def run() -> None:
+        async with AsyncServiceClient(service.address(), transport=transport) as client:
+            assert await client.call(ServiceRequest("test", data={"value": 42}), 5) == 42
+            with pytest.raises(RemoteError):
+                await client.call(ServiceRequest("test", data={"fail": True}), 5)
+            await client.send(ServiceRequest("test", data={"value": 1}))
+            items = await client.send_many([ServiceRequest("test", data={}) for _ in range(3)])
+            assert [item["status"] for item in items] == ["ok"] * 3
+
+    asyncio.run(run())
+
+
+def test_discover_services(start_service) -> None:
+    service = start_service("TestAioDiscovery")
+
+    async def run() -> list:
+        return [
+            address
+            async for address in discover_services(["TestAioDiscovery"], timeout=5, maxcount=1)
+        ]
+
+    assert asyncio.run(run()) == [service.address()]
+
+
+def test_superseded_call_is_cancelled(start_service, drain_service) -> None:
+    queue = CoalescingQueue(10)
+    service = start_service("TestAioSuperseded", queue, keep_alive=True)
+    drain = drain_service(service, handler, paused=True)
+
+    async def run() -> None:
+        async with AsyncServiceClient(service.address()) as client:
+            old = asyncio.create_task(
+                client.call(ServiceRequest("test", data={"value": 1}, key="k"), 5),
+            )
+            while not service.pending():
+                await asyncio.sleep(0.01)
+            new = asyncio.create_task(
+                client.call(ServiceRequest("test", data={"value": 2}, key="k"), 5),
+            )
+            while not queue.superseded:
+                await asyncio.sleep(0.01)
+            drain.paused.clear()
+            assert await new == 2
+            with pytest.raises(asyncio.CancelledError):
+                await asyncio.wait_for(old, 5)
+
+    asyncio.run(run())
+
+
+def test_discovery_sockets_closed_on_failure(monkeypatch) -> None:
+    opened = []
+
+    class RecordingSocket(socket.socket):
+        def __init__(self, *args: object) -> None:
+            super().__init__(*args)
+            opened.append(self)
+
+    def fail(*_: object) -> None:
+        raise OSError
+
+    monkeypatch.setattr(socket, "socket", RecordingSocket)
+    monkeypatch.setattr(_aio, "open_probe_socket", fail)
+    with pytest.raises(OSError):  # noqa: PT011
+        asyncio.run(anext(discover_services(timeout=1)))
+    assert opened
+    assert all(sock.fileno() == -1 for sock in opened)
@@ -0,0 +1,199 @@
+# SPDX-License: LGPL-3.0-or-later
+# (c) 2025 Frank David Martínez Muñoz. <mnesarco at gmail.com>
+
+from __future__ import annotations
+
+import time
+from dataclasses import replace
+from queue import Queue
+from typing import TYPE_CHECKING
+
+import pytest
+
+from freecad.channels.api import (
+    BalancingClient,
+    CoalescingQueue,
+    DiscoveryListener,
+    LaneQueue,
+    RetryPolicy,
+    ServiceAddress,
+    ServiceBusyError,
+    ServiceClient,
+    ServiceRegistry,
+    ServiceRequest,
+)
+from freecad.channels.api._queues import lane_capacity, request_key
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+    from freecad.channels.api import Service
+
+QUEUE_SIZE = 50
+
+
+@pytest.fixture
+def discovery() -> Iterator[DiscoveryListener]:
+    listener = DiscoveryListener()
+    listener.start()
+    yield listener
+    listener.stop()
+
+
+@pytest.fixture
+def start_peers() -> Iterator[Callable[..., list[Service]]]:
+    registries: list[ServiceRegistry] = []
+    started: list[Service] = []
+
+    def start(name: str, queue: Callable[[], Queue], count: int = 2) -> list[Service]:
+        # A registry announces one service per name, peers live in their own
+        services = []
+        for _ in range(count):
+            registries.append(ServiceRegistry())
+            services.append(registries[-1].create_service(name, queue()))
+        started.extend(services)
+        return services
+
+    yield start
+    for service in started:
+        service.shutdown()
+    for registry in registries:
+        registry.shutdown()
+
+
+def wait_for_peers(client: BalancingClient, count: int) -> None:
+    for _ in range(100):
+        if len(client.peers()) == count:
+            return
+        client.discovery.wait_for("", 0.05)
+    pytest.fail("peers not discovered")
+
+
+def test_requests_spread_over_peers(start_peers, discovery) -> None:
+    services = start_peers("TestBalance", lambda: Queue(2))
+    client = BalancingClient("TestBalance", discovery, retry=None)
+    try:
+        wait_for_peers(client, 2)
+        peers = {client.send(ServiceRequest("test"), timeout=5) for _ in range(4)}
+        assert peers == {service.address() for service in services}
+        assert [service.pending() for service in services] == [2, 2]
+        with pytest.raises(ServiceBusyError):
+            client.send(ServiceRequest("test"), timeout=5)
+    finally:
+        client.close()
+
+
+def test_keyed_requests_stick_to_a_peer(start_peers, discovery) -> None:
+    start_peers("TestAffinity", lambda: CoalescingQueue(10))
+    client = BalancingClient("TestAffinity", discovery, retry=None)
+    try:
+        wait_for_peers(client, 2)
+        peers = {client.send(ServiceRequest("test", key="a"), timeout=5) for _ in range(5)}
+        assert len(peers) == 1
+    finally:
+        client.close()
+
+
+def mesh_requests(count: int) -> list[ServiceRequest]:
+    return [
+        ServiceRequest("test", data={"action": "mesh_buffer", "name": f"obj{n}"}, key=f"mesh:{n}")
+        for n in range(count)
+    ]
+
+
+def import_requests(count: int) -> list[ServiceRequest]:
+    return [
+        ServiceRequest("test", data={"action": "import_file", "n": n}, key=f"file:{n}")
+        for n in range(count)
+    ]
+
+
+def test_lane_capacity_matches_lane_queue() -> None:
+    for size in (1, 5, 50, 51):
+        assert LaneQueue(size).lane_sizes[2] == lane_capacity(size)
+    assert lane_capacity(0) == 0
+
+
+def test_send_batches_more_than_queue_size(start_service, drain_service, discovery) -> None:
+    handled = []
+    count = QUEUE_SIZE * 2 + 7
+    service = start_service("TestBatches", LaneQueue(QUEUE_SIZE, request_key))
+    drain = drain_service(service, lambda request: handled.append(request.data["n"]))
+    client = BalancingClient("TestBatches", discovery)
+    try:
+        items = client.send_batches(import_requests(count), timeout=5)
+        assert len(items) == count
+        assert all(item["status"] == "ok" for item in items)
+    finally:
+        client.close()
+    while service.pending():
+        time.sleep(0.01)
+    drain.stop()
+    assert handled == list(range(count))
+
+
+class StaticDiscovery:
+    """Discovery stand-in with fixed addresses, without announced loads."""
+
+    def __init__(self, *addresses: ServiceAddress) -> None:
+        self.addresses = [replace(address, load=None) for address in addresses]
+
+    def start(self) -> None:
+        pass
+
+    def services(self, filter: list[str] | None = None) -> list[ServiceAddress]:  # noqa: A002
+        return [a for a in self.addresses if filter is None or a.name in filter]
+
+    def wait_for(self, name: str, timeout: float = 5) -> ServiceAddress | None:  # noqa: ARG002
+        services = self.services([name])
+        return services[0] if services else None
+
+
+def test_send_batches_learns_capacity_from_rejections(start_service, drain_service) -> None:
+    handled = []
+    count = QUEUE_SIZE + 3
+    service = start_service("TestMeshes", LaneQueue(QUEUE_SIZE, request_key))
+    drain = drain_service(service, lambda request: handled.append(request.data["name"]))
+    # Rejected chunks are not retried whole, they are sized again
+    discovery = StaticDiscovery(service.address())
+    client = BalancingClient("TestMeshes", discovery, retry=RetryPolicy(attempts=0))
+    try:
+        items = client.send_batches(mesh_requests(count), timeout=5)
+        assert all(item["status"] == "ok" for item in items)
+    finally:
+        client.close()
+    while service.pending():
+        time.sleep(0.01)
+    drain.stop()
+    assert handled == [f"obj{n}" for n in range(count)]
+
+
+def test_call_many_more_than_queue_size(start_service, drain_service, discovery) -> None:
+    service = start_service("TestCallMany", LaneQueue(QUEUE_SIZE, request_key), keep_alive=True)
+    drain_service(service, lambda request: request.data["name"])
+    client = BalancingClient("TestCallMany", discovery)
+    try:
+        count = QUEUE_SIZE + 3
+        futures = client.call_many(mesh_requests(count), timeout=5, reply_timeout=10)
+        assert [future.result(10) for future in futures] == [f"obj{n}" for n in range(count)]
+    finally:
+        client.close()
+
+
+def test_timeout_does_not_fail_over(start_peers, monkeypatch) -> None:
+    services = start_peers("TestTimeout", Queue)
+    sent = []
+
+    def send(client: ServiceClient, *_: object) -> None:
+        sent.append(client.address)
+        raise TimeoutError
+
+    monkeypatch.setattr(ServiceClient, "send", send)
+    discovery = StaticDiscovery(*(service.address() for service in services))
+    client = BalancingClient("TestTimeout", discovery, retry=None)
+    try:
+        with pytest.raises(TimeoutError):
+            client.send(ServiceRequest("test"), timeout=5)
+        assert len(sent) == 1
+    finally:
+        client.close()
@@ -0,0 +1,35 @@
+# SPDX-License: LGPL-3.0-or-later
+# (c) 2025 Frank David Martínez Muñoz. <mnesarco at gmail.com>
+
+from __future__ import annotations
+
+import pytest
+
+from bench_channels import (
+    TRANSPORTS,
+    bench_discovery,
+    bench_startup,
+    bench_transport,
+    scenario_key,
+)
+
+
+@pytest.mark.parametrize("transport", sorted(TRANSPORTS))
+def test_transport_scenario(registry, transport: str) -> None:
+    result = bench_transport(registry, transport, 1024, 16, 2, 20)
+    assert result["errors"] == []
+    assert result["handled"] == result["requests"] == 20
+    assert scenario_key(result) == f"transport/{transport}/payload=1024/queue=16/clients=2"
+
+
+def test_discovery_scenario(registry) -> None:
+    results = bench_discovery(registry, 2)
+    assert [result["failures"] for result in results] == [0, 0]
+
+
+def test_startup_scenario() -> None:
+    result = bench_startup(1)
+    assert result["samples"] == 1
+    assert result["deferred_loaded"] == []
+    assert result["p50_ms"] > 0
+    assert scenario_key(result) == "startup/freecad.channels.init_gui"
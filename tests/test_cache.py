@@ -0,0 +1,112 @@
+# SPDX-License: LGPL-3.0-or-later
+# (c) 2025 Frank David Martínez Muñoz. <mnesarco at gmail.com>
+
+from __future__ import annotations
+
+import os
+import time
+from typing import TYPE_CHECKING
+
+import pytest
+
+from freecad.channels.cache import (
+    TEMP_MAX_AGE,
+    TEMP_SUFFIX,
+    TessellationCache,
+    geometry_digest,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+class Shape:
+    """Stand-in for a Part.Shape, hashCode is deliberately shared."""
+
+    def __init__(self, brep: str) -> None:
+        self.brep = brep
+
+    def hashCode(self) -> int:  # noqa: N802
+        return 1
+
+    def exportBrepToString(self) -> str:  # noqa: N802
+        return self.brep
+
+
+def write(cache: TessellationCache, key: str, size: int = 10) -> None:
+    cache.path(key, "obj").write_bytes(b"x" * size)
+    cache.path(key, "mtl").write_bytes(b"y" * size)
+    cache.store(key)
+
+
+def test_digest_follows_geometry_not_hash_code() -> None:
+    assert geometry_digest(Shape("a")) != geometry_digest(Shape("b"))
+    assert geometry_digest(Shape("a")) == geometry_digest(Shape("a"))
+
+
+def test_lookup_hits_and_misses(tmp_path: Path) -> None:
+    cache = TessellationCache(tmp_path)
+    assert cache.lookup("k1", "obj") is None
+    write(cache, "k1")
+    assert cache.lookup("k1", "obj") == tmp_path / "k1.obj"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_evicts_least_recently_used(tmp_path: Path) -> None:
+    cache = TessellationCache(tmp_path, max_entries=2)
+    write(cache, "k1")
+    write(cache, "k2")
+    assert cache.lookup("k1", "obj") is not None
+    write(cache, "k3")
+    assert cache.lookup("k2", "obj") is None
+    assert not list(tmp_path.glob("k2.*"))
+    assert cache.lookup("k1", "obj") is not None
+
+
+def test_evicts_by_size(tmp_path: Path) -> None:
+    cache = TessellationCache(tmp_path, max_bytes=50)
+    write(cache, "k1")
+    write(cache, "k2")
+    write(cache, "k3")
+    assert cache.lookup("k1", "obj") is None
+    assert cache.lookup("k3", "obj") is not None
+
+
+def test_entries_survive_restart(tmp_path: Path) -> None:
+    write(TessellationCache(tmp_path), "k1")
+    cache = TessellationCache(tmp_path)
+    assert cache.lookup("k1", "obj") is not None
+    cache.clear()
+    assert not list(tmp_path.iterdir())
+
+
+def test_load_skips_partial_entries(tmp_path: Path) -> None:
+    write(TessellationCache(tmp_path), "k1")
+    # Companion already moved into place, main file still being written
+    (tmp_path / "k2.mtl").write_bytes(b"y")
+    (tmp_path / f"k2.obj.1{TEMP_SUFFIX}").write_bytes(b"x")
+    stale = tmp_path / f"k3.obj.1{TEMP_SUFFIX}"
+    stale.write_bytes(b"x")
+    old = time.time() - TEMP_MAX_AGE - 1
+    os.utime(stale, (old, old))
+    cache = TessellationCache(tmp_path)
+    assert cache.lookup("k1", "obj") is not None
+    assert cache.lookup("k2", "obj") is None
+    assert not stale.exists()
+    assert (tmp_path / f"k2.obj.1{TEMP_SUFFIX}").exists()
+
+
+def test_staging_moves_complete_exports(tmp_path: Path) -> None:
+    cache = TessellationCache(tmp_path)
+    with cache.staging("k1", "obj") as path:
+        path.write_bytes(b"x")
+        path.with_suffix(".mtl").write_bytes(b"y")
+        assert not cache.path("k1", "obj").exists()
+    cache.store("k1")
+    assert sorted(file.name for file in tmp_path.iterdir()) == ["k1.mtl", "k1.obj"]
+
+    with pytest.raises(RuntimeError), cache.staging("k2", "obj") as path:
+        path.write_bytes(b"x")
+        msg = "export failed"
+        raise RuntimeError(msg)
+    assert sorted(file.name for file in tmp_path.iterdir()) == ["k1.mtl", "k1.obj"]
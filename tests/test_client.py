@@ -0,0 +1,76 @@
+# SPDX-License: LGPL-3.0-or-later
+# (c) 2025 Frank David Martínez Muñoz. <mnesarco at gmail.com>
+
+from __future__ import annotations
+
+import threading
+import time
+from queue import Queue
+
+import pytest
+
+from freecad.channels.api import RetryPolicy, ServiceBusyError, ServiceClient, ServiceRequest
+
+QUEUE_SIZE = 5
+
+
+def requests(count: int) -> list[ServiceRequest]:
+    return [ServiceRequest("test", data={"n": n}) for n in range(count)]
+
+
+@pytest.mark.parametrize("transport", ["http", "frame"])
+def test_send_many(start_service, transport: str) -> None:
+    service = start_service("TestBatch", frames=True, keep_alive=True)
+    client = ServiceClient(service.address(), keep_alive=True, transport=transport)
+    try:
+        items = client.send_many(requests(3), timeout=5)
+        assert [item["status"] for item in items] == ["ok"] * 3
+        assert [request.data["n"] for request in service] == [0, 1, 2]
+    finally:
+        client.close()
+
+
+def test_batch_items_report_invalid_requests(start_service) -> None:
+    service = start_service("TestInvalid")
+    response = service.submit_batch({"requests": [{"name": "test"}, {"data": {}}]})
+    assert response["status"] == "ok"
+    assert [item["status"] for item in response["items"]] == ["ok", "error"]
+    assert len(list(service)) == 1
+
+
+@pytest.mark.parametrize("transport", ["http", "frame"])
+def test_full_queue_is_busy(start_service, transport: str) -> None:
+    service = start_service("TestBusy", Queue(QUEUE_SIZE), frames=True, keep_alive=True)
+    client = ServiceClient(service.address(), keep_alive=True, transport=transport, retry=None)
+    try:
+        client.send_many(requests(QUEUE_SIZE - 1), timeout=5)
+        # Batches are enqueued whole or not at all
+        with pytest.raises(ServiceBusyError) as busy:
+            client.send_many(requests(2), timeout=5)
+        assert busy.value.retry_after > 0
+        assert service.pending() == QUEUE_SIZE - 1
+        client.send(ServiceRequest("test"), timeout=5)
+        with pytest.raises(ServiceBusyError):
+            client.send(ServiceRequest("test"), timeout=5)
+        assert client.capacity == QUEUE_SIZE
+    finally:
+        client.close()
+
+
+def test_busy_service_is_retried(start_service, drain_service) -> None:
+    service = start_service("TestRetry", Queue(1), keep_alive=True)
+    drain = drain_service(service, lambda _: None, paused=True)
+    client = ServiceClient(
+        service.address(),
+        keep_alive=True,
+        retry=RetryPolicy(attempts=20, max_delay=0.1),
+    )
+    try:
+        client.send(ServiceRequest("test"), timeout=5)
+        # Longer than the pacing hint of the full queue, so the send is rejected
+        threading.Timer(1.5, drain.paused.clear).start()
+        start = time.monotonic()
+        client.send(ServiceRequest("test"), timeout=5)
+        assert time.monotonic() - start > 1
+    finally:
+        client.close()
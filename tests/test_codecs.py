@@ -0,0 +1,61 @@
+# SPDX-License: LGPL-3.0-or-later
+# (c) 2025 Frank David Martínez Muñoz. <mnesarco at gmail.com>
+
+from __future__ import annotations
+
+import pytest
+
+from freecad.channels.api import CodecError
+from freecad.channels.api._codecs import (
+    COMPRESS_MIN_SIZE,
+    ENCODING_DEFLATE,
+    ENCODING_XZ,
+    compress,
+    decompress,
+    select_encoding,
+    should_compress,
+)
+
+DATA = b"FreeCAD Channels " * 1000
+
+
+@pytest.mark.parametrize("encoding", [ENCODING_DEFLATE, ENCODING_XZ])
+def test_roundtrip(encoding: str) -> None:
+    packed = compress(DATA, encoding)
+    assert len(packed) < len(DATA)
+    assert decompress(packed, encoding, len(DATA)) == DATA
+
+
+@pytest.mark.parametrize("encoding", [ENCODING_DEFLATE, ENCODING_XZ])
+def test_decompress_refuses_to_expand_beyond_max_size(encoding: str) -> None:
+    with pytest.raises(CodecError):
+        decompress(compress(DATA, encoding), encoding, len(DATA) - 1)
+
+
+@pytest.mark.parametrize("encoding", [ENCODING_DEFLATE, ENCODING_XZ])
+def test_decompress_rejects_corrupt_and_truncated_data(encoding: str) -> None:
+    packed = compress(DATA, encoding)
+    with pytest.raises(CodecError):
+        decompress(packed[: len(packed) // 2], encoding, len(DATA))
+    with pytest.raises(CodecError):
+        decompress(b"not compressed", encoding, len(DATA))
+
+
+def test_unsupported_encoding() -> None:
+    with pytest.raises(CodecError):
+        compress(DATA, "br")
+    with pytest.raises(CodecError):
+        decompress(DATA, "br", len(DATA))
+
+
+def test_select_encoding() -> None:
+    assert select_encoding("gzip, xz;q=0.5, deflate") == ENCODING_DEFLATE
+    assert select_encoding(["xz"]) == ENCODING_XZ
+    assert select_encoding("gzip, br") is None
+    assert select_encoding(None) is None
+
+
+def test_should_compress() -> None:
+    assert should_compress(COMPRESS_MIN_SIZE, ENCODING_DEFLATE)
+    assert not should_compress(COMPRESS_MIN_SIZE - 1, ENCODING_DEFLATE)
+    assert not should_compress(COMPRESS_MIN_SIZE, None)
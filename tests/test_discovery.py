@@ -0,0 +1,123 @@
+# SPDX-License: LGPL-3.0-or-later
+# (c) 2025 Frank David Martínez Muñoz. <mnesarco at gmail.com>
+
+from __future__ import annotations
+
+import time
+from queue import Queue
+
+from freecad.channels.api import (
+    DiscoveryGroup,
+    DiscoveryListener,
+    ServiceAddress,
+    ServiceLoad,
+    ServiceRegistry,
+    find_channel_service,
+)
+from freecad.channels.api._discovery import SERVICE_ADDED, SERVICE_REMOVED
+from freecad.channels.api._service import (
+    ANY_HOST,
+    format_announcements,
+    parse_announcements,
+    parse_probe,
+)
+
+
+def test_listener_tracks_services() -> None:
+    registry = ServiceRegistry()
+    service = registry.create_service("TestDiscovery", Queue())
+    listener = DiscoveryListener(1.0)
+    events = []
+    listener.add_listener(lambda event, address: events.append((event, address.name)))
+    try:
+        address = listener.wait_for("TestDiscovery", 5)
+        assert address is not None
+        assert listener.find("TestDiscovery") == address
+        assert listener.services(["Unknown"]) == []
+        service.shutdown()
+        registry.shutdown()
+        deadline = time.monotonic() + 5
+        while listener.find("TestDiscovery") is not None and time.monotonic() < deadline:
+            time.sleep(0.1)
+        assert listener.find("TestDiscovery") is None
+        assert (SERVICE_ADDED, "TestDiscovery") in events
+        assert (SERVICE_REMOVED, "TestDiscovery") in events
+    finally:
+        listener.stop()
+
+
+def test_probe_finds_service_without_waiting(start_service) -> None:
+    service = start_service("TestProbe")
+    # Past the announcement made at registration
+    time.sleep(0.2)
+    start = time.monotonic()
+    found = find_channel_service(filter=["TestProbe"], timeout=5, maxcount=1)
+    assert found == [service.address()]
+    assert time.monotonic() - start < 1
+
+
+def test_announcement_roundtrip() -> None:
+    address = ServiceAddress("127.0.0.2", "Test", 1234, frame_port=1235)
+    assert parse_announcements(str(address).encode("utf-8")) == [address]
+    assert parse_announcements(b"garbage") == []
+    assert parse_probe(b"garbage") is None
+
+
+def test_shared_announcement_roundtrip() -> None:
+    load = ServiceLoad(1, 10, 0.5)
+    shared = [ServiceAddress("127.0.0.1", name, 1234, 1235, load, shared=True) for name in "AB"]
+    (datagram,) = format_announcements(shared)
+    addresses = parse_announcements(datagram)
+    assert addresses == shared
+    assert [address.load for address in addresses] == [load, load]
+
+
+def test_advertised_host(start_service) -> None:
+    service = start_service("TestAdvertise", host=ANY_HOST, advertise="127.0.0.3")
+    found = find_channel_service(filter=["TestAdvertise"], timeout=5, maxcount=1)
+    assert [address.host for address in found] == ["127.0.0.3"]
+    assert service.address().host == "127.0.0.3"
+
+
+def test_multicast_group() -> None:
+    group = DiscoveryGroup(port=58990)
+    registry = ServiceRegistry(multicast=group)
+    service = registry.create_service("TestMulticast", Queue())
+    listener = DiscoveryListener(multicast=group)
+    try:
+        assert listener.wait_for("TestMulticast", 5) == service.address()
+    finally:
+        listener.stop()
+        service.shutdown()
+        registry.shutdown()
+
+
+def test_two_listeners_keep_live_services(start_service) -> None:
+    start_service("TestTwoListeners")
+    ttl = 1.5
+    first = DiscoveryListener(ttl)
+    second = DiscoveryListener(ttl)
+    try:
+        assert first.wait_for("TestTwoListeners", 5) is not None
+        assert second.wait_for("TestTwoListeners", 5) is not None
+        # A third socket on the shared announcement port takes announcements too
+        find_channel_service(filter=["TestTwoListeners"], timeout=0.2)
+        time.sleep(ttl * 3)
+        assert first.find("TestTwoListeners") is not None
+        assert second.find("TestTwoListeners") is not None
+    finally:
+        first.stop()
+        second.stop()
+
+
+class RefusedSocket:
+    """Probe socket whose peer is gone, as reported by an ICMP error."""
+
+    def recvfrom(self, size: int) -> tuple[bytes, tuple[str, int]]:
+        raise ConnectionRefusedError(size)
+
+
+def test_failed_probe_does_not_stop_registry(start_service, registry) -> None:
+    start_service("TestRefused")
+    registry._answer_probe(RefusedSocket())  # noqa: SLF001
+    assert find_channel_service(filter=["TestRefused"], timeout=5, maxcount=1)
@@ -0,0 +1,133 @@
+# SPDX-License: LGPL-3.0-or-later
+# (c) 2025 Frank David Martínez Muñoz. <mnesarco at gmail.com>
+
+from __future__ import annotations
+
+import io
+import socket
+from array import array
+
+import pytest
+
+from freecad.channels.api import ServiceClient, ServiceRequest
+from freecad.channels.api._codecs import COMPRESS_MIN_SIZE, ENCODING_DEFLATE
+from freecad.channels.api._frames import (
+    FRAME_BATCH,
+    FRAME_MAGIC,
+    FRAME_PREFIX,
+    FRAME_REQUEST,
+    FRAME_VERSION,
+    FrameError,
+    encode_frame,
+    read_frame,
+    read_frame_sized,
+)
+
+
+def test_roundtrip_with_buffers() -> None:
+    payload = {
+        "name": "test",
+        "data": {
+            "vertices": array("f", [0.0, 1.5, -2.0]),
+            "indices": array("I", [0, 1, 2]),
+            "raw": b"\x00\x01",
+            "nested": [array("d", [3.25]), {"label": "x"}],
+        },
+    }
+    kind, decoded = read_frame(io.BytesIO(encode_frame(FRAME_REQUEST, payload)))
+    assert kind == FRAME_REQUEST
+    assert decoded == payload
+    assert decoded["data"]["indices"].typecode == "I"
+
+
+def test_compressed_frame() -> None:
+    payload = {"requests": [{"data": {"values": array("i", [7] * COMPRESS_MIN_SIZE)}}]}
+    frame = encode_frame(FRAME_BATCH, payload, encoding=ENCODING_DEFLATE)
+    assert len(frame) < COMPRESS_MIN_SIZE
+    kind, decoded, size = read_frame_sized(io.BytesIO(frame))
+    assert (kind, decoded, size) == (FRAME_BATCH, payload, len(frame))
+
+
+def test_small_frames_are_not_compressed() -> None:
+    payload = {"name": "small"}
+    assert encode_frame(FRAME_REQUEST, payload, encoding=ENCODING_DEFLATE) == encode_frame(
+        FRAME_REQUEST,
+        payload,
+    )
+
+
+def test_stream_of_frames() -> None:
+    stream = io.BytesIO(
+        encode_frame(FRAME_REQUEST, {"n": 1}) + encode_frame(FRAME_REQUEST, {"n": 2}),
+    )
+    assert read_frame(stream) == (FRAME_REQUEST, {"n": 1})
+    assert read_frame(stream) == (FRAME_REQUEST, {"n": 2})
+    assert read_frame(stream) is None
+
+
+def test_invalid_frames() -> None:
+    frame = encode_frame(FRAME_REQUEST, {"data": b"payload"})
+    with pytest.raises(FrameError):
+        read_frame(io.BytesIO(b"XXXX" + frame[4:]))
+    with pytest.raises(FrameError):
+        read_frame(io.BytesIO(frame[:-1]))
+    with pytest.raises(FrameError):
+        read_frame(io.BytesIO(frame[: FRAME_PREFIX.size + 2]))
+
+
+def raw_frame(header: bytes) -> bytes:
+    return FRAME_PREFIX.pack(FRAME_MAGIC, FRAME_VERSION, FRAME_REQUEST, len(header), 0) + header
+
+
+def bad_typecode_frame() -> bytes:
+    frame = encode_frame(FRAME_REQUEST, {"name": "test", "data": array("i", [1])})
+    return frame.replace(b'"typecode":"i"', b'"typecode":"Z"')
+
+
+def test_invalid_frame_content() -> None:
+    for frame in (raw_frame(b"{not json"), raw_frame(b"[]"), bad_typecode_frame()):
+        with pytest.raises(FrameError):
+            read_frame(io.BytesIO(frame))
+
+
+def test_server_answers_invalid_frames(start_service) -> None:
+    service = start_service("TestBadFrames", frames=True, max_frame_size=1024)
+    with socket.create_connection((service.address().host, service.frame_port), 5) as sock:
+        stream = sock.makefile("rb")
+        # Decoding errors are answered and the connection goes on
+        for frame in (raw_frame(b"{not json"), bad_typecode_frame()):
+            sock.sendall(frame)
+            assert read_frame(stream)[1]["status"] == "error"
+        sock.sendall(encode_frame(FRAME_REQUEST, {"name": "test"}))
+        assert read_frame(stream)[1]["status"] == "ok"
+        # An oversized frame is not read, the connection is closed
+        sock.sendall(FRAME_PREFIX.pack(FRAME_MAGIC, FRAME_VERSION, FRAME_REQUEST, 10, 2048))
+        assert read_frame(stream)[1]["message"].startswith("Frame too large")
+        assert read_frame(stream) is None
+    assert service.pending() == 1
+
+
+def test_frame_transport_keeps_arrays(start_service) -> None:
+    service = start_service("TestFrames", frames=True)
+    client = ServiceClient(service.address())
+    assert client.transport == "frame"
+    try:
+        for n in range(3):
+            client.send(ServiceRequest("test", data={"values": array("i", [n] * 4)}), timeout=5)
+    finally:
+        client.close()
+    values = [request.data["values"] for request in service]
+    assert values == [array("i", [n] * 4) for n in range(3)]
+
+
+@pytest.mark.parametrize("transport", ["http", "frame"])
+def test_compressed_transport(start_service, transport: str) -> None:
+    service = start_service("TestCompressed", frames=True)
+    client = ServiceClient(service.address(), transport=transport, compression=ENCODING_DEFLATE)
+    values = array("i", [7] * COMPRESS_MIN_SIZE)
+    try:
+        client.send(ServiceRequest("test", data={"values": values}), timeout=5)
+    finally:
+        client.close()
+    assert [request.data["values"] for request in service] == [values]
+    assert service.metrics.snapshot()["bytes_in"] < COMPRESS_MIN_SIZE
@@ -0,0 +1,47 @@
+# SPDX-License: LGPL-3.0-or-later
+# (c) 2025 Frank David Martínez Muñoz. <mnesarco at gmail.com>
+
+from __future__ import annotations
+
+import json
+from queue import Queue
+from urllib.request import urlopen
+
+import pytest
+
+from freecad.channels.api import ServiceBusyError, ServiceClient, ServiceRequest
+from freecad.channels.api._metrics import Histogram
+from freecad.channels.api._service import METRICS_PATH
+
+
+def test_histogram_quantiles() -> None:
+    histogram = Histogram((0.1, 1.0))
+    for value in (0.05, 0.05, 0.5, 2.0):
+        histogram.observe(value)
+    assert histogram.quantile(0.5) == 0.1
+    assert histogram.quantile(0.75) == 1.0
+    assert histogram.quantile(1) == 2.0
+    snapshot = histogram.snapshot()
+    assert snapshot["count"] == 4
+    assert snapshot["buckets"] == [[0.1, 2], [1.0, 1], ["+Inf", 1]]
+
+
+def test_service_and_client_metrics(start_service, drain_service) -> None:
+    service = start_service("TestMetrics", Queue(3))
+    client = ServiceClient(service.address(), retry=None)
+    client.send_many([ServiceRequest("test") for _ in range(3)], timeout=5)
+    with pytest.raises(ServiceBusyError):
+        client.send(ServiceRequest("test"), timeout=5)
+    drain = drain_service(service, lambda _: None)
+    client.send(ServiceRequest("test"), timeout=5)
+    drain.stop()
+
+    assert client.metrics.snapshot()["sent"] == 3
+    assert client.metrics.snapshot()["rejected"] == 1
+    address = service.address()
+    with urlopen(f"http://{address.host}:{address.port}{METRICS_PATH}", timeout=5) as response:  # noqa: S310
+        metrics = json.loads(response.read())
+    assert metrics["received"] == 4
+    assert metrics["rejected"] == 1
+    assert metrics["queue_high_water"] == 3
+    assert metrics["handled"] + service.pending() == 4
@@ -0,0 +1,105 @@
+# SPDX-License: LGPL-3.0-or-later
+# (c) 2025 Frank David Martínez Muñoz. <mnesarco at gmail.com>
+
+from __future__ import annotations
+
+import pytest
+
+from freecad.channels.api import (
+    PRIORITY_HIGH,
+    PRIORITY_LOW,
+    PRIORITY_NORMAL,
+    CoalescingQueue,
+    LaneQueue,
+    ServiceBusyError,
+    ServiceClient,
+    ServiceRequest,
+)
+from freecad.channels.api._queues import request_priority
+
+
+def request(n: int = 0, key: str | None = None, priority: int | None = None) -> ServiceRequest:
+    return ServiceRequest("test", data={"n": n}, key=key, priority=priority)
+
+
+def bulk(n: int) -> ServiceRequest:
+    return ServiceRequest("test", data={"action": "import_file", "n": n})
+
+
+def test_coalescing_replaces_in_place() -> None:
+    queue = CoalescingQueue(10)
+    queue.put(request(1, key="a"))
+    queue.put(request(2))
+    queue.put(request(3, key="a"))
+    assert queue.qsize() == 2
+    assert queue.superseded == 1
+    assert [queue.get().data["n"], queue.get().data["n"]] == [3, 2]
+    # Once handled, the key starts a new entry
+    queue.put(request(4, key="a"))
+    assert queue.qsize() == 1
+
+
+def test_full_service_accepts_superseding_requests(start_service) -> None:
+    service = start_service("TestCoalesce", CoalescingQueue(2))
+    client = ServiceClient(service.address(), retry=None)
+    client.send_many([request(1, key="a"), request(2, key="b")], timeout=5)
+    client.send(request(3, key="a"), timeout=5)
+    client.send_many([request(4, key="a"), request(5, key="b")], timeout=5)
+    with pytest.raises(ServiceBusyError):
+        client.send(request(6, key="c"), timeout=5)
+    assert [item.data["n"] for item in service] == [4, 5]
+
+
+def test_lanes_serve_highest_first() -> None:
+    queue = LaneQueue(10)
+    queue.put(request(1, priority=PRIORITY_LOW))
+    queue.put(request(2, priority=PRIORITY_NORMAL))
+    queue.put(request(3, priority=PRIORITY_HIGH))
+    assert [queue.get().data["n"] for _ in range(3)] == [3, 2, 1]
+
+
+def test_bulk_lane_capacity() -> None:
+    queue = LaneQueue(50)
+    assert queue.lane_sizes == (0, 40, 40)
+    assert queue.has_room([bulk(n) for n in range(40)])
+    assert not queue.has_room([bulk(n) for n in range(41)])
+    # Control messages still fit when the bulk lane is full
+    for n in range(40):
+        queue.put(bulk(n))
+    assert queue.has_room([ServiceRequest("test", priority=PRIORITY_HIGH)])
+
+
+@pytest.mark.parametrize(
+    ("action", "priority"),
+    [
+        ("ping", PRIORITY_HIGH),
+        ("import", PRIORITY_NORMAL),
+        ("import_file", PRIORITY_LOW),
+        ("mesh_buffer", PRIORITY_LOW),
+    ],
+)
+def test_priority_by_action(action: str, priority: int) -> None:
+    assert request_priority(ServiceRequest("test", data={"action": action})) == priority
+    explicit = ServiceRequest("test", data={"action": action}, priority=PRIORITY_NORMAL)
+    assert request_priority(explicit) == PRIORITY_NORMAL
+
+
+def test_no_lane_starves_when_all_saturated() -> None:
+    burst = 4
+    queue = LaneQueue(burst=burst)
+    served = []
+    # Keep every lane busy: refill the lane of each served request
+    for lane in range(3):
+        for n in range(burst * 2):
+            queue.put(request(n, priority=lane))
+    for _ in range(100):
+        item = queue.get()
+        served.append(item.priority)
+        queue.put(request(priority=item.priority))
+
+    for lane in (PRIORITY_NORMAL, PRIORITY_LOW):
+        gaps = [i for i, p in enumerate(served) if p == lane]
+        assert gaps, f"lane {lane} never served"
+        longest = max(b - a for a, b in zip([-1, *gaps], gaps))
+        assert longest <= burst + 2
+    assert served.count(PRIORITY_HIGH) > served.count(PRIORITY_LOW)
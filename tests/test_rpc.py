@@ -0,0 +1,89 @@
+# SPDX-License: LGPL-3.0-or-later
+# (c) 2025 Frank David Martínez Muñoz. <mnesarco at gmail.com>
+
+from __future__ import annotations
+
+import time
+from concurrent.futures import CancelledError
+
+import pytest
+
+from freecad.channels.api import CoalescingQueue, RemoteError, ServiceClient, ServiceRequest
+from freecad.channels.api._rpc import REPLY_POLL_WAIT
+
+handled: list[object] = []
+
+
+def handler(request: ServiceRequest) -> object:
+    handled.append(request.data.get("value"))
+    if request.data.get("fail"):
+        msg = "boom"
+        raise ValueError(msg)
+    return request.data.get("value")
+
+
+@pytest.mark.parametrize("transport", ["http", "frame"])
+def test_call(start_service, drain_service, transport: str) -> None:
+    service = start_service("TestCall", keep_alive=True, frames=True)
+    drain_service(service, handler)
+    client = ServiceClient(service.address(), keep_alive=True, transport=transport)
+    try:
+        assert client.call(ServiceRequest("test", data={"value": 42}), 5).result(5) == 42
+        with pytest.raises(RemoteError, match="boom"):
+            client.call(ServiceRequest("test", data={"fail": True}), 5).result(5)
+    finally:
+        client.close()
+
+
+def test_call_timeout(start_service) -> None:
+    service = start_service("TestTimeout", keep_alive=True)
+    client = ServiceClient(service.address(), keep_alive=True)
+    try:
+        with pytest.raises(TimeoutError):
+            client.call(ServiceRequest("test"), 0.2).result(5)
+    finally:
+        client.close()
+
+
+def test_cancelled_call_is_skipped(start_service, drain_service) -> None:
+    service = start_service("TestCancel", keep_alive=True)
+    drain = drain_service(service, handler, paused=True)
+    client = ServiceClient(service.address(), keep_alive=True)
+    try:
+        future = client.call(ServiceRequest("test", data={"value": "cancelled"}), 5)
+        assert future.cancel()
+        # The poller notifies the service once its current long poll ends
+        time.sleep(REPLY_POLL_WAIT + 0.5)
+        drain.paused.clear()
+        assert client.call(ServiceRequest("test", data={"value": "next"}), 5).result(5) == "next"
+        assert "cancelled" not in handled
+    finally:
+        client.close()
+
+
+def test_start_calls_in_one_batch(start_service, drain_service) -> None:
+    service = start_service("TestCalls", keep_alive=True)
+    drain_service(service, handler)
+    client = ServiceClient(service.address(), keep_alive=True)
+    try:
+        requests = [ServiceRequest("test", data={"value": n}) for n in range(10)]
+        futures = client.start_calls(requests, timeout=5, reply_timeout=5)
+        assert [future.result(5) for future in futures] == list(range(10))
+        assert client.metrics.snapshot()["sent"] == 1
+    finally:
+        client.close()
+
+
+def test_superseded_call_is_cancelled(start_service, drain_service) -> None:
+    service = start_service("TestSuperseded", CoalescingQueue(10), keep_alive=True)
+    drain = drain_service(service, handler, paused=True)
+    client = ServiceClient(service.address(), keep_alive=True)
+    try:
+        old = client.call(ServiceRequest("test", data={"value": 1}, key="k"), 5)
+        new = client.call(ServiceRequest("test", data={"value": 2}, key="k"), 5)
+        drain.paused.clear()
+        assert new.result(5) == 2
+        with pytest.raises(CancelledError):
+            old.result(5)
+    finally:
+        client.close()
@@ -0,0 +1,173 @@
+# SPDX-License: LGPL-3.0-or-later
+# (c) 2025 Frank David Martínez Muñoz. <mnesarco at gmail.com>
+
+from __future__ import annotations
+
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPConnection
+from queue import Queue
+
+import pytest
+
+from freecad.channels.api import (
+    ConnectionPool,
+    DrainStats,
+    ServiceBusyError,
+    ServiceClient,
+    ServiceEndpoint,
+    ServiceRequest,
+)
+from freecad.channels.api._service import SERVER_ENGINES, Service
+
+
+@pytest.mark.parametrize("keep_alive", [False, True])
+def test_send(start_service, keep_alive: bool) -> None:
+    service = start_service("TestSend", keep_alive=keep_alive)
+    client = ServiceClient(service.address(), keep_alive=keep_alive)
+    for n in range(3):
+        client.send(ServiceRequest("test", data={"n": n}), timeout=5)
+    assert [request.data["n"] for request in service] == [0, 1, 2]
+
+
+def test_keep_alive_reuses_connection(start_service) -> None:
+    service = start_service("TestKeepAlive", keep_alive=True)
+    pool = ConnectionPool()
+    client = ServiceClient(service.address(), keep_alive=True, pool=pool)
+    try:
+        client.send(ServiceRequest("test"), timeout=5)
+        conn, reused = pool.acquire(service.address(), 5)
+        assert reused
+        pool.release(service.address(), conn)
+        client.send(ServiceRequest("test"), timeout=5)
+        assert len(list(service)) == 2
+    finally:
+        pool.clear()
+
+
+def test_reconnects_after_idle_timeout(start_service) -> None:
+    service = start_service("TestIdle", keep_alive=True, keep_alive_timeout=0.1)
+    pool = ConnectionPool()
+    client = ServiceClient(service.address(), keep_alive=True, pool=pool)
+    try:
+        client.send(ServiceRequest("test"), timeout=5)
+        # The service closes the idle connection, the pool replaces it
+        time.sleep(0.3)
+        client.send(ServiceRequest("test"), timeout=5)
+        assert len(list(service)) == 2
+    finally:
+        pool.clear()
+
+
+@pytest.mark.parametrize("engine", SERVER_ENGINES)
+def test_engines_serve_concurrent_clients(start_service, engine: str) -> None:
+    service = start_service("TestEngine", keep_alive=True, engine=engine, workers=2)
+    pools = [ConnectionPool() for _ in range(4)]
+
+    def send(pool: ConnectionPool) -> None:
+        client = ServiceClient(service.address(), keep_alive=True, pool=pool)
+        for _ in range(5):
+            client.send(ServiceRequest("test"), timeout=5)
+        # Idle persistent connections must not block the other clients
+        pool.clear()
+
+    try:
+        with ThreadPoolExecutor(len(pools)) as executor:
+            list(executor.map(send, pools))
+        assert len(list(service)) == 20
+    finally:
+        for pool in pools:
+            pool.clear()
+
+
+def test_invalid_engine(registry) -> None:
+    with pytest.raises(ValueError, match="engine"):
+        Service(registry, "TestInvalid", None, start=False, engine="forking")
+
+
+def test_enqueue_listeners(start_service) -> None:
+    service = start_service("TestListeners", Queue(2))
+    calls = []
+
+    def failing() -> None:
+        msg = "listener failed"
+        raise RuntimeError(msg)
+
+    service.add_enqueue_listener(failing)
+    service.add_enqueue_listener(lambda: calls.append(service._queue.qsize()))  # noqa: SLF001
+    client = ServiceClient(service.address(), retry=None)
+    client.send(ServiceRequest("test"), timeout=5)
+    client.send_many([ServiceRequest("test")], timeout=5)
+    # Rejected requests are not announced
+    with pytest.raises(ServiceBusyError):
+        client.send_many([ServiceRequest("test")], timeout=5)
+    assert calls == [1, 2]
+
+
+def test_next_request_and_pending(start_service) -> None:
+    service = start_service("TestNext")
+    assert service.next_request() is None
+    ServiceClient(service.address()).send_many(
+        [ServiceRequest("test", data={"n": n}) for n in range(3)],
+        timeout=5,
+    )
+    assert service.pending() == 3
+    assert service.next_request().data == {"n": 0}
+    assert service.pending() == 2
+
+
+def test_drain_stats() -> None:
+    stats = DrainStats()
+    stats.record(handled=5, pending=2, duration=0.04, interval=0.01)
+    stats.record(handled=2, pending=0, duration=0.01, interval=0.5)
+    assert (stats.ticks, stats.handled, stats.deferred_ticks) == (2, 7, 1)
+    assert (stats.last_handled, stats.last_pending, stats.last_interval) == (2, 0, 0.5)
+    assert stats.max_duration == 0.04
+
+
+@pytest.mark.parametrize("transport", ["http", "frame"])
+def test_shared_endpoint_routes_by_name(start_service, transport: str) -> None:
+    endpoint = ServiceEndpoint(shared=True, frames=True, keep_alive=True)
+    first = start_service("TestSharedA", endpoint=endpoint)
+    second = start_service("TestSharedB", endpoint=endpoint)
+    assert first.address().port == second.address().port
+    assert first.address().shared
+    for service in (first, second):
+        client = ServiceClient(service.address(), keep_alive=True, transport=transport)
+        try:
+            client.send(ServiceRequest("test", data={"to": service.name}), timeout=5)
+        finally:
+            client.close()
+    assert [request.data["to"] for request in first] == ["TestSharedA"]
+    assert [request.data["to"] for request in second] == ["TestSharedB"]
+
+
+def post(service: Service, path: str, body: bytes, headers: dict[str, str]) -> tuple[int, dict]:
+    conn = HTTPConnection(service.address().host, service.port, timeout=5)
+    try:
+        # putrequest/endheaders to send a body without Content-Length
+        conn.putrequest("POST", path)
+        for name, value in headers.items():
+            conn.putheader(name, value)
+        conn.endheaders(body)
+        response = conn.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        conn.close()
+
+
+def test_post_rejects_malformed_bodies(start_service) -> None:
+    service = start_service("TestMalformed")
+    assert post(service, "/", b"", {})[0] == 411
+    assert post(service, "/", b"[1]", {"Content-Length": "3"})[0] == 400
+
+    # A request without name is invalid, alone or in a batch
+    body = b'{"data":1}'
+    status, response = post(service, "/", body, {"Content-Length": str(len(body))})
+    assert status == 400
+    assert response["message"] == "invalid request"
+    body = b'{"requests":[{"data":1}]}'
+    status, response = post(service, "/batch", body, {"Content-Length": str(len(body))})
+    assert response["items"] == [{"status": "error", "message": "invalid request"}]
+    assert service.pending() == 0
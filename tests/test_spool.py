@@ -0,0 +1,109 @@
+# SPDX-License: LGPL-3.0-or-later
+# (c) 2025 Frank David Martínez Muñoz. <mnesarco at gmail.com>
+
+from __future__ import annotations
+
+import os
+import stat
+import time
+from typing import TYPE_CHECKING
+
+import pytest
+
+from freecad.channels import spool
+from freecad.channels.spool import ExportSpool
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_release_deletes_companions(tmp_path: Path) -> None:
+    files = ExportSpool(tmp_path / "spool")
+    path = files.file("obj")
+    path.write_text("o")
+    path.with_suffix(".mtl").write_text("m")
+    other = files.file("obj")
+    other.write_text("o")
+    assert files.owns(path)
+    files.release(path)
+    assert sorted(files.directory.iterdir()) == [other]
+
+
+def test_release_ignores_foreign_files(tmp_path: Path) -> None:
+    foreign = tmp_path / "cached.obj"
+    foreign.write_text("o")
+    files = ExportSpool(tmp_path / "spool")
+    assert not files.owns(foreign)
+    files.release(foreign)
+    assert foreign.exists()
+
+
+def test_evict_by_age_and_size(tmp_path: Path) -> None:
+    files = ExportSpool(tmp_path / "spool", max_bytes=25, max_age=60)
+    old = files.file("obj")
+    old.write_bytes(b"x" * 10)
+    os.utime(old, (time.time() - 120, time.time() - 120))
+    paths = []
+    for _ in range(3):
+        paths.append(files.file("obj"))
+        paths[-1].write_bytes(b"x" * 10)
+        time.sleep(0.01)
+    files.evict()
+    assert not old.exists()
+    assert [path.exists() for path in paths] == [False, True, True]
+
+
+def test_clear(tmp_path: Path) -> None:
+    files = ExportSpool(tmp_path / "spool")
+    files.file("obj").write_text("o")
+    files.clear()
+    assert not files.directory.exists()
+
+
+def test_sweep_leftovers(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(spool, "spool_root", lambda: tmp_path / "root")
+    monkeypatch.setattr(spool, "LEGACY_DIRECTORY", tmp_path / "legacy")
+    mine = tmp_path / "root" / str(os.getpid())
+    mine.mkdir(parents=True)
+    legacy = tmp_path / "legacy"
+    legacy.mkdir()
+    (legacy / "export.obj").write_text("o")
+    (legacy / "notes.txt").write_text("t")
+    spool.sweep_leftovers()
+    assert mine.exists()
+    assert [file.name for file in legacy.iterdir()] == ["notes.txt"]
+
+
+@pytest.fixture
+def shared_root(tmp_path: Path, monkeypatch) -> Path:
+    monkeypatch.setattr(spool, "SHM_DIRECTORY", tmp_path)
+    monkeypatch.setattr(spool._State, "root", None)  # noqa: SLF001
+    monkeypatch.setattr(spool.getpass, "getuser", lambda: "user")
+    return tmp_path / "freecad-channels-user"
+
+
+def test_root_is_private(shared_root: Path) -> None:
+    assert spool.spool_root() == shared_root
+    assert stat.S_IMODE(shared_root.stat().st_mode) == 0o700
+
+
+def test_root_mode_is_restricted(shared_root: Path) -> None:
+    shared_root.mkdir(mode=0o755)
+    shared_root.chmod(0o755)
+    assert spool.spool_root() == shared_root
+    assert stat.S_IMODE(shared_root.stat().st_mode) == 0o700
+
+
+def test_symlinked_root_is_not_used(shared_root: Path, tmp_path: Path) -> None:
+    target = tmp_path / "elsewhere"
+    target.mkdir(mode=0o700)
+    shared_root.symlink_to(target)
+    root = spool.spool_root()
+    assert root not in (shared_root, target)
+    assert stat.S_IMODE(root.stat().st_mode) == 0o700
+
+
+def test_foreign_root_is_not_used(shared_root: Path, monkeypatch) -> None:
+    shared_root.mkdir(mode=0o700)
+    monkeypatch.setattr(spool.os, "getuid", lambda: shared_root.stat().st_uid + 1, raising=False)
+    assert spool.spool_root() != shared_root